@@ -0,0 +1,19 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import iocl.synthetic as synthetic
+
+
+def run_app(session_id, client_id, client_type, explen, warmup_secs=0, cooldown_secs=0):
+    # Knobs are read from the environment, see iocl/synthetic.py
+    synthetic.run_app(
+        session_id, client_id, client_type, explen, warmup_secs, cooldown_secs, default_mode="pipelined"
+    )
+
+
+if __name__ == "__main__":
+    from iocl.cli import run_client
+
+    run_client(run_app, synthetic.CLIENT_TYPE)
@@ -1,9 +1,15 @@
 import asyncio
 import json
+import os
 import random
 import sys
-import bcrypt
-from iocl.iocl_utils import send_request, await_request
+import time
+from iocl.iocl_utils import send_request, await_request, await_many, send_batch, await_batch
+from iocl.messages import encode_message
+from iocl.passwords import check_password, get_password_pool
+from iocl.replies import exists as _exists, get_messages_mode, members as _members, room_messages, unwrap as _unwrap
+from iocl.dataflow import Dataflow
+from iocl.usernames import get_username_cache
 
 def make_username_key(username):
     return f"username:{username}"
@@ -12,34 +18,33 @@ def make_username_key(username):
 def create_user(session_id, username, password):
     pending_awaits = {*()}
     username_key = make_username_key(username)
-    hashed_password = bcrypt.hashpw(str(password).encode("utf-8"), bcrypt.gensalt(10))
-
-    # Convert bytes to string for storage
-    hashed_password_str = hashed_password.decode("utf-8")
+    # The hash is computed on the password pool while INCR is in flight
+    hashing = get_password_pool().hash(password)
 
     future_0 = send_request(session_id, "INCR", "total_users")
 
     pending_awaits.add(future_0)
 
-    next_id = await_request(session_id, future_0)
+    next_id = _unwrap(await_request(session_id, future_0))
 
     pending_awaits.remove(future_0)
 
-    user_key = f"user:{next_id}"
+    hashed_password_str = hashing.result()
 
-    future_1 = send_request(session_id, "SET", username_key, user_key)
-    pending_awaits.add(future_1)
+    user_key = f"user:{next_id}"
 
-    future_2 = send_request(
-        session_id, "HMSET", user_key, {"username": username, "password": hashed_password_str}
+    futures = send_batch(
+        session_id,
+        [
+            ("SET", username_key, user_key),
+            ("HMSET", user_key, {"username": username, "password": hashed_password_str}),
+            ("SADD", f"user:{next_id}:rooms", "0"),
+        ],
     )
-    pending_awaits.add(future_2)
+    pending_awaits.update(futures)
 
-    future_3 = send_request(session_id, "SADD", f"user:{next_id}:rooms", "0")
-    pending_awaits.add(future_3)
-
-    for future in pending_awaits:
-        await_request(session_id, future)
+    await_batch(session_id, futures)
+    get_username_cache().store(user_key, username)
 
     return (pending_awaits, {"id": next_id, "username": username})
 
@@ -47,16 +52,21 @@ def create_user(session_id, username, password):
 def get_messages(session_id, room_id=0, offset=0, size=50):
     pending_awaits = {*()}
     room_key = f"room:{room_id}"
+    mode = get_messages_mode()
+    if mode != "checked":
+        requests = [("ZREVRANGE", room_key, offset, offset + size)]
+        if mode == "speculative":
+            requests.insert(0, ("EXISTS", room_key))
+        futures = send_batch(session_id, requests)
+        pending_awaits.update(futures)
+        replies = await_batch(session_id, futures)
+        return (pending_awaits, list(room_messages(replies[0] if mode == "speculative" else None, replies[-1])))
     future_0 = send_request(session_id, "EXISTS", room_key)
     pending_awaits.add(future_0)
     room_exists = await_request(session_id, future_0)
     pending_awaits.remove(future_0)
-    
-    # Normalize tuple return (success, result)
-    if isinstance(room_exists, tuple) and len(room_exists) == 2:
-        room_exists = room_exists[1]
-    
-    if not room_exists:
+
+    if not _exists(room_exists):
         for future in pending_awaits:
             await_request(session_id, future)
         return (pending_awaits, [])
@@ -70,7 +80,7 @@ def get_messages(session_id, room_id=0, offset=0, size=50):
             await_request(session_id, future)
         return (
             pending_awaits,
-            list((values)),
+            list(room_messages(None, values)),
         )
 
     for future in pending_awaits:
@@ -80,14 +90,56 @@ def get_messages(session_id, room_id=0, offset=0, size=50):
 
 def hmget(session_id, key, key2):
     pending_awaits = {*()}
-    "Wrapper around hmget to unpack bytes from hmget"
+    "Wrapper around hmget to unpack bytes from hmget; usernames come from the cache when they can"
+    if key2 == "username":
+        result = get_username_cache().lookup(key)
+        if result is not None:
+            return (pending_awaits, list(result))
     future_0 = send_request(session_id, "HMGET", key, key2)
     pending_awaits.add(future_0)
     result = await_request(session_id, future_0)
     pending_awaits.remove(future_0)
+    if key2 == "username":
+        get_username_cache().fill(key, result)
     return (pending_awaits, list(result))
 
 
+class _Usernames:
+    """Username lookups for a batch: cache hits up front, HMGET requests for the misses."""
+
+    def __init__(self, user_ids):
+        cache = get_username_cache()
+        self.keys = [f"user:{user_id}" for user_id in user_ids]
+        self.replies = [cache.lookup(key) for key in self.keys]
+        self.missing = [i for i, reply in enumerate(self.replies) if reply is None]
+
+    def requests(self):
+        return [("HMGET", self.keys[i], "username") for i in self.missing]
+
+    def fill(self, results):
+        """Usernames in user id order, given the replies to requests()"""
+        cache = get_username_cache()
+        for i, reply in zip(self.missing, results):
+            cache.fill(self.keys[i], reply)
+            self.replies[i] = reply
+        return [list(reply) for reply in self.replies]
+
+
+def _username_node(flow, user_id):
+    """Username reply as a dataflow node, served from the cache when it can be"""
+    key = f"user:{user_id}"
+    cache = get_username_cache()
+    reply = cache.lookup(key)
+    if reply is not None:
+        return flow.constant(reply)
+
+    def fill(reply):
+        cache.fill(key, reply)
+        return reply
+
+    return flow.then(fill, flow.request("HMGET", key, "username"))
+
+
 def get_private_room_id(user1, user2):
     if user1 == user2:
         return None
@@ -104,23 +156,171 @@ def create_private_room(session_id, user1, user2):
         room_id = 0
         # raise RuntimeError("ROOM ID DID NOT RETURN")
         # return (pending_awaits, (None, True))
-    future_0 = send_request(session_id, "SADD", f"user:{user1}:rooms", room_id, "")
-    # print("future 0", future_0, file=sys.stderr)
-    pending_awaits.add(future_0)
-    future_1 = send_request(session_id, "SADD", f"user:{user2}:rooms", room_id, "")
-    # print("future 1", future_1, file=sys.stderr)
-    pending_awaits.add(future_1)
-    pending_awaits_hmget, user1 = hmget(session_id, f"user:{user1}", "username")
-    # print("pending awaits1", pending_awaits_hmget, file=sys.stderr)
-    pending_awaits.update(pending_awaits_hmget)
-    pending_awaits_hmget, user2 = hmget(session_id, f"user:{user2}", "username")
-    # print("pending awaits2", pending_awaits_hmget, file=sys.stderr)
-    pending_awaits.update(pending_awaits_hmget)
-    for future in pending_awaits:
-        await_request(session_id, future)
+    usernames = _Usernames([user1, user2])
+    requests = [
+        ("SADD", f"user:{user1}:rooms", room_id, ""),
+        ("SADD", f"user:{user2}:rooms", room_id, ""),
+    ]
+    requests.extend(usernames.requests())
+    futures = send_batch(session_id, requests)
+    results = await_batch(session_id, futures)
+    pending_awaits.update(futures[:2])
+    user1, user2 = usernames.fill(results[2:])
     return (pending_awaits, ({"id": room_id, "names": [user1, user2]}, False))
 
 
+def login(session_id, username, password):
+    pending_awaits = {*()}
+    "Log in, creating the user on first login as the /login route does"
+    username_key = make_username_key(username)
+    flow = Dataflow(session_id)
+    user_exists = flow.request("EXISTS", username_key)
+    # The user key is read alongside the existence check; it is empty when
+    # the user does not exist yet
+    user_key = flow.request("GET", username_key)
+    stored = flow.then(
+        lambda key: flow.request("HMGET", _unwrap(key), "password") if _unwrap(key) else None, user_key
+    )
+    user_exists, user_key, stored = flow.run(user_exists, user_key, stored)
+    if not _exists(user_exists):
+        pending_awaits_create_user, new_user = create_user(session_id, username, password)
+        pending_awaits.update(pending_awaits_create_user)
+        return (pending_awaits, new_user)
+    user_key = _unwrap(user_key)
+    stored = _unwrap(stored)
+    if stored and check_password(password, stored[0]):
+        return (pending_awaits, {"id": user_key.split(":")[-1], "username": username})
+    return (pending_awaits, None)
+
+
+def get_rooms(session_id, user_id=0):
+    pending_awaits = {*()}
+    "Get rooms for the selected user."
+    flow = Dataflow(session_id)
+    lookups = []
+
+    def look_up(members):
+        # Every room's name and existence, and the usernames of a private
+        # room (its id is the two user ids), are read as soon as the room
+        # ids arrive; the replies decide which of them are used
+        for room_id in _members(members):
+            ids = room_id.split(":")
+            lookups.append(
+                (
+                    room_id,
+                    flow.request("GET", f"room:{room_id}:name"),
+                    flow.request("EXISTS", f"room:{room_id}"),
+                    [_username_node(flow, user_id) for user_id in ids] if len(ids) == 2 else [],
+                )
+            )
+
+    flow.then(look_up, flow.request("GET", f"user:{user_id}:rooms"))
+    flow.run()
+    rooms = []
+    private = []
+    for room_id, name, room_exists, usernames in lookups:
+        name = _unwrap(name.value)
+        if name:
+            rooms.append({"id": room_id, "names": [name]})
+        elif _exists(room_exists.value) and usernames:
+            private.append({"id": room_id, "names": [list(username.value) for username in usernames]})
+    return (pending_awaits, rooms + private)
+
+
+def get_online_users(session_id):
+    pending_awaits = {*()}
+    future_0 = send_request(session_id, "GET", "online_users")
+    pending_awaits.add(future_0)
+    online_ids = _members(await_request(session_id, future_0))
+    pending_awaits.remove(future_0)
+    usernames = _Usernames(online_ids)
+    futures = send_batch(session_id, usernames.requests())
+    users = {}
+    for online_id, user in zip(online_ids, usernames.fill(await_batch(session_id, futures))):
+        users[online_id] = {"id": online_id, "username": user, "online": True}
+    return (pending_awaits, users)
+
+
+def get_users(session_id, ids):
+    pending_awaits = {*()}
+    "User info and presence for the given ids, as the /users route returns"
+    usernames = _Usernames(ids)
+    futures = send_batch(session_id, [("GET", "online_users")] + usernames.requests())
+    results = await_batch(session_id, futures)
+    online = set(_members(results[0]))
+    users = {}
+    for user_id, user in zip(ids, usernames.fill(results[1:])):
+        users[user_id] = {"id": user_id, "username": user, "online": str(user_id) in online}
+    return (pending_awaits, users)
+
+
+def _publish_request(name, message):
+    """The store has no PUBLISH, so the MESSAGES channel is a sorted set"""
+    outgoing = {"type": name, "data": message}
+    return ("ZADD", "MESSAGES", json.dumps(outgoing), str(time.time()))
+
+
+def publish(session_id, name, message):
+    pending_awaits = {*()}
+    futures = send_batch(session_id, [_publish_request(name, message)])
+    pending_awaits.update(futures)
+    await_batch(session_id, futures)
+    return (pending_awaits, None)
+
+
+def set_presence(session_id, user_id):
+    pending_awaits = {*()}
+    "Mark a user online and announce it, as a socket.io connect does"
+    futures = send_batch(
+        session_id,
+        [
+            ("SADD", "online_users", str(user_id)),
+            _publish_request("user.connected", {"id": user_id, "online": True}),
+        ],
+    )
+    pending_awaits.update(futures)
+    await_batch(session_id, futures)
+    return (pending_awaits, None)
+
+
+def clear_presence(session_id, user_id):
+    pending_awaits = {*()}
+    "Announce a user going offline, as a socket.io disconnect does (the store has no SREM)"
+    pending_awaits_publish, _ = publish(session_id, "user.disconnected", {"id": user_id, "online": False})
+    pending_awaits.update(pending_awaits_publish)
+    return (pending_awaits, None)
+
+
+def send_message(session_id, room_id, from_id, content, date):
+    pending_awaits = {*()}
+    "Store a chat message in its room and publish it, as the socket.io message handler does"
+    message = {"from": from_id, "date": date, "message": content, "roomId": room_id}
+    room_key = f"room:{room_id}"
+    ids = str(room_id).split(":")
+    flow = Dataflow(session_id)
+    presence = flow.request("SADD", "online_users", str(from_id))
+    name_exists = flow.request("EXISTS", f"{room_key}:name")
+    room_exists = flow.request("EXISTS", room_key)
+    # Usernames for a show.room event are read with the checks, not after them
+    names = [_username_node(flow, user_id) for user_id in ids] if len(ids) == 2 else []
+
+    def store(name_exists, room_exists, *names):
+        # The message is stored only after room_exists was read, and
+        # show.room is published ahead of it
+        requests = []
+        if not _exists(name_exists) and not _exists(room_exists) and names:
+            requests.append(_publish_request("show.room", {"id": room_id, "names": [list(name) for name in names]}))
+        requests.append(("ZADD", room_key, encode_message(message), str(int(date))))
+        requests.append(_publish_request("message", message))
+        return [flow.request(*request) for request in requests]
+
+    writes = flow.then(store, name_exists, room_exists, *names)
+    flow.run()
+    pending_awaits.add(presence.command_id)
+    pending_awaits.update(write.command_id for write in writes.value)
+    return (pending_awaits, None)
+
+
 def event_stream(session_id):
     pending_awaits = {*()}
     "Handle message formatting, etc."
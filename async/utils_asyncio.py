@@ -0,0 +1,158 @@
+import asyncio
+from iocl.iocl_asyncio import send_request, await_request, await_many
+from iocl.messages import encode_message
+from iocl.passwords import check_password, get_password_pool
+from iocl.replies import exists as _exists, get_messages_mode, members as _members, room_messages, unwrap as _unwrap
+from iocl.usernames import get_username_cache
+from utils import _publish_request, make_username_key, get_private_room_id
+
+# asyncio counterparts of the chat helpers in utils.py. Each helper is a
+# coroutine, so many logical chat users can share one event loop; results are
+# returned directly instead of alongside a pending_awaits set.
+
+
+async def create_user(session_id, username, password):
+    username_key = make_username_key(username)
+    # The hash is computed on the password pool while INCR is in flight
+    hashing = asyncio.ensure_future(get_password_pool().hash_async(password))
+
+    future_0 = await send_request(session_id, "INCR", "total_users")
+    next_id = _unwrap(await await_request(session_id, future_0))
+    hashed_password_str = await hashing
+
+    user_key = f"user:{next_id}"
+
+    future_1 = await send_request(session_id, "SET", username_key, user_key)
+    future_2 = await send_request(
+        session_id, "HMSET", user_key, {"username": username, "password": hashed_password_str}
+    )
+    future_3 = await send_request(session_id, "SADD", f"user:{next_id}:rooms", "0")
+
+    await await_many(session_id, [future_1, future_2, future_3])
+    get_username_cache().store(user_key, username)
+
+    return {"id": next_id, "username": username}
+
+
+async def get_messages(session_id, room_id=0, offset=0, size=50):
+    room_key = f"room:{room_id}"
+    mode = get_messages_mode()
+    if mode != "checked":
+        futures = [await send_request(session_id, "ZREVRANGE", room_key, offset, offset + size)]
+        if mode == "speculative":
+            futures.insert(0, await send_request(session_id, "EXISTS", room_key))
+        replies = await await_many(session_id, futures)
+        return list(room_messages(replies[0] if mode == "speculative" else None, replies[-1]))
+    future_0 = await send_request(session_id, "EXISTS", room_key)
+    room_exists = await await_request(session_id, future_0)
+    if not _exists(room_exists):
+        return []
+
+    future_1 = await send_request(session_id, "ZREVRANGE", room_key, offset, offset + size)
+    values = await await_request(session_id, future_1)
+    return list(room_messages(None, values))
+
+
+async def hmget(session_id, key, key2):
+    "Wrapper around hmget to unpack bytes from hmget; usernames come from the cache when they can"
+    if key2 == "username":
+        result = get_username_cache().lookup(key)
+        if result is not None:
+            return list(result)
+    future_0 = await send_request(session_id, "HMGET", key, key2)
+    result = await await_request(session_id, future_0)
+    if key2 == "username":
+        get_username_cache().fill(key, result)
+    return list(result)
+
+
+async def create_private_room(session_id, user1, user2):
+    "Create a private room and add users to it"
+    room_id = get_private_room_id(user1, user2)
+    if not room_id:
+        room_id = 0
+    future_0 = await send_request(session_id, "SADD", f"user:{user1}:rooms", room_id, "")
+    future_1 = await send_request(session_id, "SADD", f"user:{user2}:rooms", room_id, "")
+    name1, name2, _ = await asyncio.gather(
+        hmget(session_id, f"user:{user1}", "username"),
+        hmget(session_id, f"user:{user2}", "username"),
+        await_many(session_id, [future_0, future_1]),
+    )
+    return ({"id": room_id, "names": [name1, name2]}, False)
+
+
+async def add_message(session_id, room_id, from_id, content, timestamp):
+    "Store a message as the room's value (the driver's add_message op)"
+    message = {"from": from_id, "date": timestamp, "message": content, "roomId": room_id}
+    future_0 = await send_request(session_id, "PUT", f"room:{room_id}", encode_message(message))
+    await await_request(session_id, future_0)
+
+
+async def login(session_id, username, password):
+    "Log in, creating the user on first login as the /login route does"
+    username_key = make_username_key(username)
+    # The user key is read alongside the existence check; it is empty when
+    # the user does not exist yet
+    future_0 = await send_request(session_id, "EXISTS", username_key)
+    future_1 = await send_request(session_id, "GET", username_key)
+    user_exists, user_key = await await_many(session_id, [future_0, future_1])
+    if not _exists(user_exists):
+        return await create_user(session_id, username, password)
+    user_key = _unwrap(user_key)
+    future_2 = await send_request(session_id, "HMGET", user_key, "password")
+    stored = _unwrap(await await_request(session_id, future_2))
+    if stored and check_password(password, stored[0]):
+        return {"id": user_key.split(":")[-1], "username": username}
+    return None
+
+
+async def _room_entry(session_id, room_id):
+    "A room of get_rooms: its name, or for a private room (two user ids) its usernames; None when gone"
+    future_0 = await send_request(session_id, "GET", f"room:{room_id}:name")
+    future_1 = await send_request(session_id, "EXISTS", f"room:{room_id}")
+    ids = room_id.split(":")
+    lookups = [hmget(session_id, f"user:{user_id}", "username") for user_id in ids] if len(ids) == 2 else []
+    (name, room_exists), *usernames = await asyncio.gather(await_many(session_id, [future_0, future_1]), *lookups)
+    name = _unwrap(name)
+    if name:
+        return {"id": room_id, "names": [name]}, False
+    if _exists(room_exists) and usernames:
+        return {"id": room_id, "names": usernames}, True
+    return None
+
+
+async def get_rooms(session_id, user_id=0):
+    "Get rooms for the selected user; every room is looked up as soon as the room ids arrive"
+    future_0 = await send_request(session_id, "GET", f"user:{user_id}:rooms")
+    room_ids = _members(await await_request(session_id, future_0))
+    entries = [entry for entry in await asyncio.gather(*(_room_entry(session_id, r) for r in room_ids)) if entry]
+    return [room for room, private in entries if not private] + [room for room, private in entries if private]
+
+
+async def publish(session_id, name, message):
+    future_0 = await send_request(session_id, *_publish_request(name, message))
+    await await_request(session_id, future_0)
+
+
+async def set_presence(session_id, user_id):
+    "Mark a user online and announce it, as a socket.io connect does"
+    future_0 = await send_request(session_id, "SADD", "online_users", str(user_id))
+    future_1 = await send_request(
+        session_id, *_publish_request("user.connected", {"id": user_id, "online": True})
+    )
+    await await_many(session_id, [future_0, future_1])
+
+
+async def clear_presence(session_id, user_id):
+    "Announce a user going offline, as a socket.io disconnect does (the store has no SREM)"
+    await publish(session_id, "user.disconnected", {"id": user_id, "online": False})
+
+
+async def event_stream(session_id):
+    "Handle message formatting, etc."
+    await send_request(session_id, "SUBSCRIBE", "MESSAGES")
+    future_1 = await send_request(session_id, "LISTEN")
+    messages = await await_request(session_id, future_1)
+    for message in messages:
+        data = f"data: {str(message)}\n\n"
+        yield data
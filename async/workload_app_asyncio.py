@@ -0,0 +1,106 @@
+import time
+import sys
+import os
+
+# Add the parent directory to Python path to find iocl module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iocl.arrivals import schedule_from_env
+from iocl.histogram import recorder_from_env
+from iocl.opstream import op_stream_from_env
+from iocl.trace import get_trace_writer
+from iocl.keyselect import selector_from_env
+import iocl.opmix as opmix
+from iocl.opmix import WorkloadOp, mix_from_env
+from iocl.sessions import session_from_env
+import utils_asyncio
+
+# Coroutine version of workload_app_async.create for IOCL_CLIENT_ASYNCIO:
+# every logical client of the process runs on one event loop, waiting on its
+# replies with loop.add_reader instead of a blocked thread. Only the ops with
+# an asyncio helper can be in the mix.
+
+OPS = {
+    "create_user": WorkloadOp(utils_asyncio.create_user, opmix.new_user_args, "users"),
+    "login": WorkloadOp(utils_asyncio.login, opmix.login_args, None),
+    "create_private_room": WorkloadOp(utils_asyncio.create_private_room, opmix.user_pair_args, "rooms"),
+    "get_rooms": WorkloadOp(utils_asyncio.get_rooms, opmix.user_args, None),
+    "add_message": WorkloadOp(utils_asyncio.add_message, opmix.message_args, None),
+    "get_messages": WorkloadOp(utils_asyncio.get_messages, opmix.room_args, None),
+    "set_presence": WorkloadOp(utils_asyncio.set_presence, opmix.user_args, None),
+    "clear_presence": WorkloadOp(utils_asyncio.clear_presence, opmix.user_args, None),
+    "publish": WorkloadOp(utils_asyncio.publish, opmix.publish_args, None),
+}
+
+
+async def create(session_id, clientid, explen, warmup_secs=0, cooldown_secs=0):
+    rampUp = int(warmup_secs)
+    rampDown = int(cooldown_secs)
+
+    if rampUp + rampDown >= explen:
+        raise ValueError("Ramp-up + ramp-down must be less than total experiment length")
+
+    steady_secs = explen - rampUp - rampDown
+    t_start = time.time()
+    t_end = t_start + explen
+
+    schedule = schedule_from_env(t_start, clientid)
+    steady_ops = 0
+    latencies = recorder_from_env(clientid, t_start)
+    draws = op_stream_from_env(clientid)
+    trace = get_trace_writer()
+    users = selector_from_env(clientid, stream=1)
+    rooms = selector_from_env(clientid, stream=2)
+    mix = mix_from_env(OPS)
+    session = session_from_env(clientid, users, rooms)
+
+    print("#start,0,0")
+
+    while time.time() < t_end:
+        if schedule is not None:
+            intended = await schedule.wait_async()
+            if intended >= t_end:
+                break
+        elif session is not None and not await session.wait_async(t_end):
+            break
+        app_request_type, arg1, arg2 = draws.next()
+        before = int((intended if schedule is not None else time.time()) * 1e9)  # latency in ns
+
+        optype = mix.select(app_request_type)
+        op = OPS[optype]
+        if session is not None:
+            optype, args = session.next_op(optype, op, arg1, arg2)
+            op = OPS[optype]
+        else:
+            args = op.args(arg1, arg2, users, rooms)
+        await op.run(session_id, *args)
+        if op.inserts == "users" and users is not None:
+            users.advance()
+        elif op.inserts == "rooms" and rooms is not None:
+            rooms.advance()
+
+        after = int(time.time() * 1e9)
+        lat = after - before
+        optime = int((time.time() - t_start) * 1e9)
+        if trace is not None:
+            trace.app_op(session_id, optype, args, before, lat)
+
+        now = time.time()
+        # Only print latencies during steady-state
+        if rampUp <= (now - t_start) < (rampUp + steady_secs):
+            latencies.record(optype, lat, optime)
+            steady_ops += 1
+        if session is not None:
+            session.done()
+
+    if schedule is not None:
+        print(f"#rate,{schedule.rate:.3f},{steady_ops / steady_secs:.3f},{clientid}")
+
+    if session is not None:
+        print(f"#sessions,{session.sessions},{clientid}")
+
+    elapsed = time.time() - t_start
+    latencies.finish(elapsed)
+    end_sec = int(elapsed)
+    end_usec = int((elapsed - end_sec) * 1e6)
+    print(f"#end,{end_sec},{end_usec},{clientid}")
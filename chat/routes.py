@@ -1,12 +1,12 @@
 import asyncio
 import json
 import os
-import bcrypt
 from flask import Response, jsonify, request, session
 from chat import utils
 from chat.app import app
 from chat.auth import auth_middleware
 from mdlin import AppRequest, AppResponse
+from iocl.passwords import check_password
 
 
 @app.route('/stream')
@@ -56,7 +56,7 @@ def login():
         pending_awaits.add(future_2)
         data = AppResponse(future_2)
         pending_awaits.remove(future_2)
-        if bcrypt.hashpw(password.encode('utf-8'), data[b'password']) == data[b'password']:
+        if check_password(password, data[b'password']):
             user = {'id': user_key.split(':')[-1], 'username': username}
             session['user'] = user
             return (pending_awaits, (user, 200))
@@ -0,0 +1,47 @@
+import collections
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def sim_backend(monkeypatch):
+    """
+    The pure-Python redisstore (iocl/redisstore_sim.py) for one test. Repo
+    modules first imported during the test may have bound its symbols
+    (iocl.backend, iocl.iocl_utils, the driver utils), so they are dropped
+    again afterwards and later tests see the environment they would have seen
+    without it.
+    Driver directories go on sys.path with monkeypatch.syspath_prepend.
+    """
+    import iocl.redisstore_sim as sim
+
+    before = set(sys.modules)
+    monkeypatch.setitem(sys.modules, "redisstore", sim)
+    yield sim
+    for name in set(sys.modules) - before - {"redisstore"}:
+        path = getattr(sys.modules[name], "__file__", None) or ""
+        if path.startswith(REPO_ROOT + os.sep):
+            del sys.modules[name]
+
+
+class _QueuedLatency:
+    def __init__(self, delays):
+        self.delays = delays
+
+    def sample(self):
+        return self.delays.popleft() if self.delays else 0.0
+
+
+@pytest.fixture
+def sim_delays(sim_backend, monkeypatch):
+    """
+    Completion delays, in seconds, for the next requests sent to the sim, in
+    send order; requests sent once the queue is empty complete immediately.
+    """
+    delays = collections.deque()
+    monkeypatch.setattr(sim_backend._get_backend(), "latency_model", _QueuedLatency(delays))
+    return delays
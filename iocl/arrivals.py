@@ -0,0 +1,69 @@
+import asyncio
+import os
+import random
+import time
+
+# Open-loop arrival schedules for the workload drivers. In open-loop mode an
+# op's latency is measured from its intended start time rather than from when
+# the client got around to issuing it, so queueing behind a slow op is counted
+# instead of hidden (coordinated omission).
+
+ARRIVAL_PROCESSES = ("closed", "poisson", "fixed")
+
+
+class ArrivalSchedule:
+    """
+    Intended start times at rate ops/sec, with exponential ("poisson") or
+    constant ("fixed") gaps, starting from t_start (a time.time() value).
+    """
+
+    def __init__(self, process, rate, t_start, seed=None):
+        if process not in ("poisson", "fixed"):
+            raise ValueError(f"Unknown arrival process: {process}")
+        if rate <= 0:
+            raise ValueError("Arrival rate must be positive")
+        self.process = process
+        self.rate = float(rate)
+        self._rng = random.Random(seed)
+        self._next = t_start
+
+    def next_start(self):
+        if self.process == "poisson":
+            self._next += self._rng.expovariate(self.rate)
+        else:
+            self._next += 1.0 / self.rate
+        return self._next
+
+    def wait(self):
+        """
+        Sleep until the next intended start and return it. When the client is
+        behind schedule this returns immediately with a start time in the past.
+        """
+        intended = self.next_start()
+        delay = intended - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        return intended
+
+    async def wait_async(self):
+        """wait() for coroutine clients: sleeps on the event loop."""
+        intended = self.next_start()
+        delay = intended - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return intended
+
+
+def schedule_from_env(t_start, clientid=0):
+    """
+    Build the schedule selected by IOCL_CLIENT_ARRIVAL_PROCESS at
+    IOCL_CLIENT_ARRIVAL_RATE, or None for the default closed loop.
+    """
+    process = os.environ.get("IOCL_CLIENT_ARRIVAL_PROCESS", "closed")
+    if process == "closed":
+        return None
+    rate = float(os.environ.get("IOCL_CLIENT_ARRIVAL_RATE", 1.0))
+    seed = os.environ.get("IOCL_CLIENT_SEED")
+    if seed is not None:
+        seed = f"{seed}:{clientid}"
+    return ArrivalSchedule(process, rate, t_start, seed)
@@ -0,0 +1,18 @@
+import importlib
+
+from iocl.redisstore_sim import install_if_requested
+
+# The redisstore binding the client code talks to: the C++ extension, or the
+# pure-Python simulator (iocl/redisstore_sim.py) with IOCL_BACKEND=sim. The
+# choice has to be made before redisstore is first imported, so library code
+# takes the binding's symbols from here rather than importing redisstore.
+
+install_if_requested()
+redisstore = importlib.import_module("redisstore")
+
+async_send_request = redisstore.async_send_request
+async_get_response = redisstore.async_get_response
+Operation = redisstore.Operation
+Value = redisstore.Value
+ValueType = redisstore.ValueType
+value_to_python = redisstore.value_to_python
@@ -0,0 +1,146 @@
+import argparse
+import os
+import sys
+
+from iocl.config_env import set_env_from_command_line_args, init_benchmark_with_config
+from iocl.keyspace import attach_table_from_env
+
+# Shared command line for the client scripts. A workload script defines
+# run_app(session_id, client_id, client_type, explen, warmup_secs, cooldown_secs)
+# and ends with
+#
+#   if __name__ == "__main__":
+#       from iocl.cli import run_client
+#       run_client(run_app, "multi_paxos")
+#
+# which is also what iocl/runner.py looks for when discovering workloads.
+
+DEFAULT_CONFIG = "/users/akalaba/IOCL/experiments/configs/1shard_transformed_test.json"
+
+
+def build_parser(description="IOCL Benchmark Client", default_config=DEFAULT_CONFIG):
+    parser = argparse.ArgumentParser(description=description)
+
+    parser.add_argument(
+        "--config",
+        action="store",
+        dest="config_path",
+        default=default_config,
+        help="Path to the JSON configuration file",
+    )
+    parser.add_argument(
+        "--explen",
+        type=int,
+        dest="explen",
+        default=30,
+        help="Experiment length override",
+    )
+    parser.add_argument("--warmup_secs", type=int, default=0, help="Warmup seconds")
+    parser.add_argument("--cooldown_secs", type=int, default=0, help="Cooldown seconds")
+    parser.add_argument("--clientid", type=int, default=0, help="Client ID")
+    parser.add_argument("--num_keys", type=int, default=1000000, help="Number of keys")
+    parser.add_argument("--num_shards", type=int, default=1, help="Number of shards")
+    parser.add_argument(
+        "--replica_config_paths",
+        type=str,
+        default="",
+        help="Path(s) to replica config(s)",
+    )
+    parser.add_argument(
+        "--net_config_path", type=str, default="", help="Path to network config"
+    )
+    parser.add_argument(
+        "--client_host", type=str, default="localhost", help="Client host name"
+    )
+    parser.add_argument(
+        "--trans_protocol",
+        type=str,
+        choices=["tcp", "udp"],
+        default="tcp",
+        help="Transport protocol",
+    )
+
+    parser.add_argument("--partitioner", type=str, default="", help="Partitioner type")
+    parser.add_argument("--key_selector", type=str, default="", help="Key selector")
+    parser.add_argument(
+        "--zipf_coefficient", type=float, default=0.0, help="Zipf coefficient"
+    )
+    parser.add_argument("--debug_stats", action="store_true", help="Enable debug stats")
+    parser.add_argument("--delay", type=int, default=0, help="Random delay")
+    parser.add_argument(
+        "--ping_replicas", type=str, default="", help="Ping replicas flag"
+    )
+    parser.add_argument("--stats_file", type=str, default="", help="Stats file path")
+
+    # Applied after the JSON config, so a sweep can override what it sets
+    parser.add_argument("--mpl", type=int, default=None, help="Logical clients per process")
+    parser.add_argument(
+        "--arrival_process",
+        type=str,
+        choices=["closed", "poisson", "fixed"],
+        default=None,
+        help="Arrival process",
+    )
+    parser.add_argument(
+        "--arrival_rate", type=float, default=None, help="Per-client arrival rate (ops/sec)"
+    )
+    return parser
+
+
+def apply_overrides(args):
+    if args.mpl is not None:
+        os.environ["IOCL_MPL"] = str(args.mpl)
+    if args.arrival_process is not None:
+        os.environ["IOCL_CLIENT_ARRIVAL_PROCESS"] = args.arrival_process
+    if args.arrival_rate is not None:
+        os.environ["IOCL_CLIENT_ARRIVAL_RATE"] = str(args.arrival_rate)
+
+
+def run_with_stats_file(run_app, session_id, args, client_type):
+    """Run the workload while aggregating its own output into args.stats_file."""
+    from iocl.stats import Aggregator, TeeAggregator, default_interval_secs, write_stats_file
+
+    aggregator = Aggregator(default_interval_secs())
+    stdout = sys.stdout
+    sys.stdout = TeeAggregator(stdout, aggregator)
+    try:
+        run_app(session_id, args.clientid, client_type, args.explen, args.warmup_secs, args.cooldown_secs)
+    finally:
+        sys.stdout = stdout
+    write_stats_file(args.stats_file, aggregator.stats(args.explen - args.warmup_secs - args.cooldown_secs))
+
+
+def run_client(run_app, client_type, argv=None, description="IOCL Benchmark Client", default_config=DEFAULT_CONFIG):
+    """
+    Parse the command line, configure the environment from it and the JSON
+    config, open a session and call run_app.
+    """
+    args = build_parser(description, default_config).parse_args(argv)
+
+    try:
+        set_env_from_command_line_args(args)
+        init_benchmark_with_config(args.config_path)
+        attach_table_from_env()
+        apply_overrides(args)
+        if os.environ.get("IOCL_ENABLE_TIMING", "") == "1":
+            # Created here, on the main thread, so its SIGUSR1 dump handler can be installed
+            from iocl.timing import get_recorder
+
+            get_recorder()
+        import redisstore
+
+        session_id = redisstore.custom_init_session()
+        if args.stats_file:
+            run_with_stats_file(run_app, session_id, args, client_type)
+        else:
+            run_app(session_id, args.clientid, client_type, args.explen, args.warmup_secs, args.cooldown_secs)
+
+    except FileNotFoundError:
+        print(f"Error: Config file not found at {args.config_path}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error initializing client: {e}", file=sys.stderr)
+        import traceback
+
+        traceback.print_exc(file=sys.stderr)
+        sys.exit(1)
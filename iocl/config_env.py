@@ -1,5 +1,9 @@
 import os
 import json
+from iocl.redisstore_sim import install_if_requested
+
+# IOCL_BACKEND=sim swaps in the pure-Python redisstore before anything imports it
+install_if_requested()
 
 
 def load_config_and_set_env(config_path):
@@ -8,6 +12,7 @@ def load_config_and_set_env(config_path):
     with open(config_path, "r") as f:
         config = json.load(f)
     config_dir = os.path.dirname(os.path.abspath(config_path))
+    os.environ["IOCL_CONFIG_PATH"] = os.path.abspath(config_path)
     env_mapping = {
         "benchmark_name": "IOCL_BENCHMARK",
         "bench_mode": "IOCL_BENCH_MODE",
@@ -50,25 +55,55 @@ def load_config_and_set_env(config_path):
         "client_disable_gc": "IOCL_CLIENT_DISABLE_GC",
         "client_gc_debug_trace": "IOCL_CLIENT_GC_DEBUG_TRACE",
         "client_cpuprofile": "IOCL_CLIENT_CPUPROFILE",
+        "client_arrival_rate": "IOCL_CLIENT_ARRIVAL_RATE",
+        "client_arrival_process": "IOCL_CLIENT_ARRIVAL_PROCESS",
+        "client_seed": "IOCL_CLIENT_SEED",
+        "client_spin_budget_us": "IOCL_SPIN_BUDGET_US",
+        "client_spin_initial_backoff_us": "IOCL_SPIN_INITIAL_BACKOFF_US",
+        "client_spin_max_backoff_us": "IOCL_SPIN_MAX_BACKOFF_US",
+        "client_hedge_reads": "IOCL_HEDGE_READS",
+        "client_hedge_percentile": "IOCL_HEDGE_PERCENTILE",
+        "client_hedge_min_samples": "IOCL_HEDGE_MIN_SAMPLES",
+        "client_latency_log": "IOCL_LATENCY_LOG",
+        "client_trace_file": "IOCL_TRACE_FILE",
+        "client_trace_ops": "IOCL_TRACE_OPS",
+        "client_hotspot_fraction": "IOCL_CLIENT_HOTSPOT_FRACTION",
+        "client_hotspot_probability": "IOCL_CLIENT_HOTSPOT_PROBABILITY",
+        "client_op_mix": "IOCL_CLIENT_OP_MIX",
+        "client_synthetic_fanout": "IOCL_SYNTHETIC_FANOUT",
+        "client_synthetic_value_size": "IOCL_SYNTHETIC_VALUE_SIZE",
+        "client_synthetic_keys": "IOCL_SYNTHETIC_KEYS",
+        "client_synthetic_mode": "IOCL_SYNTHETIC_MODE",
+        "client_think_time": "IOCL_CLIENT_THINK_TIME",
+        "client_think_distribution": "IOCL_CLIENT_THINK_DISTRIBUTION",
+        "client_think_sigma": "IOCL_CLIENT_THINK_SIGMA",
+        "client_get_messages": "IOCL_CLIENT_GET_MESSAGES",
+        "client_username_cache_size": "IOCL_USERNAME_CACHE_SIZE",
+        "client_bcrypt_workers": "IOCL_BCRYPT_WORKERS",
+        "client_bcrypt_queue": "IOCL_BCRYPT_QUEUE",
+        "client_message_encoding": "IOCL_CLIENT_MESSAGE_ENCODING",
+        "client_asyncio": "IOCL_CLIENT_ASYNCIO",
+        "client_stay_probability": "IOCL_CLIENT_STAY_PROBABILITY",
+        "client_switch_probability": "IOCL_CLIENT_SWITCH_PROBABILITY",
     }
     for json_key, env_name in env_mapping.items():
         if json_key in config:
             value = config[json_key]
             if isinstance(value, list):
                 value = value[0]
-            os.environ[env_name] = str(value)
+            os.environ[env_name] = json.dumps(value) if isinstance(value, dict) else str(value)
     if "replication_protocol_settings" in config:
         rps = config["replication_protocol_settings"]
         if "message_transport_type" in rps:
             transport_type = rps["message_transport_type"]
             os.environ["IOCL_TRANSPORT_PROTOCOL"] = transport_type
-    if "client_arrival_rate" not in config:
+    if "client_arrival_rate" not in config and "IOCL_CLIENT_ARRIVAL_RATE" not in os.environ:
         os.environ["IOCL_CLIENT_ARRIVAL_RATE"] = "1.0"
-    if "client_think_time" not in config:
+    if "client_think_time" not in config and "IOCL_CLIENT_THINK_TIME" not in os.environ:
         os.environ["IOCL_CLIENT_THINK_TIME"] = "1.0"
-    if "client_stay_probability" not in config:
+    if "client_stay_probability" not in config and "IOCL_CLIENT_STAY_PROBABILITY" not in os.environ:
         os.environ["IOCL_CLIENT_STAY_PROBABILITY"] = "0.5"
-    if "client_switch_probability" not in config:
+    if "client_switch_probability" not in config and "IOCL_CLIENT_SWITCH_PROBABILITY" not in os.environ:
         os.environ["IOCL_CLIENT_SWITCH_PROBABILITY"] = "0.0"
     if "IOCL_DEBUG_STATS" not in os.environ:
         os.environ["IOCL_DEBUG_STATS"] = "false"
@@ -139,6 +174,10 @@ def set_env_from_command_line_args(args):
         os.environ["IOCL_CLIENT_HOST"] = args.client_host
     if args.trans_protocol is not None:
         os.environ["IOCL_TRANSPORT_PROTOCOL"] = args.trans_protocol
+    if getattr(args, "key_selector", ""):
+        os.environ["IOCL_CLIENT_KEY_SELECTOR"] = args.key_selector
+    if getattr(args, "zipf_coefficient", 0.0):
+        os.environ["IOCL_CLIENT_ZIPF_COEFFICIENT"] = str(args.zipf_coefficient)
 
 
 def init_benchmark_with_config(config_path):
@@ -0,0 +1,120 @@
+from iocl.iocl_utils import Completions, send_request
+
+# Dataflow execution for chat operations. An operation declares its requests
+# and what each one needs; the executor issues every request as soon as its
+# inputs are ready and resolves results as they land, so the operation takes
+# its critical-path latency rather than the sum of its requests.
+#
+#   flow = Dataflow(session_id)
+#   exists = flow.request("EXISTS", username_key)
+#   user_key = flow.request("GET", username_key)          # issued with EXISTS
+#   password = flow.then(
+#       lambda key: flow.request("HMGET", unwrap(key), "password"), user_key
+#   )                                                      # issued once GET lands
+#   exists, password = flow.run(exists, password)
+#
+# Request nodes resolve to the (success, result) reply. then(fn, *inputs)
+# calls fn with the input values once they are all resolved; fn may declare
+# more requests, and if it returns a node, the then() node resolves to that
+# node's value.
+
+
+class Node:
+    __slots__ = ("done", "value", "command_id", "_waiters")
+
+    def __init__(self):
+        self.done = False
+        self.value = None
+        # Set once a request node is issued
+        self.command_id = None
+        self._waiters = []
+
+    def on_done(self, callback):
+        if self.done:
+            callback(self.value)
+        else:
+            self._waiters.append(callback)
+
+
+class Dataflow:
+    def __init__(self, session_id, timeout=20):
+        self.session_id = session_id
+        self.timeout = timeout
+        self._completions = Completions(session_id)
+        self._inflight = {}
+
+    def _resolve(self, node, value):
+        if isinstance(value, Node):
+            value.on_done(lambda v: self._resolve(node, v))
+            return
+        node.done = True
+        node.value = value
+        waiters, node._waiters = node._waiters, []
+        for callback in waiters:
+            callback(value)
+
+    def _when_all(self, inputs, callback):
+        """Call callback with the input values once every input is resolved."""
+        remaining = [len(inputs)]
+
+        def ready(_):
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                callback(*[node.value for node in inputs])
+
+        if not inputs:
+            callback()
+        for node in inputs:
+            node.on_done(ready)
+
+    def request(self, operation, key, new_val="", old_val="", after=()):
+        """
+        Declare a request. It is issued right away, or once every node in
+        after has resolved when it must be ordered behind them.
+        """
+        node = Node()
+
+        def issue(*_):
+            node.command_id = send_request(self.session_id, operation, key, new_val, old_val)
+            self._inflight[node.command_id] = node
+            self._completions.add(node.command_id)
+
+        self._when_all(list(after), issue)
+        return node
+
+    def constant(self, value):
+        """Node that is already resolved, e.g. to a reply served from a cache."""
+        node = Node()
+        self._resolve(node, value)
+        return node
+
+    def then(self, fn, *inputs):
+        """Node resolving to fn(*input values), computed as soon as the inputs are."""
+        node = Node()
+        self._when_all(list(inputs), lambda *values: self._resolve(node, fn(*values)))
+        return node
+
+    def run(self, *targets):
+        """Drive the flow to completion (once per flow); returns the targets' values."""
+        try:
+            while self._inflight:
+                command_id, reply = self._completions.next(self.timeout)
+                self._resolve(self._inflight.pop(command_id), reply)
+        except BaseException:
+            self._drain()
+            raise
+        self._completions.close()
+        for node in targets:
+            if not node.done:
+                raise RuntimeError("Dataflow finished with unresolved nodes")
+        return [node.value for node in targets]
+
+    def _drain(self):
+        """Collect the replies still in flight after a failure, so none are left behind."""
+        try:
+            while self._inflight:
+                command_id, _ = self._completions.next(self.timeout)
+                self._inflight.pop(command_id, None)
+        finally:
+            self._inflight.clear()
+            self._completions.close()
@@ -0,0 +1,190 @@
+import array
+import json
+import os
+import sys
+
+# Per-op latency recording for the workload drivers. Latencies go into
+# HDR-style log-linear histograms (fixed memory, bounded relative error), with
+# optional interval snapshots every IOCL_TPUT_INTERVAL seconds and a one-line
+# JSON summary before #end. IOCL_LATENCY_LOG=raw additionally prints the old
+# per-op "app,..." / "{optype},..." lines.
+#
+# Output lines:
+#   #interval,{start_ns},{optype},{count},{p50},{p99},{p999},{max},{clientid}
+#   #hist,{json summary}
+
+SUB_BUCKET_BITS = 8
+SUMMARY_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of non-negative integers (ns). Values below
+    2**sub_bucket_bits are counted exactly; above that each power-of-two range
+    is split into 2**(sub_bucket_bits - 1) buckets, so the relative error is
+    at most 2**-(sub_bucket_bits - 1).
+    """
+
+    def __init__(self, sub_bucket_bits=SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._half = 1 << (sub_bucket_bits - 1)
+        self._size = (64 - sub_bucket_bits + 2) * self._half
+        self.reset()
+
+    def reset(self):
+        self.counts = array.array("Q", bytes(8 * self._size))
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def index(self, value):
+        shift = max(value.bit_length() - self.sub_bucket_bits, 0)
+        return shift * self._half + (value >> shift)
+
+    def lowest_value(self, index):
+        """Smallest value that lands in bucket index."""
+        if index < 2 * self._half:
+            return index
+        shift = (index >> (self.sub_bucket_bits - 1)) - 1
+        return (index - shift * self._half) << shift
+
+    def highest_value(self, index):
+        return self.lowest_value(index + 1) - 1
+
+    def record(self, value):
+        value = max(int(value), 0)
+        self.counts[self.index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """Value at percentile q (0-100), reported as its bucket's upper bound."""
+        if not self.count:
+            return 0
+        rank = max(int(self.count * q / 100.0 + 0.5), 1)
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.highest_value(i), self.max)
+        return self.max
+
+    def to_dict(self):
+        """JSON-friendly form; counts are sparse so summaries stay small and mergeable."""
+        return {
+            "sub_bucket_bits": self.sub_bucket_bits,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min or 0,
+            "max": self.max,
+            "mean": self.mean(),
+            "percentiles": {str(q): self.percentile(q) for q in SUMMARY_PERCENTILES},
+            "counts": {str(i): c for i, c in enumerate(self.counts) if c},
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        hist = cls(d.get("sub_bucket_bits", SUB_BUCKET_BITS))
+        for i, c in d["counts"].items():
+            hist.counts[int(i)] = c
+        hist.count = d["count"]
+        hist.total = d["total"]
+        hist.min = d["min"] if d["count"] else None
+        hist.max = d["max"]
+        return hist
+
+
+class OpLatencyRecorder:
+    """
+    Per-op histograms for one (logical) client. The "app" entry aggregates
+    every op, like the legacy app,... lines.
+    """
+
+    def __init__(self, clientid, t_start, interval_secs=0.0, raw=False, out=None):
+        self.clientid = clientid
+        self.t_start = t_start
+        self.interval_ns = int(float(interval_secs) * 1e9)
+        self.raw = raw
+        self.out = out or sys.stdout
+        self.totals = {}
+        self.intervals = {}
+        self._interval_start = 0
+
+    def record(self, optype, lat, optime):
+        """Record one op that completed optime ns after t_start and took lat ns."""
+        if self.raw:
+            # One write per op, so lines from logical clients sharing stdout don't interleave
+            self.out.write(
+                f"app,{lat},{optime},{self.clientid}\n{optype},{lat},{optime},{self.clientid}\n"
+            )
+        if self.interval_ns:
+            if optime >= self._interval_start + self.interval_ns:
+                self.flush_interval()
+                self._interval_start = optime - optime % self.interval_ns
+            self._hist(self.intervals, "app").record(lat)
+            self._hist(self.intervals, optype).record(lat)
+        self._hist(self.totals, "app").record(lat)
+        self._hist(self.totals, optype).record(lat)
+
+    @staticmethod
+    def _hist(table, optype):
+        hist = table.get(optype)
+        if hist is None:
+            hist = table[optype] = LatencyHistogram()
+        return hist
+
+    def flush_interval(self):
+        lines = []
+        for optype, hist in self.intervals.items():
+            if hist.count:
+                lines.append(
+                    f"#interval,{self._interval_start},{optype},{hist.count},{hist.percentile(50)},"
+                    f"{hist.percentile(99)},{hist.percentile(99.9)},{hist.max},{self.clientid}\n"
+                )
+                hist.reset()
+        if lines:
+            self.out.write("".join(lines))
+
+    def summary(self, elapsed_secs):
+        return {
+            "clientid": self.clientid,
+            "elapsed_secs": elapsed_secs,
+            "interval_ns": self.interval_ns,
+            "ops": {optype: hist.to_dict() for optype, hist in self.totals.items()},
+        }
+
+    def finish(self, elapsed_secs):
+        """Flush the last interval and write the #hist summary line."""
+        if self.interval_ns:
+            self.flush_interval()
+        self.out.write(f"#hist,{json.dumps(self.summary(elapsed_secs), separators=(',', ':'))}\n")
+
+
+def recorder_from_env(clientid, t_start):
+    """Recorder configured by IOCL_TPUT_INTERVAL and IOCL_LATENCY_LOG."""
+    return OpLatencyRecorder(
+        clientid,
+        t_start,
+        interval_secs=float(os.environ.get("IOCL_TPUT_INTERVAL", 0) or 0),
+        raw=os.environ.get("IOCL_LATENCY_LOG", "hist") == "raw",
+    )
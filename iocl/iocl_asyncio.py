@@ -0,0 +1,167 @@
+import asyncio
+import time
+from iocl.iocl_utils import (
+    FAST_PATH,
+    HEDGE_READS,
+    HEDGE_WINS,
+    SLOW_PATH,
+    _efd_from_response,
+    _finish_efd,
+    _hedge_stats,
+    _hedge_tracker,
+    _park_efd,
+    _parked_efds,
+    _reap_parked_efds,
+    _send_hedge,
+    _untrack_command,
+    _wait_stats,
+    extract_value_by_type,
+    get_hedge_policy,
+    send_request as _send_request,
+)
+from iocl.trace import get_trace_writer
+from iocl.backend import async_get_response
+
+
+async def send_request(session_id, operation, key, new_val="", old_val=""):
+    """
+    Sends a request to C++ layer and returns the command ID.
+    Submission never blocks, so this only exists to mirror the sync API.
+    """
+    return _send_request(session_id, operation, key, new_val, old_val)
+
+
+async def await_request(session_id, command_id, timeout=20):
+    """
+    Waits for the result of a previously sent request without blocking the loop.
+    The eventfd returned by async_get_response is registered with loop.add_reader.
+    Wait statistics, read hedging and tracing are the same as for the blocking await_request.
+    """
+    reply = await _await_one(session_id, command_id, timeout)
+    trace = get_trace_writer()
+    if trace is not None:
+        trace.request_done(session_id, command_id)
+    return reply
+
+
+async def _await_one(session_id, command_id, timeout):
+    operation_enum, request = _untrack_command(session_id, command_id)
+    stats = _wait_stats[operation_enum]
+    if request is not None:
+        _hedge_stats[operation_enum][HEDGE_READS] += 1
+
+    success, resp = async_get_response(session_id, command_id)
+
+    if success:
+        stats[FAST_PATH] += 1
+        if request is not None:
+            _hedge_tracker(operation_enum).add(time.monotonic_ns() - request[4], get_hedge_policy())
+        return success, extract_value_by_type(resp)
+
+    stats[SLOW_PATH] += 1
+    if request is not None:
+        return await _await_hedged(session_id, command_id, request, resp, timeout)
+
+    if _parked_efds:
+        _reap_parked_efds()
+    efd = _efd_from_response(resp)
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+
+    def _on_readable():
+        if not ready.done():
+            ready.set_result(None)
+
+    loop.add_reader(efd, _on_readable)
+    signalled = False
+    try:
+        await asyncio.wait_for(ready, timeout)
+        signalled = True
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Timeout waiting for command {command_id}") from None
+    finally:
+        loop.remove_reader(efd)
+        if signalled:
+            _finish_efd(efd)
+        else:
+            # Timed out or cancelled: the binding may still signal it
+            _park_efd(efd, session_id, command_id)
+
+    success, result = async_get_response(session_id, command_id)
+
+    if success:
+        return success, extract_value_by_type(result)
+    else:
+        raise RuntimeError(f"Failed to retrieve result after unblocking for command {command_id}")
+
+
+async def _await_hedged(session_id, command_id, request, resp, timeout):
+    """
+    await_request for a hedgeable read that was not ready on the first check:
+    once the op's hedge delay passes a duplicate is sent, the first response
+    wins, and the eventfds still outstanding are parked.
+    """
+    operation_enum, sent_ns = request[0], request[4]
+    tracker = _hedge_tracker(operation_enum)
+    loop = asyncio.get_running_loop()
+    deadline = time.monotonic() + timeout
+    winner = loop.create_future()
+    watched = {}
+
+    def watch(efd, sent_id):
+        watched[efd] = sent_id
+        loop.add_reader(efd, lambda: winner.done() or winner.set_result(efd))
+
+    watch(_efd_from_response(resp), command_id)
+    try:
+        if tracker.hedge_after_ns is not None:
+            delay = max(sent_ns + tracker.hedge_after_ns - time.monotonic_ns(), 0) / 1e9
+            done, _ = await asyncio.wait({winner}, timeout=min(delay, timeout))
+            if not done:
+                hedge_id = _send_hedge(session_id, request)
+                if hedge_id is not None:
+                    success, hedge_resp = async_get_response(session_id, hedge_id)
+                    if success:
+                        _hedge_stats[operation_enum][HEDGE_WINS] += 1
+                        tracker.add(time.monotonic_ns() - sent_ns, get_hedge_policy())
+                        return success, extract_value_by_type(hedge_resp)
+                    watch(_efd_from_response(hedge_resp), hedge_id)
+
+        done, _ = await asyncio.wait({winner}, timeout=max(deadline - time.monotonic(), 0))
+        if not done:
+            raise TimeoutError(f"Timeout waiting for command {command_id}")
+        winner_efd = winner.result()
+        loop.remove_reader(winner_efd)
+        winner_id = watched.pop(winner_efd)
+        _finish_efd(winner_efd)
+    finally:
+        for efd, loser_id in watched.items():
+            loop.remove_reader(efd)
+            _park_efd(efd, session_id, loser_id)
+
+    if winner_id != command_id:
+        _hedge_stats[operation_enum][HEDGE_WINS] += 1
+    success, result = async_get_response(session_id, winner_id)
+    if success:
+        tracker.add(time.monotonic_ns() - sent_ns, get_hedge_policy())
+        return success, extract_value_by_type(result)
+    else:
+        raise RuntimeError(f"Failed to retrieve result after unblocking for command {winner_id}")
+
+
+async def send_request_and_await(session_id, operation, key, new_val, old_val):
+    """
+    Sends a request to C++ layer and suspends until the response is ready.
+    """
+    command_id = _send_request(session_id, operation, key, new_val, old_val)
+    return await await_request(session_id, command_id)
+
+
+async def await_many(session_id, command_ids, timeout=20):
+    """
+    Waits for many previously sent requests concurrently and returns their
+    (success, result) tuples in the order of command_ids.
+    """
+    return await asyncio.gather(
+        *(await_request(session_id, command_id, timeout) for command_id in command_ids)
+    )
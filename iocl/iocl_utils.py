@@ -1,8 +1,10 @@
+import atexit
+import collections
 import select
 import os
-import hashlib
+import threading
 import time
-from redisstore import (
+from iocl.backend import (
     async_send_request,
     async_get_response,
     ValueType,
@@ -11,10 +13,12 @@ from redisstore import (
     value_to_python,
 )
 import sys
+from iocl.keyspace import hash_key
+from iocl.timing import get_recorder
+from iocl.trace import get_trace_writer
 
 # Global flag to enable/disable timing instrumentation
-ENABLE_TIMING = os.environ.get("IOCL_ENABLE_TIMING", "") == "0"
-ENABLE_TIMING = 0
+ENABLE_TIMING = os.environ.get("IOCL_ENABLE_TIMING", "") == "1"
 
 
 def _ns_timestamp():
@@ -28,28 +32,377 @@ def _ns_timestamp():
 
 def _log_timing(location, timestamp_ns, client_id=0, command_id=None, session_id=None, context=""):
     """
-    Log timing information in a parseable format.
-    Format: TIMING,<location>,<timestamp_ns>,<client_id>,<command_id>,<session_id>,<context>
+    Record a timing point in the in-memory recorder (iocl/timing.py), which is
+    dumped in binary at exit. client_id, session_id and context are kept for
+    call-site compatibility; the client id is stored once in the dump header.
     """
     if not ENABLE_TIMING:
         return
 
-    cmd_id_str = str(command_id) if command_id is not None else "-"
-    sess_id_str = str(session_id) if session_id is not None else "-"
+    get_recorder().record(location, timestamp_ns, command_id)
 
-    print(
-        f"TIMING,{location},{timestamp_ns},{client_id},{cmd_id_str},{sess_id_str},{context}",
-        file=sys.stderr,
-        flush=True,
-    )
+
+# Key placement lives in iocl.keyspace (memoized, optionally table-backed)
+_hash_key_to_int = hash_key
+
+# Per-op wait statistics: op -> [fast, spin, slow, spin iterations]
+FAST_PATH, SPIN_PATH, SLOW_PATH, SPIN_ITERATIONS = range(4)
+_wait_stats = collections.defaultdict(lambda: [0, 0, 0, 0])
+# Operation of each in-flight command, so completions can be attributed.
+# Command ids are only unique within a session, so entries are keyed by
+# (session_id, command_id); logical clients on other threads (IOCL_MPL) share
+# this and _hedge_requests under _command_lock. Commands are only tracked
+# when something reads the entries (_tracking_enabled), so plain runs pay
+# nothing per send.
+_command_ops = {}
+_command_lock = threading.Lock()
+_tracking = None
+
+
+class WaitPolicy:
+    """
+    How await_request waits for a response that is not ready on the first check.
+    It re-polls async_get_response with exponential backoff (initial_backoff_ns
+    doubling up to max_backoff_ns) for up to spin_budget_ns, then blocks on the
+    eventfd. A zero budget blocks immediately.
+    """
+
+    __slots__ = ("spin_budget_ns", "initial_backoff_ns", "max_backoff_ns")
+
+    def __init__(self, spin_budget_ns=0, initial_backoff_ns=1000, max_backoff_ns=20000):
+        self.spin_budget_ns = int(spin_budget_ns)
+        self.initial_backoff_ns = max(int(initial_backoff_ns), 1)
+        self.max_backoff_ns = max(int(max_backoff_ns), self.initial_backoff_ns)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            spin_budget_ns=float(os.environ.get("IOCL_SPIN_BUDGET_US", 0)) * 1000,
+            initial_backoff_ns=float(os.environ.get("IOCL_SPIN_INITIAL_BACKOFF_US", 1)) * 1000,
+            max_backoff_ns=float(os.environ.get("IOCL_SPIN_MAX_BACKOFF_US", 20)) * 1000,
+        )
+
+
+_wait_policy = None
+
+
+def get_wait_policy():
+    """Return the active wait policy, read from the environment on first use."""
+    global _wait_policy
+    if _wait_policy is None:
+        _wait_policy = WaitPolicy.from_env()
+    return _wait_policy
+
+
+def set_wait_policy(policy):
+    global _wait_policy, _tracking
+    _wait_policy = policy
+    _tracking = None
+
+
+def wait_stats():
+    """Per-op counts of fast, spin and slow completions and spin iterations."""
+    return {
+        getattr(op, "name", str(op)): {
+            "fast": counts[FAST_PATH],
+            "spin": counts[SPIN_PATH],
+            "slow": counts[SLOW_PATH],
+            "spin_iterations": counts[SPIN_ITERATIONS],
+        }
+        for op, counts in _wait_stats.items()
+    }
+
+
+def reset_wait_stats():
+    _wait_stats.clear()
+
+
+def _print_stats():
+    if os.environ.get("IOCL_DEBUG_STATS", "false").lower() != "true":
+        return
+    for op, counts in sorted(wait_stats().items()):
+        print(
+            f"#waitstats,{op},{counts['fast']},{counts['spin']},{counts['slow']},{counts['spin_iterations']}",
+            file=sys.stderr,
+        )
+    for op, counts in sorted(hedge_stats().items()):
+        print(
+            f"#hedgestats,{op},{counts['reads']},{counts['hedged']},{counts['hedge_wins']},{counts['hedge_rate']:.4f}",
+            file=sys.stderr,
+        )
+
+
+atexit.register(_print_stats)
+
+
+# Read-only operations that may be duplicated when hedging is enabled
+HEDGEABLE_OPS = frozenset(
+    getattr(Operation, name) for name in ("EXISTS", "GET", "HMGET", "ZREVRANGE") if hasattr(Operation, name)
+)
+# Per-op hedge statistics: op -> [reads, hedges issued, hedge wins]
+HEDGE_READS, HEDGE_ISSUED, HEDGE_WINS = range(3)
+_hedge_stats = collections.defaultdict(lambda: [0, 0, 0])
+# (session_id, command_id) -> (operation, key, new_val, old_val, send time ns) for hedgeable reads
+_hedge_requests = {}
+
+
+class HedgePolicy:
+    """
+    Opt-in hedging of read-only requests. Once an op has min_samples completed
+    reads, a read still outstanding after that op's percentile latency is
+    issued a second time and the first response wins.
+    """
+
+    __slots__ = ("enabled", "percentile", "min_samples", "window")
+
+    def __init__(self, enabled=False, percentile=95.0, min_samples=100, window=1000):
+        self.enabled = bool(enabled)
+        self.percentile = float(percentile)
+        self.min_samples = max(int(min_samples), 1)
+        self.window = max(int(window), self.min_samples)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.environ.get("IOCL_HEDGE_READS", "false").lower() == "true",
+            percentile=os.environ.get("IOCL_HEDGE_PERCENTILE", 95),
+            min_samples=os.environ.get("IOCL_HEDGE_MIN_SAMPLES", 100),
+        )
+
+
+class _LatencyTracker:
+    """Sliding window of read latencies for one op and the hedge delay derived from it."""
+
+    __slots__ = ("samples", "count", "hedge_after_ns")
+
+    def __init__(self, window):
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0
+        self.hedge_after_ns = None
+
+    def add(self, latency_ns, policy):
+        self.samples.append(latency_ns)
+        self.count += 1
+        # Recompute the percentile every min_samples completions
+        if self.count % policy.min_samples == 0:
+            ordered = sorted(self.samples)
+            idx = min(int(len(ordered) * policy.percentile / 100), len(ordered) - 1)
+            self.hedge_after_ns = ordered[idx]
+
+
+_hedge_policy = None
+_latency_trackers = {}
+
+
+def _hedge_tracker(operation_enum):
+    tracker = _latency_trackers.get(operation_enum)
+    if tracker is None:
+        tracker = _latency_trackers.setdefault(operation_enum, _LatencyTracker(get_hedge_policy().window))
+    return tracker
+
+
+def _send_hedge(session_id, request):
+    """Issue the duplicate of a hedgeable read; returns its command id, or None if the send failed."""
+    operation_enum, key_int, new_val, old_val, _ = request
+    _hedge_stats[operation_enum][HEDGE_ISSUED] += 1
+    ok, hedge_id = async_send_request(session_id, operation_enum, key_int, new_val, old_val)
+    return _command_id_to_int(hedge_id) if ok else None
+
+
+def get_hedge_policy():
+    """Return the active hedge policy, read from the environment on first use."""
+    global _hedge_policy
+    if _hedge_policy is None:
+        _hedge_policy = HedgePolicy.from_env()
+    return _hedge_policy
 
 
-def _hash_key_to_int(key):
-    if isinstance(key, str):
-        # Use md5 for deterministic hash, take first 8 bytes as integer
-        h = hashlib.md5(key.encode("utf-8")).digest()
-        return int.from_bytes(h[:8], "big")
-    return key
+def set_hedge_policy(policy):
+    global _hedge_policy, _tracking
+    _hedge_policy = policy
+    _latency_trackers.clear()
+    _tracking = None
+
+
+def hedge_stats():
+    """Per-op hedged read counts, hedge rate, and how often the duplicate won."""
+    return {
+        getattr(op, "name", str(op)): {
+            "reads": counts[HEDGE_READS],
+            "hedged": counts[HEDGE_ISSUED],
+            "hedge_wins": counts[HEDGE_WINS],
+            "hedge_rate": counts[HEDGE_ISSUED] / counts[HEDGE_READS] if counts[HEDGE_READS] else 0.0,
+        }
+        for op, counts in _hedge_stats.items()
+    }
+
+
+def _tracking_enabled():
+    """
+    Whether in-flight commands are tracked: only per-op wait stats
+    (IOCL_DEBUG_STATS), hedging and tracing read the entries. Resolved on first
+    use and again after set_wait_policy / set_hedge_policy.
+    """
+    global _tracking
+    if _tracking is None:
+        debug_stats = os.environ.get("IOCL_DEBUG_STATS", "false").lower() == "true"
+        _tracking = debug_stats or get_hedge_policy().enabled or get_trace_writer() is not None
+    return _tracking
+
+
+def _track_command(session_id, command_id, operation_enum, key_int, new_val, old_val):
+    """Remember what an in-flight command is, for wait stats, hedging and tracing."""
+    if not (_tracking or _tracking is None and _tracking_enabled()):
+        return
+    trace = get_trace_writer()
+    if trace is not None:
+        trace.request(session_id, command_id, operation_enum, key_int, new_val, old_val)
+    hedge = operation_enum in HEDGEABLE_OPS and get_hedge_policy().enabled
+    with _command_lock:
+        _command_ops[(session_id, command_id)] = operation_enum
+        if hedge:
+            _hedge_requests[(session_id, command_id)] = (operation_enum, key_int, new_val, old_val, time.monotonic_ns())
+
+
+def _untrack_command(session_id, command_id):
+    """Forget an in-flight command; returns its operation and hedge request (None if not hedgeable)."""
+    if not _command_ops:
+        # Nothing tracked (or tracking is off); the send happened before this
+        # await, so an entry for this command would already be visible
+        return None, None
+    with _command_lock:
+        operation_enum = _command_ops.pop((session_id, command_id), None)
+        request = _hedge_requests.pop((session_id, command_id), None) if _hedge_requests else None
+    return operation_enum, request
+
+
+def _finish_efd(efd):
+    try:
+        os.read(efd, 8)
+    finally:
+        os.close(efd)
+
+
+# Eventfds we stopped waiting on that the binding may still signal. Closing
+# them right away would let a late signal land on a reused fd number, so they
+# are parked until signalled (or evicted once too many are parked).
+MAX_PARKED_EFDS = 64
+_parked_efds = collections.OrderedDict()
+# Logical clients on other threads (IOCL_MPL) park and reap through the same table
+_parked_lock = threading.Lock()
+
+
+def _park_efd(efd, session_id=None, command_id=None):
+    with _parked_lock:
+        _parked_efds[efd] = (session_id, command_id)
+        if len(_parked_efds) > MAX_PARKED_EFDS:
+            oldest, _ = _parked_efds.popitem(last=False)
+            os.close(oldest)
+
+
+def _reap_parked_efds():
+    """Close parked eventfds that have been signalled and drop abandoned results."""
+    reaped = []
+    with _parked_lock:
+        r, _, _ = select.select(list(_parked_efds), [], [], 0)
+        for efd in r:
+            session_id, command_id = _parked_efds.pop(efd)
+            _finish_efd(efd)
+            reaped.append((session_id, command_id))
+    for session_id, command_id in reaped:
+        if command_id is not None:
+            async_get_response(session_id, command_id)
+
+
+def _await_hedged(session_id, command_id, request, timeout, stats):
+    """
+    Wait for a hedgeable read. If it is still outstanding after the op's hedge
+    delay, send a duplicate and return whichever response lands first; the
+    loser's eventfd is parked, as is every eventfd left on a timeout.
+    """
+    policy = get_hedge_policy()
+    operation_enum, sent_ns = request[0], request[4]
+    tracker = _hedge_tracker(operation_enum)
+    counts = _hedge_stats[operation_enum]
+    counts[HEDGE_READS] += 1
+
+    success, resp = async_get_response(session_id, command_id)
+    if success:
+        stats[FAST_PATH] += 1
+        tracker.add(time.monotonic_ns() - sent_ns, policy)
+        return success, extract_value_by_type(resp)
+
+    stats[SLOW_PATH] += 1
+    if _parked_efds:
+        _reap_parked_efds()
+
+    deadline = time.monotonic() + timeout
+    pending = {_efd_from_response(resp): command_id}
+    try:
+        if tracker.hedge_after_ns is not None:
+            wait = max(sent_ns + tracker.hedge_after_ns - time.monotonic_ns(), 0) / 1e9
+            r, _, _ = select.select(list(pending), [], [], min(wait, timeout))
+            if not r:
+                hedge_id = _send_hedge(session_id, request)
+                if hedge_id is not None:
+                    success, resp = async_get_response(session_id, hedge_id)
+                    if success:
+                        counts[HEDGE_WINS] += 1
+                        tracker.add(time.monotonic_ns() - sent_ns, policy)
+                        return success, extract_value_by_type(resp)
+                    pending[_efd_from_response(resp)] = hedge_id
+
+        r, _, _ = select.select(list(pending), [], [], max(deadline - time.monotonic(), 0))
+        if not r:
+            raise TimeoutError(f"Timeout waiting for command {command_id}")
+        winner_efd = r[0]
+        winner_id = pending.pop(winner_efd)
+        _finish_efd(winner_efd)
+    finally:
+        for efd, loser_id in pending.items():
+            _park_efd(efd, session_id, loser_id)
+
+    if winner_id != command_id:
+        counts[HEDGE_WINS] += 1
+    success, result = async_get_response(session_id, winner_id)
+    if success:
+        tracker.add(time.monotonic_ns() - sent_ns, policy)
+        return success, extract_value_by_type(result)
+    else:
+        raise RuntimeError(f"Failed to retrieve result after unblocking for command {winner_id}")
+
+
+def _spin_for_response(session_id, command_id, resp, policy):
+    """
+    Re-poll async_get_response with exponential backoff until it succeeds or the
+    spin budget runs out. resp is the not-ready response already in hand; only
+    its most recent eventfd is kept. Returns (success, resp, iterations).
+    """
+    now = time.monotonic_ns
+    yield_cpu = getattr(os, "sched_yield", None) or (lambda: time.sleep(0))
+    deadline = now() + policy.spin_budget_ns
+    backoff = policy.initial_backoff_ns
+    iterations = 0
+    while True:
+        t = now()
+        if t >= deadline:
+            return False, resp, iterations
+        pause_until = min(t + backoff, deadline)
+        # sched_yield drops the GIL, so the thread completing the request and
+        # other logical clients can run while this one spins
+        while now() < pause_until:
+            yield_cpu()
+        backoff = min(backoff * 2, policy.max_backoff_ns)
+        iterations += 1
+
+        success, next_resp = async_get_response(session_id, command_id)
+        if success:
+            _park_efd(_efd_from_response(resp))
+            return True, next_resp, iterations
+        if next_resp.str != resp.str:
+            # The binding handed out a new eventfd, so it will not signal the old one
+            os.close(_efd_from_response(resp))
+            resp = next_resp
 
 
 def convert_value_to_python(value):
@@ -76,22 +429,47 @@ def extract_value_by_type(value):
         return None
 
 
+def _resolve_operation(operation):
+    """Map an operation name to redisstore.Operation; enums pass through."""
+    if isinstance(operation, str):
+        op_str = operation.upper()
+        if hasattr(Operation, op_str):
+            return getattr(Operation, op_str)
+        raise ValueError(f"Unknown operation string: {operation}")
+    return operation
+
+
+def _command_id_to_int(command_id):
+    """Normalize the command ID returned by async_send_request."""
+    if type(command_id) is int:
+        return command_id
+    if hasattr(command_id, "type") and command_id.type == ValueType.STRING:
+        try:
+            return int(command_id.str)
+        except ValueError:
+            raise RuntimeError("Invalid Value returned by async_send_request")
+    return int(command_id)
+
+
 def send_request_and_await(session_id, operation, key, new_val, old_val):
     """
     Sends a request to C++ layer and BLOCKS until the response is ready.
     """
-    # If operation is a string, map to redisstore.Operation
-    if isinstance(operation, str):
-        op_str = operation.upper()
-        if hasattr(Operation, op_str):
-            operation_enum = getattr(Operation, op_str)
-        else:
-            raise ValueError(f"Unknown operation string: {operation}")
-    else:
-        operation_enum = operation
+    command_id = send_request(session_id, operation, key, new_val, old_val)
+    return await_request(session_id, command_id)
+
+
+def send_request(session_id, operation, key, new_val="", old_val=""):
+    """
+    Sends a request to C++ layer and returns immediately with the command ID.
+    """
+    operation_enum = _resolve_operation(operation)
 
     key_int = _hash_key_to_int(key)
 
+    if ENABLE_TIMING:
+        t_before_send = _ns_timestamp()
+
     success, command_id = async_send_request(
         session_id, operation_enum, key_int, new_val, old_val
     )
@@ -99,21 +477,17 @@ def send_request_and_await(session_id, operation, key, new_val, old_val):
     if not success:
         raise RuntimeError("AsyncSendRequest failed")
 
-    if hasattr(command_id, "type") and command_id.type == ValueType.STRING:
-        try:
-            command_id = int(command_id.str)
-        except ValueError:
-            raise RuntimeError("Invalid Value object returned by async_send_request")
-
-    command_id = int(command_id)
+    command_id = _command_id_to_int(command_id)
+    _track_command(session_id, command_id, operation_enum, key_int, new_val, old_val)
 
-    # FIRST TRY
-    success, resp = async_get_response(session_id, command_id)
+    if ENABLE_TIMING:
+        _log_timing("PY_SEND_REQUEST_BEFORE_ASYNC_SEND", t_before_send, command_id=command_id)
+        _log_timing("PY_SEND_REQUEST_AFTER_ASYNC_SEND", _ns_timestamp(), command_id=command_id)
+    return command_id
 
-    if success:
-        return success, extract_value_by_type(resp)
 
-    # Must wait using eventfd
+def _efd_from_response(resp):
+    """Parse and validate the eventfd returned by a pending async_get_response."""
     try:
         efd = int(resp.str)
     except ValueError:
@@ -125,85 +499,216 @@ def send_request_and_await(session_id, operation, key, new_val, old_val):
         fcntl.fcntl(efd, fcntl.F_GETFD)
     except OSError as e:
         raise RuntimeError(f"EFD {efd} is invalid: {e}")
+    return efd
 
-    timeout = 20
-    r, _, _ = select.select([efd], [], [], timeout)
 
-    if not r:
-        os.close(efd)
-        raise TimeoutError(f"Timeout waiting for command {command_id}")
+class Completions:
+    """
+    Outstanding requests behind a single poller. Requests can be added while
+    others are being waited on; next() returns (command_id, (success, result))
+    for whichever lands first.
+    """
 
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self._ready = collections.deque()
+        # efd -> (command_id, id of the request signalling it: the command or its hedge)
+        self._pending = {}
+        # Hedgeable reads still outstanding, and when each should be hedged
+        self._reads = {}
+        self._hedge_at = {}
+        self._epoll = select.epoll() if hasattr(select, "epoll") else None
+
+    def __len__(self):
+        return len(self._ready) + len({command_id for command_id, _ in self._pending.values()})
+
+    def add(self, command_id):
+        operation_enum, request = _untrack_command(self.session_id, command_id)
+        stats = _wait_stats[operation_enum]
+        if request is not None:
+            _hedge_stats[operation_enum][HEDGE_READS] += 1
+            self._reads[command_id] = request
+        success, resp = async_get_response(self.session_id, command_id)
+        if success:
+            stats[FAST_PATH] += 1
+            self._finish(command_id, command_id, (success, extract_value_by_type(resp)))
+            return
+        stats[SLOW_PATH] += 1
+        self._watch(_efd_from_response(resp), command_id, command_id)
+        if request is not None:
+            hedge_after_ns = _hedge_tracker(operation_enum).hedge_after_ns
+            if hedge_after_ns is not None:
+                self._hedge_at[command_id] = request[4] + hedge_after_ns
+
+    def _watch(self, efd, command_id, sent_id):
+        self._pending[efd] = (command_id, sent_id)
+        if self._epoll is not None:
+            self._epoll.register(efd, select.EPOLLIN)
+
+    def _unwatch(self, efd):
+        if self._epoll is not None:
+            self._epoll.unregister(efd)
+        return self._pending.pop(efd)
+
+    def _finish(self, command_id, sent_id, reply):
+        trace = get_trace_writer()
+        if trace is not None:
+            trace.request_done(self.session_id, command_id)
+        request = self._reads.pop(command_id, None)
+        if request is not None:
+            self._hedge_at.pop(command_id, None)
+            # Whichever of the read and its hedge lost may still be signalled
+            for efd in [efd for efd, (cid, _) in self._pending.items() if cid == command_id]:
+                _, loser_id = self._unwatch(efd)
+                _park_efd(efd, self.session_id, loser_id)
+            if sent_id != command_id:
+                _hedge_stats[request[0]][HEDGE_WINS] += 1
+            _hedge_tracker(request[0]).add(time.monotonic_ns() - request[4], get_hedge_policy())
+        self._ready.append((command_id, reply))
+
+    def _send_hedges(self):
+        now = time.monotonic_ns()
+        for command_id, hedge_at in list(self._hedge_at.items()):
+            if hedge_at > now:
+                continue
+            del self._hedge_at[command_id]
+            hedge_id = _send_hedge(self.session_id, self._reads[command_id])
+            if hedge_id is None:
+                continue
+            success, resp = async_get_response(self.session_id, hedge_id)
+            if success:
+                self._finish(command_id, hedge_id, (success, extract_value_by_type(resp)))
+            else:
+                self._watch(_efd_from_response(resp), command_id, hedge_id)
+
+    def _poll(self, timeout):
+        if self._epoll is not None:
+            return [efd for efd, _ in self._epoll.poll(timeout)]
+        r, _, _ = select.select(list(self._pending), [], [], timeout)
+        return r
+
+    def next(self, timeout=20):
+        deadline = time.monotonic() + max(timeout, 0)
+        while not self._ready:
+            if not self._pending:
+                raise RuntimeError("No outstanding requests")
+            wait = deadline - time.monotonic()
+            if self._hedge_at:
+                wait = min(wait, (min(self._hedge_at.values()) - time.monotonic_ns()) / 1e9)
+            efds = self._poll(max(wait, 0))
+            for efd in efds:
+                if efd not in self._pending:
+                    # Parked by _finish earlier in this loop
+                    continue
+                command_id, sent_id = self._unwatch(efd)
+                _finish_efd(efd)
+                success, result = async_get_response(self.session_id, sent_id)
+                if not success:
+                    raise RuntimeError(f"Failed to retrieve result after unblocking for command {sent_id}")
+                self._finish(command_id, sent_id, (success, extract_value_by_type(result)))
+            if self._hedge_at:
+                self._send_hedges()
+            if not efds and not self._ready and time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Timeout waiting for commands {sorted({cid for cid, _ in self._pending.values()})}"
+                )
+        return self._ready.popleft()
+
+    def close(self):
+        # Requests still outstanding (after a failure) may yet signal their eventfds
+        for efd, (_, sent_id) in list(self._pending.items()):
+            self._unwatch(efd)
+            _park_efd(efd, self.session_id, sent_id)
+        self._reads.clear()
+        self._hedge_at.clear()
+        if self._epoll is not None:
+            self._epoll.close()
+
+
+def iter_await_many(session_id, command_ids, timeout=20):
+    """
+    Waits for many previously sent requests with one poller.
+    Yields (command_id, (success, result)) in completion order.
+    """
+    completions = Completions(session_id)
     try:
-        os.read(efd, 8)
+        for command_id in command_ids:
+            completions.add(command_id)
+        deadline = time.monotonic() + timeout
+        while completions:
+            yield completions.next(deadline - time.monotonic())
     finally:
-        os.close(efd)
+        completions.close()
 
-    # SECOND GET_RESPONSE
-    success, result = async_get_response(session_id, command_id)
 
-    if success:
-        return success, extract_value_by_type(result)
-    else:
-        raise RuntimeError(f"Failed to retrieve result after unblocking for command {command_id}")
-
-
-def send_request(session_id, operation, key, new_val="", old_val=""):
+def await_many(session_id, command_ids, timeout=20):
     """
-    Sends a request to C++ layer and returns immediately with the command ID.
+    Waits for many previously sent requests and returns their
+    (success, result) tuples in the order of command_ids.
     """
-    if isinstance(operation, str):
-        op_str = operation.upper()
-        if hasattr(Operation, op_str):
-            operation_enum = getattr(Operation, op_str)
-        else:
-            raise ValueError(f"Unknown operation string: {operation}")
-    else:
-        operation_enum = operation
-
-    key_int = _hash_key_to_int(key)
-
-    success, command_id = async_send_request(
-        session_id, operation_enum, key_int, new_val, old_val
-    )
-
-    if not success:
-        raise RuntimeError("AsyncSendRequest failed")
-
-    if hasattr(command_id, "type") and command_id.type == ValueType.STRING:
-        try:
-            command_id = int(command_id.str)
-        except ValueError:
-            raise RuntimeError("Invalid Value returned by async_send_request")
-
-    return int(command_id)
+    command_ids = list(command_ids)
+    results = dict(iter_await_many(session_id, command_ids, timeout))
+    return [results[command_id] for command_id in command_ids]
 
 
 def await_request(session_id, command_id, timeout=20):
     """
     Waits for the result of a previously sent request.
+    Spins on async_get_response per the wait policy, then blocks on the eventfd.
     """
+    reply = _await_one(session_id, command_id, timeout)
+    trace = get_trace_writer()
+    if trace is not None:
+        trace.request_done(session_id, command_id)
+    return reply
+
+
+def _await_one(session_id, command_id, timeout):
+    operation_enum, request = _untrack_command(session_id, command_id)
+    stats = _wait_stats[operation_enum]
+    if request is not None:
+        return _await_hedged(session_id, command_id, request, timeout, stats)
+
+    if ENABLE_TIMING:
+        _log_timing("PY_AWAIT_REQUEST_BEFORE_GET_RESPONSE", _ns_timestamp(), command_id=command_id)
 
     success, resp = async_get_response(session_id, command_id)
 
+    if ENABLE_TIMING:
+        _log_timing("PY_AWAIT_REQUEST_AFTER_GET_RESPONSE", _ns_timestamp(), command_id=command_id)
+
     if success:
+        stats[FAST_PATH] += 1
+        if ENABLE_TIMING:
+            _log_timing("PY_AWAIT_REQUEST_EXIT_FAST", _ns_timestamp(), command_id=command_id)
         return success, extract_value_by_type(resp)
 
-    try:
-        efd = int(resp.str)
-    except ValueError:
-        raise RuntimeError(f"Expected efd string, got {resp}")
+    policy = get_wait_policy()
+    if policy.spin_budget_ns > 0:
+        success, resp, iterations = _spin_for_response(session_id, command_id, resp, policy)
+        stats[SPIN_ITERATIONS] += iterations
+        if success:
+            stats[SPIN_PATH] += 1
+            if ENABLE_TIMING:
+                _log_timing("PY_AWAIT_REQUEST_EXIT_SPIN", _ns_timestamp(), command_id=command_id)
+            return success, extract_value_by_type(resp)
 
-    import fcntl
+    stats[SLOW_PATH] += 1
+    if _parked_efds:
+        _reap_parked_efds()
+    efd = _efd_from_response(resp)
 
-    try:
-        fcntl.fcntl(efd, fcntl.F_GETFD)
-    except OSError as e:
-        raise RuntimeError(f"EFD {efd} is invalid: {e}")
+    if ENABLE_TIMING:
+        _log_timing("PY_AWAIT_REQUEST_BEFORE_SELECT", _ns_timestamp(), command_id=command_id)
 
     r, _, _ = select.select([efd], [], [], timeout)
 
+    if ENABLE_TIMING:
+        _log_timing("PY_AWAIT_REQUEST_AFTER_SELECT", _ns_timestamp(), command_id=command_id)
+
     if not r:
-        os.close(efd)
+        # The binding may still signal it, so it is parked rather than closed
+        _park_efd(efd, session_id, command_id)
         raise TimeoutError(f"Timeout waiting for command {command_id}")
 
     try:
@@ -211,10 +716,79 @@ def await_request(session_id, command_id, timeout=20):
     finally:
         os.close(efd)
 
+    if ENABLE_TIMING:
+        _log_timing("PY_AWAIT_REQUEST_AFTER_EFD_READ", _ns_timestamp(), command_id=command_id)
+
     success, result = async_get_response(session_id, command_id)
 
     if success:
+        if ENABLE_TIMING:
+            _log_timing("PY_AWAIT_REQUEST_EXIT_SLOW", _ns_timestamp(), command_id=command_id)
         return success, extract_value_by_type(result)
     else:
         raise RuntimeError(f"Failed to retrieve result after unblocking for command {command_id}")
 
+
+def send_batch(session_id, requests):
+    """
+    Submits a group of independent requests back-to-back.
+    Each request is (operation, key[, new_val[, old_val]]); returns the
+    command IDs in submission order.
+    """
+    command_ids = []
+    for request in requests:
+        operation, key, new_val, old_val = (tuple(request) + ("", ""))[:4]
+        operation_enum = _resolve_operation(operation)
+        key_int = _hash_key_to_int(key)
+        success, command_id = async_send_request(
+            session_id, operation_enum, key_int, new_val, old_val
+        )
+        if not success:
+            raise RuntimeError("AsyncSendRequest failed")
+        command_id = _command_id_to_int(command_id)
+        _track_command(session_id, command_id, operation_enum, key_int, new_val, old_val)
+        command_ids.append(command_id)
+    return command_ids
+
+
+def await_batch(session_id, command_ids, timeout=20):
+    """
+    Waits for a batch from send_batch with one wait for the whole group and
+    returns (success, result) tuples in submission order.
+    """
+    return await_many(session_id, command_ids, timeout)
+
+
+class PreparedRequest:
+    """
+    A request shape (session, operation, key) resolved once, for hot loops that
+    issue the same shape repeatedly. send() goes straight to async_send_request.
+    """
+
+    __slots__ = ("session_id", "operation", "key")
+
+    def __init__(self, session_id, operation, key):
+        self.session_id = session_id
+        self.operation = _resolve_operation(operation)
+        self.key = _hash_key_to_int(key)
+
+    def send(self, new_val="", old_val=""):
+        success, command_id = async_send_request(
+            self.session_id, self.operation, self.key, new_val, old_val
+        )
+        if not success:
+            raise RuntimeError("AsyncSendRequest failed")
+        command_id = _command_id_to_int(command_id)
+        _track_command(self.session_id, command_id, self.operation, self.key, new_val, old_val)
+        return command_id
+
+    def send_and_await(self, new_val="", old_val="", timeout=20):
+        return await_request(self.session_id, self.send(new_val, old_val), timeout)
+
+
+def prepare(session_id, operation, key):
+    """
+    Resolves the Operation enum and hashed key once and returns a reusable
+    PreparedRequest.
+    """
+    return PreparedRequest(session_id, operation, key)
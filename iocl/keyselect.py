@@ -0,0 +1,158 @@
+import functools
+import os
+import numpy as np
+
+# Key selectors for the workload drivers: which user or room id an op touches.
+# Skewed distributions are sampled through Vose alias tables, so a draw costs
+# one uniform index and one coin flip however skewed the distribution is.
+# Draws are generated in blocks, like iocl/opstream.py.
+#
+#   uniform   every id in [0, num_keys) equally likely
+#   zipfian   P(id = k) proportional to 1 / (k + 1) ** s
+#   hotspot   hot_fraction of the ids get hot_probability of the draws
+#   latest    zipfian over recency: ids just behind a head that advances on
+#             every insert (advance()) are the most popular
+
+SELECTORS = ("uniform", "zipfian", "hotspot", "latest")
+DEFAULT_BLOCK_SIZE = 4096
+
+
+class AliasTable:
+    """
+    Vose alias table over the ids 0..len(weights)-1. Built in NumPy: each round
+    pairs every underfull id with the overfull id whose cumulative excess
+    covers its cumulative deficit, and overfull ids drained below 1 go round
+    again as underfull ones.
+    """
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        n = len(weights)
+        scaled = weights * (n / weights.sum())
+        prob = np.ones(n)
+        alias = np.arange(n, dtype=np.int64)
+        small = np.flatnonzero(scaled < 1.0)
+        large = np.flatnonzero(scaled >= 1.0)
+        while small.size and large.size:
+            # Total deficit equals total excess, so running past the last
+            # overfull id is rounding error; it absorbs that
+            owner = np.searchsorted(np.cumsum(scaled[large] - 1.0), np.cumsum(1.0 - scaled[small]))
+            owner = np.minimum(owner, large.size - 1)
+            prob[small] = scaled[small]
+            alias[small] = large[owner]
+            scaled[large] -= np.bincount(owner, weights=1.0 - scaled[small], minlength=large.size)
+            drained = scaled[large] < 1.0
+            small = large[drained]
+            large = large[~drained]
+        self.prob = prob
+        self.alias = alias
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, rng, size):
+        i = rng.integers(0, len(self.prob), size)
+        return np.where(rng.random(size) < self.prob[i], i, self.alias[i])
+
+
+@functools.lru_cache(maxsize=None)
+def zipfian_table(num_keys, s):
+    return AliasTable(1.0 / np.arange(1, num_keys + 1, dtype=np.float64) ** s)
+
+
+@functools.lru_cache(maxsize=None)
+def hotspot_table(num_keys, hot_fraction, hot_probability):
+    hot = min(max(int(num_keys * hot_fraction), 1), num_keys)
+    weights = np.full(num_keys, (1.0 - hot_probability) / max(num_keys - hot, 1))
+    weights[:hot] = hot_probability / hot
+    return AliasTable(weights)
+
+
+class KeySelector:
+    """Ids drawn from table (or uniformly when table is None), block_size at a time."""
+
+    def __init__(self, num_keys, rng, table=None, block_size=DEFAULT_BLOCK_SIZE):
+        self.num_keys = int(num_keys)
+        self.table = table
+        self.block_size = int(block_size)
+        self._rng = rng
+        self._block = []
+        self._pos = 0
+
+    def _draw(self):
+        if self.table is None:
+            return self._rng.integers(0, self.num_keys, self.block_size)
+        return self.table.sample(self._rng, self.block_size)
+
+    def next(self):
+        if self._pos >= len(self._block):
+            self._block = self._draw().tolist()
+            self._pos = 0
+        key = self._block[self._pos]
+        self._pos += 1
+        return key
+
+    def advance(self):
+        """Called after an insert; only the latest selector cares."""
+
+
+class LatestSelector(KeySelector):
+    def __init__(self, num_keys, rng, table, block_size=DEFAULT_BLOCK_SIZE):
+        super().__init__(num_keys, rng, table, block_size)
+        self.head = 0
+
+    def next(self):
+        return (self.head - super().next()) % self.num_keys
+
+    def advance(self):
+        self.head = (self.head + 1) % self.num_keys
+
+
+def make_selector(name, num_keys, seed=0, clientid=0, stream=0, zipf_s=0.99,
+                  hot_fraction=0.2, hot_probability=0.8, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Build a selector. Each (seed, clientid, stream) gets its own generator, so
+    a driver can keep separate, reproducible selectors for users and rooms.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence([int(seed), int(clientid), int(stream)]))
+    if name == "uniform":
+        return KeySelector(num_keys, rng, None, block_size)
+    elif name == "zipfian":
+        return KeySelector(num_keys, rng, zipfian_table(num_keys, zipf_s), block_size)
+    elif name == "hotspot":
+        return KeySelector(num_keys, rng, hotspot_table(num_keys, hot_fraction, hot_probability), block_size)
+    elif name == "latest":
+        return LatestSelector(num_keys, rng, zipfian_table(num_keys, zipf_s), block_size)
+    raise ValueError(f"Unknown key selector: {name}")
+
+
+def zipf_s_from_env(default=0.99):
+    """
+    Zipf exponent from client_zipf_coefficient, else the older client_zipfian_s
+    setting, else default. An explicit 0 is kept (uniform).
+    """
+    for name in ("IOCL_CLIENT_ZIPF_COEFFICIENT", "IOCL_CLIENT_ZIPFIAN_S"):
+        value = os.environ.get(name)
+        if value is not None and value != "":
+            return float(value)
+    return default
+
+
+def selector_from_env(clientid=0, stream=0):
+    """
+    Selector named by IOCL_CLIENT_KEY_SELECTOR over IOCL_CLIENT_NUM_KEYS ids,
+    or None when no selector is configured.
+    """
+    name = os.environ.get("IOCL_CLIENT_KEY_SELECTOR", "")
+    if not name:
+        return None
+    return make_selector(
+        name,
+        int(os.environ.get("IOCL_CLIENT_NUM_KEYS", 1000000)),
+        seed=int(os.environ.get("IOCL_CLIENT_SEED", 0) or 0),
+        clientid=clientid,
+        stream=stream,
+        zipf_s=zipf_s_from_env(),
+        hot_fraction=float(os.environ.get("IOCL_CLIENT_HOTSPOT_FRACTION", 0.2)),
+        hot_probability=float(os.environ.get("IOCL_CLIENT_HOTSPOT_PROBABILITY", 0.8)),
+    )
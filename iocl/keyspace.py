@@ -0,0 +1,193 @@
+import argparse
+import fcntl
+import functools
+import hashlib
+import mmap
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Canonical key -> int placement shared by iocl_utils and wrappers/app_request.
+# The binding takes an int64_t key and formats it with std::to_string, so both
+# callers must hand it the same signed value:
+#
+#   "123"         an all-ASCII-digit key in int64 range is that integer
+#   other str     first 8 bytes of its MD5 digest, big-endian, read as int64
+#   int           passes through unchanged
+
+HASH_CACHE_SIZE = int(os.environ.get("IOCL_KEY_HASH_CACHE_SIZE", 65536))
+
+# Key families of the chat workload, in table order.
+KEY_FAMILIES = ("user:{}", "room:{}", "user:{}:rooms")
+# Keys hashed per table-build task
+BUILD_CHUNK = 1 << 18
+INT64_MAX = 2**63 - 1
+
+_table = None
+
+
+def _md5_hash(key):
+    h = hashlib.md5(key.encode("utf-8")).digest()
+    return int.from_bytes(h[:8], "big", signed=True)
+
+
+def _digit_key(key):
+    """The integer an all-ASCII-digit key stands for, or None."""
+    if key.isascii() and key.isdigit():
+        i = int(key)
+        if i <= INT64_MAX:
+            return i
+    return None
+
+
+class KeyspaceTable:
+    """
+    Read-only, memory-mapped table of precomputed hashes for the workload key
+    universe: num_keys entries for each of KEY_FAMILIES, stored as int64.
+    """
+
+    def __init__(self, path, num_keys):
+        self.path = path
+        self.num_keys = num_keys
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._hashes = memoryview(self._mmap).cast("q")
+        if len(self._hashes) != len(KEY_FAMILIES) * num_keys:
+            raise ValueError(f"Keyspace table {path} does not match num_keys={num_keys}")
+
+    def slot(self, key):
+        """Return the table index for key, or None if it is outside the universe."""
+        family, _, rest = key.partition(":")
+        idx, sep, tail = rest.partition(":")
+        if family == "user" and not sep:
+            base = 0
+        elif family == "room" and not sep:
+            base = self.num_keys
+        elif family == "user" and tail == "rooms":
+            base = 2 * self.num_keys
+        else:
+            return None
+        # Only canonical ASCII decimals ("7", not "07" or Unicode digits) are
+        # table keys; anything else hashes as a plain string
+        if not (idx.isascii() and idx.isdigit()):
+            return None
+        i = int(idx)
+        if str(i) != idx:
+            return None
+        if i >= self.num_keys:
+            return None
+        return base + i
+
+    def lookup(self, key):
+        slot = self.slot(key)
+        if slot is None:
+            return None
+        return self._hashes[slot]
+
+    def close(self):
+        self._hashes.release()
+        self._mmap.close()
+
+
+def _hash_range(family, start, stop):
+    """Table entries for family keys start..stop-1, as native-endian int64 bytes."""
+    md5 = hashlib.md5
+    template = family.replace("{}", "%d").encode("ascii")
+    digests = b"".join([md5(template % i).digest()[:8] for i in range(start, stop)])
+    return np.frombuffer(digests, dtype=">i8").astype(np.int64).tobytes()
+
+
+def _build_table(path, num_keys, workers=None):
+    tasks = [
+        (family, start, min(start + BUILD_CHUNK, num_keys))
+        for family in KEY_FAMILIES
+        for start in range(0, num_keys, BUILD_CHUNK)
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".keyspace-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    for chunk in pool.map(_hash_range, *zip(*tasks)):
+                        f.write(chunk)
+            else:
+                for task in tasks:
+                    f.write(_hash_range(*task))
+        # mkstemp creates the file 0600; every client on the node maps it
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def default_table_path(num_keys):
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, f"iocl_keyspace_md5_{num_keys}.bin")
+
+
+def build_table(num_keys, path=None, workers=None):
+    """
+    Build the hash table for num_keys unless it already exists; returns its
+    path. Building is serialized with a lock file, so concurrent clients end
+    up sharing one copy. The runner (or `python -m iocl.keyspace`) builds it
+    ahead of a run so clients find it in place.
+    """
+    num_keys = int(num_keys)
+    path = path or default_table_path(num_keys)
+    if not os.path.exists(path):
+        with open(path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if not os.path.exists(path):
+                _build_table(path, num_keys, workers)
+    return path
+
+
+def attach_table(num_keys, path=None):
+    """Map the precomputed hash table for num_keys, building it first if no other process on this node has."""
+    global _table
+    num_keys = int(num_keys)
+    path = build_table(num_keys, path)
+    if _table is not None:
+        _table.close()
+    _table = KeyspaceTable(path, num_keys)
+    return _table
+
+
+def attach_table_from_env():
+    """Attach the table for IOCL_CLIENT_NUM_KEYS, if it is set."""
+    num_keys = os.environ.get("IOCL_CLIENT_NUM_KEYS")
+    if not num_keys:
+        return None
+    return attach_table(num_keys)
+
+
+@functools.lru_cache(maxsize=HASH_CACHE_SIZE)
+def hash_key(key):
+    """Map a key to its signed int64 placement. Memoized with a bounded LRU."""
+    if isinstance(key, str):
+        i = _digit_key(key)
+        if i is not None:
+            return i
+        if _table is not None:
+            h = _table.lookup(key)
+            if h is not None:
+                return h
+        return _md5_hash(key)
+    return key
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the keyspace hash table ahead of a run")
+    parser.add_argument("num_keys", type=int, help="Keys per family (client_num_keys)")
+    parser.add_argument("--path", default=None, help="Table path (default: per-node shared path)")
+    parser.add_argument("--workers", type=int, default=None, help="Build processes (default: CPU count)")
+    args = parser.parse_args(argv)
+    print(build_table(args.num_keys, args.path, args.workers))
+
+
+if __name__ == "__main__":
+    main()
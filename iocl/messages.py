@@ -0,0 +1,205 @@
+import json
+import os
+import sys
+from collections.abc import Mapping
+
+# Chat message encoding for room entries (sorted-set members and PUT values).
+# Messages are written as JSON, or with IOCL_CLIENT_MESSAGE_ENCODING=compact
+# in a versioned compact form; readers accept both, so existing JSON entries
+# stay readable.
+#
+# The store carries values as text, so the compact form is a string whose
+# structure uses code points below 0x80 (one byte each on the wire):
+#
+#   "\x01"                       version 1 (JSON entries start with "{")
+#   then per field: tag, payload
+#     "f" / "r"   from / roomId as a non-negative int: varint
+#     "F" / "R"   from / roomId as a string: varint length, characters
+#     "d"         date: microseconds since the epoch, 13 hex digits
+#     "m"         message: varint length, characters
+#
+# Varints are little-endian six-bit groups; 0x40 marks that more follow.
+#
+# get_messages returns MessageView objects: read-only mappings over the
+# stored string that decode a field the first time it is read, with user and
+# room ids interned.
+
+VERSION = "\x01"
+ENCODINGS = ("json", "compact")
+DATE_DIGITS = 13
+INTERN_LIMIT = 1 << 16
+
+_FIELD_NAMES = {"from", "date", "message", "roomId"}
+_ids = {}
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if type(value) is not int:
+        return value
+    interned = _ids.get(value)
+    if interned is None:
+        if len(_ids) >= INTERN_LIMIT:
+            return value
+        _ids[value] = interned = value
+    return interned
+
+
+def _put_varint(out, n):
+    while n >= 0x40:
+        out.append(chr(0x40 | (n & 0x3F)))
+        n >>= 6
+    out.append(chr(n))
+
+
+def _get_varint(s, pos):
+    c = ord(s[pos])
+    if c < 0x40:
+        return c, pos + 1
+    n = shift = 0
+    while True:
+        c = ord(s[pos])
+        pos += 1
+        n |= (c & 0x3F) << shift
+        if c < 0x40:
+            return n, pos
+        shift += 6
+
+
+def _put_id(out, tag, value):
+    if type(value) is int and value >= 0:
+        out.append(tag)
+        _put_varint(out, value)
+    else:
+        value = str(value)
+        out.append(tag.upper())
+        _put_varint(out, len(value))
+        out.append(value)
+
+
+def encode_compact(message):
+    """Compact form of message; JSON when it has fields or a date the format cannot hold."""
+    if message.keys() != _FIELD_NAMES or not isinstance(message["date"], (int, float)):
+        return json.dumps(message)
+    micros = int(round(message["date"] * 1e6))
+    if not 0 <= micros < 16**DATE_DIGITS:
+        return json.dumps(message)
+    out = [VERSION]
+    _put_id(out, "f", message["from"])
+    _put_id(out, "r", message["roomId"])
+    out.append("d%013x" % micros)
+    text = str(message["message"])
+    out.append("m")
+    _put_varint(out, len(text))
+    out.append(text)
+    return "".join(out)
+
+
+def message_encoding():
+    encoding = os.environ.get("IOCL_CLIENT_MESSAGE_ENCODING", "") or "json"
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown message encoding: {encoding}")
+    return encoding
+
+
+def encode_message(message):
+    """Stored form of a {"from", "date", "message", "roomId"} message."""
+    if message_encoding() == "compact":
+        return encode_compact(message)
+    return json.dumps(message)
+
+
+_FIELDS = {"f": "from", "F": "from", "r": "roomId", "R": "roomId", "d": "date", "m": "message"}
+
+
+def _scan(raw):
+    """Field name -> (tag, payload start) for a compact entry, without decoding payloads."""
+    offsets = {}
+    pos = 1
+    end = len(raw)
+    while pos < end:
+        tag = raw[pos]
+        name = _FIELDS.get(tag)
+        if name is None:
+            raise ValueError(f"Unknown message field tag {tag!r}")
+        offsets[name] = (tag, pos + 1)
+        if tag == "d":
+            pos += 1 + DATE_DIGITS
+        else:
+            n, pos = _get_varint(raw, pos + 1)
+            if tag not in "fr":
+                pos += n
+    return offsets
+
+
+def _decode_field(raw, tag, pos):
+    if tag in "fr":
+        return _intern(_get_varint(raw, pos)[0])
+    if tag == "d":
+        return int(raw[pos:pos + DATE_DIGITS], 16) / 1e6
+    length, pos = _get_varint(raw, pos)
+    value = raw[pos:pos + length]
+    return _intern(value) if tag in "FR" else value
+
+
+class MessageView(Mapping):
+    """Read-only message over a stored entry (compact or JSON), decoded field by field."""
+
+    __slots__ = ("raw", "_offsets", "_fields")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._offsets = None
+        self._fields = None if raw.startswith(VERSION) else {}
+
+    def _load(self):
+        if self._fields is None:
+            self._offsets = _scan(self.raw)
+            self._fields = {}
+        elif not self._fields and self._offsets is None:
+            # JSON entries can only be decoded whole
+            fields = json.loads(self.raw)
+            for name in ("from", "roomId"):
+                if name in fields:
+                    fields[name] = _intern(fields[name])
+            self._fields = fields
+            self._offsets = {}
+
+    def __getitem__(self, name):
+        self._load()
+        fields = self._fields
+        if name in fields:
+            return fields[name]
+        offset = self._offsets.get(name)
+        if offset is None:
+            raise KeyError(name)
+        fields[name] = value = _decode_field(self.raw, *offset)
+        return value
+
+    def __iter__(self):
+        self._load()
+        return iter(self._offsets or self._fields)
+
+    def __len__(self):
+        self._load()
+        return len(self._offsets or self._fields)
+
+    def json(self):
+        """The message as a JSON string, as it used to be stored."""
+        if not self.raw.startswith(VERSION):
+            return self.raw
+        return json.dumps(dict(self))
+
+    def __repr__(self):
+        return f"MessageView({dict(self)!r})"
+
+
+def decode_messages(reply):
+    """A ZREVRANGE reply with its entries wrapped in MessageViews; the reply shape is kept."""
+    if isinstance(reply, tuple) and len(reply) == 2:
+        success, entries = reply
+        return (success, decode_messages(entries))
+    if isinstance(reply, (list, tuple)):
+        return [MessageView(entry) if isinstance(entry, str) else entry for entry in reply]
+    return reply
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import threading
+
+# Multi-programming level: run several logical clients in one process, each
+# with its own redisstore session and op stream. Waits block in select/read,
+# which release the GIL, so logical clients overlap their round trips.
+
+
+def get_mpl():
+    """Logical clients per process, from IOCL_MPL (the config's mpl)."""
+    return max(int(os.environ.get("IOCL_MPL", 1) or 1), 1)
+
+
+def asyncio_clients():
+    """Whether logical clients run as coroutines on one event loop (IOCL_CLIENT_ASYNCIO)."""
+    return os.environ.get("IOCL_CLIENT_ASYNCIO", "false").lower() == "true"
+
+
+def logical_client_id(clientid, index, mpl):
+    """
+    Client id reported for logical client index of process clientid. With
+    mpl=1 this is just clientid, so single-client output is unchanged.
+    """
+    return int(clientid) * mpl + index
+
+
+def run_logical_clients(session_id, clientid, target, new_session, mpl=None):
+    """
+    Call target(session_id, logical_clientid) for each of mpl logical clients.
+    Logical client 0 reuses session_id; the others get a session from
+    new_session(). Returns once all of them finish, re-raising the first error.
+    """
+    mpl = mpl or get_mpl()
+    if mpl == 1:
+        target(session_id, logical_client_id(clientid, 0, 1))
+        return
+
+    errors = []
+
+    def run(index, session):
+        try:
+            target(session, logical_client_id(clientid, index, mpl))
+        except BaseException as e:
+            errors.append(e)
+
+    threads = []
+    for index in range(mpl):
+        session = session_id if index == 0 else new_session()
+        thread = threading.Thread(target=run, args=(index, session), name=f"client-{clientid}-{index}")
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def run_logical_clients_asyncio(session_id, clientid, target, new_session, mpl=None):
+    """
+    run_logical_clients for a coroutine target: all mpl logical clients share
+    one event loop on the calling thread, so hundreds of them need no threads.
+    Each still gets its own session; the first error is re-raised.
+    """
+    mpl = mpl or get_mpl()
+    sessions = [session_id] + [new_session() for _ in range(mpl - 1)]
+
+    async def run_all():
+        await asyncio.gather(
+            *(target(session, logical_client_id(clientid, index, mpl)) for index, session in enumerate(sessions))
+        )
+
+    asyncio.run(run_all())
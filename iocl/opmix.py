@@ -0,0 +1,101 @@
+import bisect
+import collections
+import json
+import os
+import time
+
+# Declarative op mix for the workload drivers. The mix is a mapping of op name
+# to relative weight, taken from client_op_mix in the experiment JSON
+# (exported as IOCL_CLIENT_OP_MIX), e.g.
+#
+#   "client_op_mix": {"login": 5, "get_rooms": 10, "send_message": 30,
+#                     "get_messages": 45, "get_online_users": 10}
+#
+# Latencies are reported under the same op names. Without a mix the drivers
+# keep the original 2/8/40/50 split.
+
+DEFAULT_MIX = {
+    "create_user": 2,
+    "create_private_room": 8,
+    "add_message": 40,
+    "get_messages": 50,
+}
+
+# One op a driver can issue: run(session_id, *args) performs it, args(draw1,
+# draw2, users, rooms) builds its arguments from the op stream draws and key
+# selectors, and inserts names the selector ("users" or "rooms") that
+# advances after it runs.
+WorkloadOp = collections.namedtuple("WorkloadOp", ["run", "args", "inserts"])
+
+
+def pick(selector, draw):
+    """An id from selector, or the op stream draw when no selector is configured."""
+    return selector.next() if selector is not None else int(draw)
+
+
+# Argument builders shared by the drivers' op tables
+def no_args(draw1, draw2, users, rooms):
+    return ()
+
+
+def new_user_args(draw1, draw2, users, rooms):
+    return (str(draw1), str(draw2))
+
+
+def user_args(draw1, draw2, users, rooms):
+    return (pick(users, draw1),)
+
+
+def login_args(draw1, draw2, users, rooms):
+    return (str(pick(users, draw1)), "password123")
+
+
+def user_pair_args(draw1, draw2, users, rooms):
+    return (pick(users, draw1), pick(users, draw2))
+
+
+def user_list_args(draw1, draw2, users, rooms):
+    return ([pick(users, draw1), pick(users, draw2)],)
+
+
+def room_args(draw1, draw2, users, rooms):
+    return (pick(rooms, draw1),)
+
+
+def message_args(draw1, draw2, users, rooms):
+    return (pick(rooms, draw1), 44, "heyyy", time.time())
+
+
+def publish_args(draw1, draw2, users, rooms):
+    return ("message", {"from": 44, "message": "heyyy", "roomId": pick(rooms, draw1)})
+
+
+class OpMix:
+    """Maps a uniform draw in [0, 100) to an op name according to the weights."""
+
+    def __init__(self, weights, known_ops=None):
+        weights = {name: float(w) for name, w in weights.items() if float(w) > 0}
+        if not weights:
+            raise ValueError("Op mix has no ops with positive weight")
+        if known_ops is not None:
+            unknown = sorted(set(weights) - set(known_ops))
+            if unknown:
+                raise ValueError(f"Unknown ops in op mix: {', '.join(unknown)}")
+        self.weights = weights
+        self.names = list(weights)
+        total = sum(weights.values())
+        cumulative = 0.0
+        self.thresholds = []
+        for name in self.names:
+            cumulative += weights[name]
+            self.thresholds.append(cumulative * 100.0 / total)
+        self.thresholds[-1] = 100.0
+
+    def select(self, draw):
+        return self.names[min(bisect.bisect_right(self.thresholds, draw), len(self.names) - 1)]
+
+
+def mix_from_env(known_ops=None):
+    """Mix from IOCL_CLIENT_OP_MIX (JSON), or DEFAULT_MIX."""
+    spec = os.environ.get("IOCL_CLIENT_OP_MIX")
+    return OpMix(json.loads(spec) if spec else DEFAULT_MIX, known_ops)
@@ -0,0 +1,51 @@
+import os
+import numpy as np
+
+# Pre-generated randomness for the workload drivers. Draws come from a seeded
+# NumPy generator in blocks and are handed out one row at a time, so the
+# per-op cost is a list index and two runs with the same seed and client id
+# (e.g. mdl vs multi_paxos) issue the same op stream.
+
+DEFAULT_BLOCK_SIZE = 4096
+
+
+class OpStream:
+    """
+    Rows of `columns` uniform draws in [low, high), generated block_size rows
+    at a time from np.random.default_rng(SeedSequence([seed, clientid])).
+    """
+
+    def __init__(self, seed, clientid=0, columns=3, low=0.0, high=100.0, block_size=DEFAULT_BLOCK_SIZE):
+        self.seed = int(seed)
+        self.clientid = int(clientid)
+        self.columns = columns
+        self.low = low
+        self.high = high
+        self.block_size = int(block_size)
+        self._rng = np.random.default_rng(np.random.SeedSequence([self.seed, self.clientid]))
+        self._block = []
+        self._pos = 0
+
+    def _refill(self):
+        # tolist() turns the block into Python floats once, so consuming a row
+        # never touches a NumPy scalar
+        self._block = self._rng.uniform(self.low, self.high, (self.block_size, self.columns)).tolist()
+        self._pos = 0
+
+    def next(self):
+        """Next row of draws, as a list of floats."""
+        if self._pos >= len(self._block):
+            self._refill()
+        row = self._block[self._pos]
+        self._pos += 1
+        return row
+
+
+def op_stream_from_env(clientid=0, columns=3):
+    """Op stream seeded by IOCL_CLIENT_SEED (default 0) and the client id."""
+    return OpStream(
+        int(os.environ.get("IOCL_CLIENT_SEED", 0) or 0),
+        clientid,
+        columns=columns,
+        block_size=int(os.environ.get("IOCL_CLIENT_RANDOM_BLOCK", DEFAULT_BLOCK_SIZE)),
+    )
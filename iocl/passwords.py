@@ -0,0 +1,92 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+# bcrypt hashing off the calling thread. A cost-10 hash is tens of
+# milliseconds of CPU; bcrypt releases the GIL while it works, so running it
+# on a small worker pool lets create_user overlap the hash with its INCR
+# round trip and keeps account-creation bursts from stalling the other
+# logical clients in the process. Login checks have nothing to overlap with
+# and run inline (check_password).
+#
+#   IOCL_BCRYPT_WORKERS   worker threads (default 2)
+#   IOCL_BCRYPT_QUEUE     jobs that may wait for a worker (default 64); once
+#                         full, submitting blocks until a job finishes
+#   IOCL_BCRYPT_ROUNDS    cost factor for new hashes (default 10)
+
+
+class PasswordPool:
+    def __init__(self, workers=2, queue_size=64, rounds=10):
+        self.rounds = int(rounds)
+        self._pool = ThreadPoolExecutor(max_workers=max(int(workers), 1), thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max(int(workers), 1) + max(int(queue_size), 0))
+
+    def _start(self, fn, *args):
+        """Submit once a slot is held; the slot is released when the job finishes."""
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _submit(self, fn, *args):
+        self._slots.acquire()
+        return self._start(fn, *args)
+
+    def hash(self, password):
+        """Future for the bcrypt hash of password (str), as a str."""
+        return self._submit(_hash, str(password).encode("utf-8"), self.rounds)
+
+    async def hash_async(self, password):
+        """
+        hash() for coroutine callers. When the queue is full the slot is
+        waited for on a helper thread, so the event loop (and every other
+        logical client on it) keeps running.
+        """
+        if not self._slots.acquire(blocking=False):
+            waiter = asyncio.get_running_loop().run_in_executor(None, self._slots.acquire)
+            try:
+                await asyncio.shield(waiter)
+            except asyncio.CancelledError:
+                # The slot is still taken once the helper gets it; hand it back
+                waiter.add_done_callback(lambda _: self._slots.release())
+                raise
+        return await asyncio.wrap_future(self._start(_hash, str(password).encode("utf-8"), self.rounds))
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def check_password(password, hashed):
+    """
+    Whether password (str) matches hashed (str or bytes). A login cannot
+    verify before its lookup has returned the stored hash, so there is nothing
+    to overlap with and the check runs inline instead of on the pool.
+    """
+    if isinstance(hashed, str):
+        hashed = hashed.encode("utf-8")
+    return bcrypt.checkpw(str(password).encode("utf-8"), hashed)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_password_pool():
+    """Process-wide pool, configured from the environment on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordPool(
+                    workers=int(os.environ.get("IOCL_BCRYPT_WORKERS", 2)),
+                    queue_size=int(os.environ.get("IOCL_BCRYPT_QUEUE", 64)),
+                    rounds=int(os.environ.get("IOCL_BCRYPT_ROUNDS", 10)),
+                )
+    return _pool
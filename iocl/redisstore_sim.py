@@ -0,0 +1,358 @@
+import enum
+import heapq
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+# Pure-Python stand-in for the compiled redisstore extension, for profiling and
+# regression-testing the clients without a replicated cluster. It exposes the
+# same API (async_send_request, async_get_response, ValueType, Operation, Value,
+# value_to_python, custom_init_session), keeps an in-memory keyspace with the
+# semantics of wrappers/redis_store.cpp, and signals completions through real
+# eventfds after a delay drawn from a LatencyModel.
+#
+# Select it with IOCL_BACKEND=sim; iocl_utils and config_env then install it
+# as the redisstore module before anything imports the real one.
+
+
+class ValueType(enum.IntEnum):
+    STRING = 0
+    LIST = 1
+    SET = 2
+    HASH = 3
+
+
+class Operation(enum.IntEnum):
+    PUT = 0
+    GET = 1
+    INCR = 2
+    SET = 3
+    SADD = 4
+    EXISTS = 5
+    HMGET = 6
+    HSET = 7
+    HMSET = 8
+    HGETALL = 9
+    ZADD = 10
+    ZINCRBY = 11
+    ZSCORE = 12
+    ZREVRANGE = 13
+
+
+class Value:
+    """Mirror of the binding's Value: a tagged string, list, set or hash."""
+
+    __slots__ = ("type", "str", "list", "set", "hash")
+
+    def __init__(self, data=""):
+        self.str = ""
+        self.list = []
+        self.set = set()
+        self.hash = {}
+        if isinstance(data, dict):
+            self.type = ValueType.HASH
+            self.hash = {str(k): str(v) for k, v in data.items()}
+        elif isinstance(data, (set, frozenset)):
+            self.type = ValueType.SET
+            self.set = {str(m) for m in data}
+        elif isinstance(data, (list, tuple)):
+            self.type = ValueType.LIST
+            self.list = [str(m) for m in data]
+        else:
+            self.type = ValueType.STRING
+            # The binding maps non-str scalars to NIL; the simulator is lenient
+            # and stringifies them, so integer offsets and ids still work.
+            self.str = "" if data is None else str(data)
+
+    def is_nil(self):
+        return self.type == ValueType.STRING and not self.str
+
+    def __repr__(self):
+        return f"Value({value_to_python(self)!r})"
+
+
+NIL = Value("")
+
+
+def value_to_python(value):
+    if value.type == ValueType.STRING:
+        return value.str
+    elif value.type == ValueType.LIST:
+        return list(value.list)
+    elif value.type == ValueType.SET:
+        return set(value.set)
+    elif value.type == ValueType.HASH:
+        return dict(value.hash)
+    return None
+
+
+class LatencyModel:
+    """
+    Completion delay for a replicated command: a base latency, scaled by
+    time_scale, plus exponentially distributed jitter whose mean is
+    jitter * base.
+    """
+
+    def __init__(self, base_ms=0.0, jitter=0.0, time_scale=1.0, seed=None):
+        self.base_ms = float(base_ms)
+        self.jitter = float(jitter)
+        self.time_scale = float(time_scale)
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def from_config(cls, config, client_name=None, **kwargs):
+        """
+        Derive the base latency from region_rtt_latencies: one round trip from
+        the client to the shard leader (the first replica of shard 0), plus the
+        round trip from the leader to the slowest replica it needs for a
+        majority.
+        """
+        region_of = {
+            host: region for region, hosts in config.get("server_regions", {}).items() for host in hosts
+        }
+        rtts = config.get("region_rtt_latencies", {})
+
+        def rtt(a, b):
+            return rtts.get(region_of.get(a), {}).get(region_of.get(b), 0)
+
+        replicas = (config.get("shards") or [config.get("server_names", [])])[0]
+        if not replicas:
+            return cls(0.0, **kwargs)
+        client = client_name or (config.get("clients") or [None])[0]
+        leader = replicas[0]
+        follower_rtts = sorted(rtt(leader, r) for r in replicas[1:])
+        needed = len(replicas) // 2
+        commit_ms = follower_rtts[needed - 1] if needed and follower_rtts else 0
+        return cls(rtt(client, leader) + commit_ms, **kwargs)
+
+    @classmethod
+    def from_env(cls):
+        kwargs = dict(
+            jitter=float(os.environ.get("IOCL_SIM_JITTER", 0.05)),
+            time_scale=float(os.environ.get("IOCL_SIM_TIME_SCALE", 1.0)),
+            seed=os.environ.get("IOCL_SIM_SEED"),
+        )
+        if "IOCL_SIM_LATENCY_MS" in os.environ:
+            return cls(float(os.environ["IOCL_SIM_LATENCY_MS"]), **kwargs)
+        config_path = os.environ.get("IOCL_CONFIG_PATH")
+        if config_path and os.path.exists(config_path):
+            with open(config_path, "r") as f:
+                return cls.from_config(json.load(f), **kwargs)
+        return cls(0.0, **kwargs)
+
+    def sample(self):
+        """Delay in seconds for one command."""
+        ms = self.base_ms
+        if self.jitter > 0 and ms > 0:
+            ms += self._rng.expovariate(1.0 / (self.jitter * ms))
+        return ms * self.time_scale / 1000.0
+
+
+class _Store:
+    """In-memory keyspace with the command semantics of wrappers/redis_store.cpp."""
+
+    def __init__(self):
+        self.data = {}
+
+    def execute(self, op, key, value, old_value):
+        data = self.data
+        if op == Operation.PUT:
+            data[key] = value
+            return value
+        elif op == Operation.GET:
+            return data.get(key, NIL)
+        elif op == Operation.INCR:
+            current = data.get(key)
+            if current is not None and current.type == ValueType.STRING and current.str:
+                try:
+                    current.str = str(int(current.str) + 1)
+                except ValueError:
+                    current.str = "0"
+                return Value(current.str)
+            data[key] = Value("1")
+            return Value("1")
+        elif op == Operation.SET:
+            data[key] = value
+            return Value("OK")
+        elif op == Operation.SADD:
+            members = self._typed(key, ValueType.SET)
+            members.set.add(value.str)
+            return Value(str(len(members.set)))
+        elif op == Operation.EXISTS:
+            return Value("1" if key in data else "0")
+        elif op == Operation.HMSET:
+            h = self._typed(key, ValueType.HASH)
+            new_fields = sum(1 for field in value.hash if field not in h.hash)
+            h.hash.update(value.hash)
+            return Value(str(new_fields))
+        elif op == Operation.HSET:
+            h = self._typed(key, ValueType.HASH)
+            is_new = value.str not in h.hash
+            h.hash[value.str] = old_value.str
+            return Value("1" if is_new else "0")
+        elif op == Operation.HMGET:
+            h = data.get(key)
+            if h is None or h.type != ValueType.HASH:
+                return Value([])
+            return Value([h.hash.get(value.str, "")])
+        elif op == Operation.HGETALL:
+            h = data.get(key)
+            return Value(dict(h.hash)) if h is not None and h.type == ValueType.HASH else Value({})
+        elif op == Operation.ZADD:
+            # Sorted sets are hashes of member -> score, as in the C++ store
+            self._typed(key, ValueType.HASH).hash[value.str] = old_value.str
+            return Value("1")
+        elif op == Operation.ZINCRBY:
+            z = self._typed(key, ValueType.HASH)
+            score = float(z.hash.get(old_value.str, 0.0)) + float(value.str)
+            z.hash[old_value.str] = f"{score:f}"
+            return Value(z.hash[old_value.str])
+        elif op == Operation.ZSCORE:
+            z = data.get(key)
+            if z is not None and z.type == ValueType.HASH and old_value.str in z.hash:
+                return Value(z.hash[old_value.str])
+            return NIL
+        elif op == Operation.ZREVRANGE:
+            return Value(self._zrevrange(key, int(value.str or 0), int(old_value.str or 0)))
+        print("Operation not supported.", file=sys.stderr)
+        return NIL
+
+    def _typed(self, key, value_type):
+        current = self.data.get(key)
+        if current is None or current.type != value_type:
+            current = Value({} if value_type == ValueType.HASH else set())
+            self.data[key] = current
+        return current
+
+    def _zrevrange(self, key, start, stop):
+        z = self.data.get(key)
+        if z is None or z.type != ValueType.HASH:
+            return []
+
+        def score(item):
+            try:
+                return float(item[1])
+            except ValueError:
+                return 0.0
+
+        members = [m for m, _ in sorted(z.hash.items(), key=score, reverse=True)]
+        n = len(members)
+        if start < 0:
+            start += n
+        if stop < 0:
+            stop += n
+        start, stop = max(0, start), min(n - 1, stop)
+        return members[start:stop + 1] if start <= stop else []
+
+
+class _Backend:
+    """
+    Shared simulated cluster: one keyspace, one completion thread, and the
+    result and eventfd tables for every session in the process.
+    """
+
+    def __init__(self, latency_model):
+        self.latency_model = latency_model
+        self.store = _Store()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.command_ids = itertools.count(1)
+        self.session_ids = itertools.count(1)
+        self.due = []
+        self.results = {}
+        self.efds = {}
+        thread = threading.Thread(target=self._complete_loop, name="redisstore-sim", daemon=True)
+        thread.start()
+
+    def send(self, op, key, value, old_value):
+        delay = self.latency_model.sample()
+        with self.lock:
+            command_id = next(self.command_ids)
+            heapq.heappush(self.due, (time.monotonic() + delay, command_id, op, key, value, old_value))
+            self.wakeup.notify()
+        return command_id
+
+    def get(self, command_id):
+        with self.lock:
+            result = self.results.pop(command_id, None)
+            if result is not None:
+                return True, result
+            efd = self.efds.get(command_id)
+            if efd is None:
+                efd = self.efds[command_id] = _new_efd()
+            return False, Value(str(efd[0]))
+
+    def _complete_loop(self):
+        with self.lock:
+            while True:
+                if not self.due:
+                    self.wakeup.wait()
+                    continue
+                wait = self.due[0][0] - time.monotonic()
+                if wait > 0:
+                    self.wakeup.wait(wait)
+                    continue
+                _, command_id, op, key, value, old_value = heapq.heappop(self.due)
+                self.results[command_id] = self.store.execute(op, key, value, old_value)
+                efd = self.efds.pop(command_id, None)
+                if efd is not None:
+                    _signal_efd(efd)
+
+
+def _new_efd():
+    """Returns (read fd, write fd); an eventfd where available, else a pipe."""
+    if hasattr(os, "eventfd"):
+        efd = os.eventfd(0, os.EFD_CLOEXEC)
+        return efd, efd
+    return os.pipe()
+
+
+def _signal_efd(efd):
+    read_fd, write_fd = efd
+    try:
+        os.write(write_fd, (1).to_bytes(8, sys.byteorder))
+    except OSError:
+        # The client gave up on this command and closed its end
+        pass
+    if write_fd != read_fd:
+        os.close(write_fd)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _Backend(LatencyModel.from_env())
+    return _backend
+
+
+def custom_init_session():
+    return next(_get_backend().session_ids)
+
+
+def async_send_request(session_id, op, key, new_val=None, old_val=None):
+    command_id = _get_backend().send(Operation(op), key, Value(new_val), Value(old_val))
+    return True, command_id
+
+
+def async_get_response(session_id, command_id):
+    return _get_backend().get(command_id)
+
+
+def install():
+    """Register this module as redisstore, so existing imports resolve to it."""
+    sys.modules["redisstore"] = sys.modules[__name__]
+
+
+def install_if_requested():
+    if os.environ.get("IOCL_BACKEND", "") == "sim":
+        install()
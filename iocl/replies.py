@@ -0,0 +1,62 @@
+import os
+
+from iocl.messages import decode_messages
+
+# Reply decoding shared by the sync, async and asyncio chat helpers. The
+# binding answers with (success, value) tuples; other shapes pass through.
+
+
+def unwrap(result):
+    """Value of a (success, value) reply; other shapes pass through"""
+    if isinstance(result, tuple) and len(result) == 2:
+        return result[1]
+    return result
+
+
+def exists(result):
+    """An EXISTS reply as a bool; the store answers with the count as a string, so "0" is false"""
+    value = unwrap(result)
+    if value in ("", None):
+        return False
+    return int(value) != 0
+
+
+def members(result):
+    """Members of a set reply, in a stable order"""
+    value = unwrap(result)
+    if isinstance(value, (set, list, tuple)):
+        return sorted(str(m) for m in value)
+    return []
+
+
+# How get_messages reads a room (IOCL_CLIENT_GET_MESSAGES):
+#   checked      EXISTS, then ZREVRANGE once it answers (two round trips)
+#   speculative  EXISTS and ZREVRANGE issued together (one round trip)
+#   range        ZREVRANGE alone; a missing room reads as an empty range
+GET_MESSAGES_MODES = ("checked", "speculative", "range")
+
+_get_messages_mode = None
+
+
+def get_messages_mode():
+    """IOCL_CLIENT_GET_MESSAGES, read and validated on first use."""
+    global _get_messages_mode
+    if _get_messages_mode is None:
+        mode = os.environ.get("IOCL_CLIENT_GET_MESSAGES", "") or "checked"
+        if mode not in GET_MESSAGES_MODES:
+            raise ValueError(f"Unknown get_messages mode: {mode}")
+        _get_messages_mode = mode
+    return _get_messages_mode
+
+
+def room_messages(exists_reply, range_reply):
+    """
+    get_messages result from a room's EXISTS reply (None when it was not
+    asked) and its ZREVRANGE reply, so every mode answers the same way: a
+    missing room, or one whose range is empty, reads as [].
+    """
+    if exists_reply is not None and not exists(exists_reply):
+        return []
+    if not unwrap(range_reply):
+        return []
+    return decode_messages(range_reply)
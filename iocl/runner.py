@@ -0,0 +1,236 @@
+import argparse
+import ast
+import itertools
+import json
+import os
+import subprocess
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iocl.keyspace import build_table
+from iocl.stats import aggregate_files, default_interval_secs, get_path, write_stats_file
+
+# One entry point for every client workload. Workloads are discovered as
+# plugins: any script under sync/ or async/ (or a path in IOCL_WORKLOAD_PATHS,
+# colon separated) that defines run_app and hands it to iocl.cli.run_client.
+# The runner launches a workload at each point of a sweep over client
+# processes, logical clients per process (mpl) and/or offered arrival rates,
+# aggregates each point's outputs into its stats file (iocl/stats.py) and
+# writes the throughput/latency curve: sweep.json with every point, one .dat
+# series per entry in the config's "plots" section, and the knee (the point
+# with the best throughput / p99 ratio).
+#
+#   python -m iocl.runner --list
+#   python -m iocl.runner sync/main --config cfg.json --clients 1,2,4,8 --explen 30
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKLOAD_DIRS = ("sync", "async")
+
+
+def _is_workload(path):
+    with open(path, "r") as f:
+        try:
+            tree = ast.parse(f.read(), path)
+        except SyntaxError:
+            return False
+    defines_run_app = any(
+        isinstance(node, ast.FunctionDef) and node.name == "run_app" for node in tree.body
+    )
+    calls_run_client = any(
+        isinstance(node, ast.Call) and getattr(node.func, "id", None) == "run_client"
+        for node in ast.walk(tree)
+    )
+    return defines_run_app and calls_run_client
+
+
+def discover_workloads(root=REPO_ROOT):
+    """Workload name ("sync/main", ...) -> script path."""
+    candidates = []
+    for directory in WORKLOAD_DIRS:
+        d = os.path.join(root, directory)
+        if os.path.isdir(d):
+            candidates.extend(os.path.join(d, name) for name in sorted(os.listdir(d)) if name.endswith(".py"))
+    for extra in filter(None, os.environ.get("IOCL_WORKLOAD_PATHS", "").split(":")):
+        if os.path.isdir(extra):
+            candidates.extend(os.path.join(extra, name) for name in sorted(os.listdir(extra)) if name.endswith(".py"))
+        else:
+            candidates.append(extra)
+    workloads = {}
+    for path in candidates:
+        if _is_workload(path):
+            name = os.path.relpath(path, root)[: -len(".py")]
+            workloads[name.replace(os.sep, "/")] = os.path.abspath(path)
+    return workloads
+
+
+def sweep_points(clients, mpls, rates):
+    """Every (clients, mpl, total rate) combination, in sweep order."""
+    return [
+        {"clients": c, "mpl": m, "rate": r}
+        for c, m, r in itertools.product(clients, mpls, rates)
+    ]
+
+
+def point_label(point):
+    label = f"c{point['clients']}"
+    if point["mpl"] is not None:
+        label += f"_m{point['mpl']}"
+    if point["rate"] is not None:
+        label += f"_r{point['rate']:g}"
+    return label
+
+
+def run_point(script, point, args, out_dir, extra_args, default_mpl=1):
+    """
+    Launch one process per client and wait for all of them; returns the output
+    paths. default_mpl is the config's mpl, used by points without one.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    logical_clients = point["clients"] * (point["mpl"] or default_mpl)
+    procs = []
+    for clientid in range(point["clients"]):
+        cmd = [
+            sys.executable,
+            script,
+            "--config", args.config_path,
+            "--clientid", str(clientid),
+            "--explen", str(args.explen),
+            "--warmup_secs", str(args.warmup_secs),
+            "--cooldown_secs", str(args.cooldown_secs),
+        ]
+        if point["mpl"] is not None:
+            cmd += ["--mpl", str(point["mpl"])]
+        if point["rate"] is not None:
+            # The offered rate is for the whole point; every logical client
+            # runs its own schedule, so split it across all of them
+            cmd += [
+                "--arrival_process", args.arrival_process,
+                "--arrival_rate", str(point["rate"] / logical_clients),
+            ]
+        cmd += extra_args
+        out_path = os.path.join(out_dir, f"client_{clientid}.out")
+        err_path = os.path.join(out_dir, f"client_{clientid}.err")
+        # The child keeps its own copies of the descriptors
+        with open(out_path, "w") as out, open(err_path, "w") as err:
+            proc = subprocess.Popen(cmd, cwd=REPO_ROOT, stdout=out, stderr=err)
+        procs.append((proc, out_path, err_path))
+    outputs = []
+    for proc, out_path, err_path in procs:
+        try:
+            returncode = proc.wait(timeout=args.explen + args.grace_secs)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            returncode = proc.wait()
+        if returncode != 0:
+            print(f"Client exited with {returncode}, see {err_path}", file=sys.stderr)
+        outputs.append(out_path)
+    return outputs
+
+
+def find_knee(rows):
+    """Point with the highest throughput / p99 latency ("power")."""
+    candidates = [row for row in rows if row["tput"] > 0 and row["p99"] > 0]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda row: row["tput"] / row["p99"])
+
+
+def write_plot_series(config, rows, out_dir, series_title):
+    """One gnuplot-friendly .dat file per entry in the config's plots section."""
+    for plot in config.get("plots", []):
+        x_var = plot.get("x_var", ["aggregate", "app", "tput"])
+        y_var = plot.get("y_var", ["aggregate", "app", "p99"])
+        path = os.path.join(out_dir, f"{plot['name']}.dat")
+        with open(path, "w") as f:
+            x_label = plot.get("x_label", "Throughput (ops/s)")
+            f.write(f"# {series_title}: {x_label} vs {plot.get('y_label', y_var[-1])}\n")
+            for row in rows:
+                try:
+                    x, y = get_path(row["stats"], x_var), get_path(row["stats"], y_var)
+                except KeyError:
+                    continue
+                f.write(f"{x:.3f} {y:.3f}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="IOCL Benchmark Runner")
+    parser.add_argument("workload", nargs="?", help="Workload name, e.g. sync/main (see --list)")
+    parser.add_argument("--list", action="store_true", help="List discovered workloads")
+    parser.add_argument(
+        "--config",
+        dest="config_path",
+        default="/users/akalaba/IOCL/experiments/configs/1shard_transformed_test.json",
+        help="Path to the JSON configuration file",
+    )
+    parser.add_argument("--clients", default="1", help="Comma-separated client process counts")
+    parser.add_argument("--mpl", default="", help="Comma-separated logical clients per process")
+    parser.add_argument("--rates", default="", help="Comma-separated total offered rates (ops/sec)")
+    parser.add_argument(
+        "--arrival_process", choices=["poisson", "fixed"], default="poisson", help="Arrival process for --rates"
+    )
+    parser.add_argument("--explen", type=int, default=30, help="Experiment length per point")
+    parser.add_argument("--warmup_secs", type=int, default=0, help="Warmup seconds")
+    parser.add_argument("--cooldown_secs", type=int, default=0, help="Cooldown seconds")
+    parser.add_argument("--grace_secs", type=int, default=60, help="Extra time before a client is killed")
+    parser.add_argument("--out", default="results", help="Output directory")
+    parser.add_argument("--series", default=None, help="Series title for the curve (default: workload)")
+
+    # Everything after "--" is passed through to every client
+    argv = sys.argv[1:] if argv is None else list(argv)
+    extra_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    args = parser.parse_args(argv[: len(argv) - len(extra_args) - (1 if "--" in argv else 0)])
+    workloads = discover_workloads()
+
+    if args.list or not args.workload:
+        for name, path in sorted(workloads.items()):
+            print(f"{name}\t{path}")
+        return
+    if args.workload not in workloads:
+        parser.error(f"Unknown workload {args.workload}; choose from {', '.join(sorted(workloads))}")
+
+    clients = [int(c) for c in args.clients.split(",") if c]
+    mpls = [int(m) for m in args.mpl.split(",") if m] or [None]
+    rates = [float(r) for r in args.rates.split(",") if r] or [None]
+    steady_secs = args.explen - args.warmup_secs - args.cooldown_secs
+    with open(args.config_path, "r") as f:
+        config = json.load(f)
+    stats_file_name = config.get("stats_file_name", "stats.json")
+    interval_secs = float(config.get("tput_interval") or 0) or default_interval_secs()
+    num_keys = config.get("client_num_keys")
+    if isinstance(num_keys, list):
+        num_keys = num_keys[0]
+    if num_keys:
+        # Clients map the keyspace table; build it here, before any point starts
+        build_table(num_keys)
+    default_mpl = config.get("mpl") or 1
+    if isinstance(default_mpl, list):
+        default_mpl = default_mpl[0]
+
+    out_dir = os.path.join(args.out, args.workload.replace("/", "_"))
+    rows = []
+    print("#point,clients,mpl,rate,tput,p50,p99")
+    for point in sweep_points(clients, mpls, rates):
+        label = point_label(point)
+        outputs = run_point(
+            workloads[args.workload], point, args, os.path.join(out_dir, label), extra_args, int(default_mpl)
+        )
+        stats = aggregate_files(outputs, interval_secs).stats(steady_secs)
+        write_stats_file(os.path.join(out_dir, label, stats_file_name), stats)
+        app = stats["aggregate"].get("app", {"tput": 0.0, "p50": 0.0, "p99": 0.0})
+        row = dict(point, label=label, tput=app["tput"], p50=app["p50"], p99=app["p99"], stats=stats)
+        rows.append(row)
+        print(f"{label},{point['clients']},{point['mpl'] or ''},{point['rate'] or ''},"
+              f"{row['tput']:.1f},{row['p50']:.3f},{row['p99']:.3f}")
+        sys.stdout.flush()
+
+    knee = find_knee(rows)
+    with open(os.path.join(out_dir, "sweep.json"), "w") as f:
+        json.dump({"workload": args.workload, "points": rows, "knee": knee and knee["label"]}, f, indent=2)
+    write_plot_series(config, rows, out_dir, args.series or args.workload)
+    if knee is not None:
+        print(f"#knee,{knee['label']},{knee['tput']:.1f},{knee['p50']:.3f},{knee['p99']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
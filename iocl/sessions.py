@@ -0,0 +1,201 @@
+import asyncio
+import collections
+import math
+import os
+import random
+import time
+
+from iocl.keyselect import make_selector
+
+# Closed-loop user sessions for the chat workload. Each logical client plays
+# one human user at a time, so clients x IOCL_MPL is the number of concurrent
+# users. Between ops the user thinks for a time drawn from
+# IOCL_CLIENT_THINK_DISTRIBUTION (mean IOCL_CLIENT_THINK_TIME seconds):
+#
+#   fixed        exactly the mean
+#   exponential  memoryless gaps
+#   lognormal    heavy tailed, shape IOCL_CLIENT_THINK_SIGMA (default 1.0)
+#   uniform      uniform on [0, 2 * mean]
+#
+# A session opens with a login burst (login, set_presence, get_rooms,
+# get_messages for the current room) issued back to back. After every op the
+# user stays in the current room with IOCL_CLIENT_STAY_PROBABILITY, otherwise
+# opens another one (get_messages); with IOCL_CLIENT_SWITCH_PROBABILITY the
+# user logs out (clear_presence) and a different user logs in. Ops drawn from
+# the op mix act as the current user in the current room.
+#
+# Think times are slept against absolute deadlines taken from the end of the
+# previous op, so sleep overshoot never accumulates and never lands in a
+# measured latency. Without IOCL_CLIENT_THINK_DISTRIBUTION the drivers keep
+# their saturating loop.
+
+THINK_DISTRIBUTIONS = ("fixed", "exponential", "lognormal", "uniform")
+# The last stretch of a think time is spun rather than slept, for precision
+SPIN_SECS = 0.0005
+PASSWORD = "password123"
+
+SessionOp = collections.namedtuple("SessionOp", ["optype", "args"])
+
+
+class ThinkTime:
+    def __init__(self, distribution, mean, rng, sigma=1.0):
+        if distribution not in THINK_DISTRIBUTIONS:
+            raise ValueError(f"Unknown think time distribution: {distribution}")
+        if mean < 0:
+            raise ValueError("Think time must not be negative")
+        self.distribution = distribution
+        self.mean = float(mean)
+        self.sigma = float(sigma)
+        self._rng = rng
+        # lognormal mu such that the mean comes out at self.mean
+        self._mu = math.log(self.mean) - self.sigma ** 2 / 2 if self.mean > 0 else 0.0
+
+    def next(self):
+        if self.mean == 0 or self.distribution == "fixed":
+            return self.mean
+        if self.distribution == "exponential":
+            return self._rng.expovariate(1.0 / self.mean)
+        if self.distribution == "lognormal":
+            return self._rng.lognormvariate(self._mu, self.sigma)
+        return self._rng.uniform(0.0, 2.0 * self.mean)
+
+
+def sleep_until(deadline):
+    """Sleep until the time.time() deadline: coarse sleep, then spin."""
+    delay = deadline - time.time()
+    if delay > SPIN_SECS:
+        time.sleep(delay - SPIN_SECS)
+    while time.time() < deadline:
+        pass
+
+
+class _CurrentId:
+    """
+    Selector view for op argument builders: the first id an op asks for is
+    the session's current one, any further ids come from the fallback.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.current = None
+        self._given = False
+
+    def reset(self):
+        self._given = False
+
+    def next(self):
+        if self._given:
+            return self.fallback.next()
+        self._given = True
+        return self.current
+
+    def advance(self):
+        self.fallback.advance()
+
+
+class UserSession:
+    """Session state and think-time pacing for one logical client."""
+
+    def __init__(self, think, stay_probability, switch_probability, users, rooms, rng):
+        self.think = think
+        self.stay_probability = float(stay_probability)
+        self.switch_probability = float(switch_probability)
+        self.users = _CurrentId(users)
+        self.rooms = _CurrentId(rooms)
+        self._rng = rng
+        self._pending = collections.deque()
+        self._deadline = None
+        self.sessions = 0
+        self._login()
+
+    def _login(self):
+        self.users.current = self.users.fallback.next()
+        self.rooms.current = self.rooms.fallback.next()
+        self.sessions += 1
+        user, room = self.users.current, self.rooms.current
+        self._pending.extend(
+            [
+                SessionOp("login", (str(user), PASSWORD)),
+                SessionOp("set_presence", (user,)),
+                SessionOp("get_rooms", (user,)),
+                SessionOp("get_messages", (room,)),
+            ]
+        )
+
+    def wait(self, t_end):
+        """
+        Sleep out the think time before the next op; ops within a burst go
+        back to back. Returns False when the think time runs past t_end.
+        """
+        if self._deadline is None:
+            return True
+        if self._deadline >= t_end:
+            return False
+        sleep_until(self._deadline)
+        self._deadline = None
+        return True
+
+    async def wait_async(self, t_end):
+        """wait() for coroutine clients: the think time is slept on the event loop."""
+        if self._deadline is None:
+            return True
+        if self._deadline >= t_end:
+            return False
+        await asyncio.sleep(max(self._deadline - time.time(), 0))
+        self._deadline = None
+        return True
+
+    def next_op(self, optype, op, draw1, draw2):
+        """The next op to issue: a queued burst op, else optype from the mix as the current user."""
+        if self._pending:
+            return self._pending.popleft()
+        self.users.reset()
+        self.rooms.reset()
+        return SessionOp(optype, op.args(draw1, draw2, self.users, self.rooms))
+
+    def done(self):
+        """Call after each op: schedule the next transition and think time."""
+        if self._pending:
+            return
+        if self._rng.random() < self.switch_probability:
+            self._pending.append(SessionOp("clear_presence", (self.users.current,)))
+            self._login()
+        elif self._rng.random() >= self.stay_probability:
+            self.rooms.current = self.rooms.fallback.next()
+            self._pending.append(SessionOp("get_messages", (self.rooms.current,)))
+        self._deadline = time.time() + self.think.next()
+
+
+def session_from_env(clientid=0, users=None, rooms=None):
+    """
+    UserSession configured by IOCL_CLIENT_THINK_DISTRIBUTION and the
+    think/stay/switch settings, or None when no distribution is set. users
+    and rooms are the driver's key selectors; without them ids are uniform
+    over 0-100 like the op stream draws. Sessions are a closed-loop model,
+    so they cannot be combined with an open-loop arrival process.
+    """
+    distribution = os.environ.get("IOCL_CLIENT_THINK_DISTRIBUTION", "")
+    if not distribution or distribution == "none":
+        return None
+    process = os.environ.get("IOCL_CLIENT_ARRIVAL_PROCESS", "closed")
+    if process != "closed":
+        raise ValueError(
+            f"client_think_distribution={distribution} needs the closed arrival process, not {process}: "
+            "open-loop arrivals would skip the think times"
+        )
+    seed = int(os.environ.get("IOCL_CLIENT_SEED", 0) or 0)
+    rng = random.Random(f"{seed}:{clientid}:session")
+    think = ThinkTime(
+        distribution,
+        float(os.environ.get("IOCL_CLIENT_THINK_TIME", 1.0)),
+        rng,
+        sigma=float(os.environ.get("IOCL_CLIENT_THINK_SIGMA", 1.0)),
+    )
+    return UserSession(
+        think,
+        float(os.environ.get("IOCL_CLIENT_STAY_PROBABILITY", 0.5)),
+        float(os.environ.get("IOCL_CLIENT_SWITCH_PROBABILITY", 0.0)),
+        users if users is not None else make_selector("uniform", 100, seed, clientid, stream=3),
+        rooms if rooms is not None else make_selector("uniform", 100, seed, clientid, stream=4),
+        rng,
+    )
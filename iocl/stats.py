@@ -0,0 +1,353 @@
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iocl.histogram import SUB_BUCKET_BITS, LatencyHistogram
+
+# Streaming aggregation of client outputs into the stats file the plot configs
+# read. Inputs are the raw "{optype},{lat},{optime},{clientid}" lines and the
+# #hist / #interval lines of iocl/histogram.py, from any number of files.
+# Latencies are bucketed with the same log-linear layout as LatencyHistogram
+# and kept as NumPy count vectors, so memory is bounded by ops x intervals
+# rather than by the number of samples, and files aggregated in parallel
+# merge with a vector add.
+#
+# stats file layout (latencies in ms, throughput in ops/sec):
+#   aggregate.{op}.{count,tput,mean,p50,p90,p99,p999,max}   whole steady state
+#   run_stats.{op}.{tput,p50,p99}.{mean,min,p50,p90,p99,max} across intervals
+#     (raw lines or #interval lines; a client with only #hist is one interval)
+#
+#   python -m iocl.stats client_*.out --steady_secs 30 --stats_file stats.json
+
+PERCENTILES = {"p50": 50, "p90": 90, "p99": 99, "p999": 99.9}
+CHUNK_LINES = 1 << 16
+
+_layout = LatencyHistogram(SUB_BUCKET_BITS)
+NUM_BUCKETS = _layout._size
+HALF = 1 << (SUB_BUCKET_BITS - 1)
+# Upper bound of every bucket, for reading percentiles off a count vector
+BUCKET_HIGH = np.array([_layout.highest_value(i) for i in range(NUM_BUCKETS)], dtype=np.float64)
+
+
+def bucket_index(lats):
+    """Vectorized LatencyHistogram.index for an int64 array of latencies (ns)."""
+    lats = np.maximum(lats, 0)
+    bit_length = np.frexp(lats.astype(np.float64))[1].astype(np.int64)
+    shift = np.maximum(bit_length - SUB_BUCKET_BITS, 0)
+    return shift * HALF + (lats >> shift)
+
+
+def percentile_of(counts, q, max_value):
+    total = counts.sum()
+    if not total:
+        return 0.0
+    rank = max(int(total * q / 100.0 + 0.5), 1)
+    i = int(np.searchsorted(np.cumsum(counts), rank))
+    return min(BUCKET_HIGH[i], max_value)
+
+
+class _OpTotals:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = np.zeros(NUM_BUCKETS, dtype=np.int64)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, lats):
+        self.counts += np.bincount(bucket_index(lats), minlength=NUM_BUCKETS)
+        self.count += len(lats)
+        self.total += int(lats.sum())
+        self.max = max(self.max, int(lats.max()))
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+
+class Aggregator:
+    """
+    Incremental per-op and per-interval latency statistics. feed() accepts
+    lines from one or many clients; merge() combines aggregators built from
+    different files.
+    """
+
+    def __init__(self, interval_secs=1.0):
+        self.interval_ns = int(float(interval_secs) * 1e9)
+        if self.interval_ns <= 0:
+            raise ValueError(f"Interval length must be positive, got {interval_secs!r} seconds")
+        self.totals = {}
+        self.intervals = {}
+        # (op, interval) -> [count, count-weighted p50 sum, count-weighted p99 sum]
+        # from #interval lines, whose percentiles can only be combined approximately
+        self.interval_summaries = {}
+        self.raw_clients = set()
+        self.clients = set()
+        self._pending = {}
+        self._pending_lines = 0
+
+    def feed(self, lines):
+        for line in lines:
+            self.feed_line(line)
+        self.flush()
+
+    def feed_line(self, line):
+        if line.startswith("#"):
+            self._feed_marker(line.rstrip("\n"))
+            return
+        fields = line.rstrip("\n").split(",")
+        if len(fields) != 4:
+            return
+        try:
+            lat, optime = int(fields[1]), int(fields[2])
+        except ValueError:
+            return
+        clientid = fields[3]
+        if clientid not in self.raw_clients:
+            self.raw_clients.add(clientid)
+            self.clients.add(clientid)
+        pending = self._pending.get(fields[0])
+        if pending is None:
+            pending = self._pending[fields[0]] = ([], [])
+        pending[0].append(lat)
+        pending[1].append(optime)
+        self._pending_lines += 1
+        if self._pending_lines >= CHUNK_LINES:
+            self.flush()
+
+    def _feed_marker(self, line):
+        if line.startswith("#hist,"):
+            summary = json.loads(line[len("#hist,"):])
+            clientid = str(summary.get("clientid"))
+            self.clients.add(clientid)
+            # Raw lines already counted this client's ops (IOCL_LATENCY_LOG=raw)
+            if clientid in self.raw_clients:
+                return
+            for optype, d in summary["ops"].items():
+                totals = self._op_totals(optype)
+                for i, c in d["counts"].items():
+                    totals.counts[int(i)] += c
+                totals.count += d["count"]
+                totals.total += d["total"]
+                totals.max = max(totals.max, d["max"])
+        elif line.startswith("#interval,"):
+            fields = line.split(",")
+            if len(fields) != 9 or fields[8] in self.raw_clients:
+                return
+            start_ns, optype, count = int(fields[1]), fields[2], int(fields[3])
+            key = (optype, start_ns // self.interval_ns)
+            acc = self.interval_summaries.setdefault(key, [0, 0.0, 0.0])
+            acc[0] += count
+            acc[1] += count * int(fields[4])
+            acc[2] += count * int(fields[5])
+
+    def _op_totals(self, optype):
+        totals = self.totals.get(optype)
+        if totals is None:
+            totals = self.totals[optype] = _OpTotals()
+        return totals
+
+    def flush(self):
+        """Bucket the buffered raw lines."""
+        for optype, (lats, optimes) in self._pending.items():
+            lats = np.array(lats, dtype=np.int64)
+            slots = np.array(optimes, dtype=np.int64) // self.interval_ns
+            self._op_totals(optype).add(lats)
+            for slot in np.unique(slots):
+                key = (optype, int(slot))
+                interval = self.intervals.get(key)
+                if interval is None:
+                    interval = self.intervals[key] = _OpTotals()
+                interval.add(lats[slots == slot])
+        self._pending = {}
+        self._pending_lines = 0
+
+    def merge(self, other):
+        self.flush()
+        other.flush()
+        for optype, totals in other.totals.items():
+            self._op_totals(optype).merge(totals)
+        for key, interval in other.intervals.items():
+            if key in self.intervals:
+                self.intervals[key].merge(interval)
+            else:
+                self.intervals[key] = interval
+        for key, acc in other.interval_summaries.items():
+            mine = self.interval_summaries.setdefault(key, [0, 0.0, 0.0])
+            for i in range(3):
+                mine[i] += acc[i]
+        self.raw_clients |= other.raw_clients
+        self.clients |= other.clients
+        return self
+
+    def _interval_series(self, optype):
+        """Per-interval (count, p50 ns, p99 ns), full intervals only."""
+        series = {}
+        for (op, slot), interval in self.intervals.items():
+            if op == optype:
+                count = interval.count
+                series[slot] = [
+                    count,
+                    count * percentile_of(interval.counts, 50, interval.max),
+                    count * percentile_of(interval.counts, 99, interval.max),
+                ]
+        # Clients that only reported #interval lines join with count-weighted percentiles
+        for (op, slot), acc in self.interval_summaries.items():
+            if op == optype:
+                mine = series.setdefault(slot, [0, 0.0, 0.0])
+                for i in range(3):
+                    mine[i] += acc[i]
+        slots = sorted(slot for slot in series if series[slot][0])
+        # The first and last intervals are usually cut by the steady-state window
+        if len(slots) > 2:
+            slots = slots[1:-1]
+        return [
+            (series[slot][0], series[slot][1] / series[slot][0], series[slot][2] / series[slot][0]) for slot in slots
+        ]
+
+    def stats(self, steady_secs=None):
+        self.flush()
+        interval_secs = self.interval_ns / 1e9
+        aggregate, run_stats = {}, {}
+        for optype, totals in sorted(self.totals.items()):
+            series = self._interval_series(optype)
+            secs = steady_secs
+            if not secs:
+                secs = len(series) * interval_secs or 1.0
+            entry = {
+                "count": totals.count,
+                "tput": totals.count / secs,
+                "mean": totals.total / totals.count / 1e6 if totals.count else 0.0,
+                "max": totals.max / 1e6,
+            }
+            for name, q in PERCENTILES.items():
+                entry[name] = percentile_of(totals.counts, q, totals.max) / 1e6
+            aggregate[optype] = entry
+            if series:
+                columns = np.array(series, dtype=np.float64)
+                tput, p50, p99 = columns[:, 0] / interval_secs, columns[:, 1] / 1e6, columns[:, 2] / 1e6
+            else:
+                # Only #hist summaries: the whole steady state is one interval
+                tput, p50, p99 = (np.array([entry[name]]) for name in ("tput", "p50", "p99"))
+            run_stats[optype] = {"tput": _distribution(tput), "p50": _distribution(p50), "p99": _distribution(p99)}
+        return {
+            "clients": len(self.clients),
+            "interval_secs": interval_secs,
+            "steady_secs": steady_secs,
+            "aggregate": aggregate,
+            "run_stats": run_stats,
+        }
+
+
+def _distribution(values):
+    return {
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "p50": float(np.percentile(values, 50)),
+        "p90": float(np.percentile(values, 90)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+def aggregate_file(path, interval_secs=1.0):
+    aggregator = Aggregator(interval_secs)
+    with open(path, "r") as f:
+        aggregator.feed(f)
+    return aggregator
+
+
+def aggregate_files(paths, interval_secs=1.0, workers=None):
+    """Aggregate many output files, one worker process per file."""
+    paths = list(paths)
+    if len(paths) <= 1 or workers == 1:
+        result = Aggregator(interval_secs)
+        for path in paths:
+            result.merge(aggregate_file(path, interval_secs))
+        return result
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    result = Aggregator(interval_secs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for aggregator in pool.map(aggregate_file, paths, [interval_secs] * len(paths)):
+            result.merge(aggregator)
+    return result
+
+
+def write_stats_file(path, stats):
+    with open(path, "w") as f:
+        json.dump(stats, f, indent=2)
+
+
+def get_path(stats, keys):
+    """Follow a plot config's x_var / y_var path, e.g. ["aggregate", "app", "p99"]."""
+    value = stats
+    for key in keys:
+        value = value[key]
+    return value
+
+
+def default_interval_secs():
+    return float(os.environ.get("IOCL_TPUT_INTERVAL", 0) or 1.0)
+
+
+class TeeAggregator:
+    """
+    File-like wrapper that passes writes through to out and feeds every
+    complete line to an Aggregator, so a client can write its own stats file.
+    """
+
+    def __init__(self, out, aggregator):
+        self.out = out
+        self.aggregator = aggregator
+        self._partial = ""
+        self._lock = threading.Lock()
+
+    def write(self, s):
+        self.out.write(s)
+        with self._lock:
+            lines = (self._partial + s).split("\n")
+            self._partial = lines.pop()
+            for line in lines:
+                self.aggregator.feed_line(line)
+        return len(s)
+
+    def flush(self):
+        self.out.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.out, name)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="IOCL Results Aggregator")
+    parser.add_argument("outputs", nargs="+", help="Client output files")
+    parser.add_argument("--stats_file", default="stats.json", help="Where to write the stats")
+    parser.add_argument(
+        "--steady_secs", type=float, default=None, help="Steady-state length (default: from the intervals)"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=None, help="Interval length in seconds (default: IOCL_TPUT_INTERVAL or 1)"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Parallel worker processes")
+    args = parser.parse_args()
+    if args.interval is not None and args.interval <= 0:
+        parser.error("--interval must be greater than 0")
+
+    stats = aggregate_files(args.outputs, args.interval or default_interval_secs(), args.workers).stats(
+        args.steady_secs
+    )
+    write_stats_file(args.stats_file, stats)
+    app = stats["aggregate"].get("app")
+    if app is not None:
+        print(f"app,{app['count']},{app['tput']:.1f},{app['p50']:.3f},{app['p99']:.3f}")
@@ -0,0 +1,165 @@
+import collections
+import os
+import sys
+import time
+
+from iocl.histogram import recorder_from_env
+from iocl.iocl_utils import await_many, prepare
+from iocl.mpl import run_logical_clients
+from iocl.opmix import OpMix
+from iocl.opstream import op_stream_from_env
+
+# Parametric synthetic microbenchmark. Every iteration issues one op kind to
+# `fanout` keys and reports the latency of the whole group, so the pipelined
+# and serial modes can be compared at each fanout:
+#
+#   pipelined   issue all requests, then await them together (one overlapped
+#               round trip; an RMW is a round of GETs, then a round of SETs)
+#   serial      send and await the requests one after the other
+#
+# Knobs, from the environment (or the matching client_synthetic_* config keys):
+#
+#   IOCL_SYNTHETIC_FANOUT       requests per iteration (default 1)
+#   IOCL_SYNTHETIC_VALUE_SIZE   bytes per written value (default 6)
+#   IOCL_SYNTHETIC_KEYS         same      every request uses test_key_{client}_1
+#                               distinct  test_key_{client}_{i} per request
+#                               shared    test_key_shared_{i}, common to all clients
+#   IOCL_SYNTHETIC_MODE         pipelined | serial (default: the script's)
+#
+# The op kind is drawn per iteration from IOCL_CLIENT_READ_PERCENTAGE,
+# IOCL_CLIENT_WRITE_PERCENTAGE and IOCL_CLIENT_RMW_PERCENTAGE, used as relative
+# weights; with none set every op is a write. The old synthetic_f1/f2/f4
+# scripts are fanout 1/2/4 with "same" keys and writes only.
+
+CLIENT_TYPE = "multi_paxos"
+
+MODES = ("pipelined", "serial")
+KEY_MODES = ("same", "distinct", "shared")
+
+SyntheticConfig = collections.namedtuple("SyntheticConfig", ["fanout", "value_size", "keys", "mode", "mix"])
+
+
+def op_mix_from_env():
+    weights = {
+        "GET": os.environ.get("IOCL_CLIENT_READ_PERCENTAGE", 0),
+        "SET": os.environ.get("IOCL_CLIENT_WRITE_PERCENTAGE", 0),
+        "RMW": os.environ.get("IOCL_CLIENT_RMW_PERCENTAGE", 0),
+    }
+    weights = {name: max(float(w or 0), 0.0) for name, w in weights.items()}
+    if not any(weights.values()):
+        weights = {"SET": 1}
+    return OpMix(weights)
+
+
+def config_from_env(default_mode="pipelined"):
+    config = SyntheticConfig(
+        fanout=int(os.environ.get("IOCL_SYNTHETIC_FANOUT", 1) or 1),
+        value_size=int(os.environ.get("IOCL_SYNTHETIC_VALUE_SIZE", 6) or 6),
+        keys=os.environ.get("IOCL_SYNTHETIC_KEYS", "") or "same",
+        mode=os.environ.get("IOCL_SYNTHETIC_MODE", "") or default_mode,
+        mix=op_mix_from_env(),
+    )
+    if config.fanout < 1:
+        raise ValueError("Synthetic fanout must be at least 1")
+    if config.keys not in KEY_MODES:
+        raise ValueError(f"Unknown synthetic key mode: {config.keys}")
+    if config.mode not in MODES:
+        raise ValueError(f"Unknown synthetic mode: {config.mode}")
+    return config
+
+
+def key_names(client_id, fanout, keys):
+    if keys == "same":
+        return [f"test_key_{client_id}_1"] * fanout
+    if keys == "distinct":
+        return [f"test_key_{client_id}_{i + 1}" for i in range(fanout)]
+    return [f"test_key_shared_{i + 1}" for i in range(fanout)]
+
+
+class SyntheticOps:
+    """Prepared GET and SET requests for each fanout key."""
+
+    def __init__(self, session_id, names, value):
+        self.session_id = session_id
+        self.gets = [prepare(session_id, "GET", name) for name in names]
+        self.sets = [prepare(session_id, "SET", name) for name in names]
+        self.value = value
+
+    def pipelined(self, requests, value=""):
+        return await_many(self.session_id, [request.send(value, None) for request in requests])
+
+    def serial(self, requests, value=""):
+        return [request.send_and_await(value, None) for request in requests]
+
+    def run(self, optype, mode):
+        issue = self.pipelined if mode == "pipelined" else self.serial
+        if optype == "GET":
+            return issue(self.gets)
+        if optype == "SET":
+            return issue(self.sets, self.value)
+        if mode == "pipelined":
+            self.pipelined(self.gets)
+            return self.pipelined(self.sets, self.value)
+        # Serial RMW: each key's GET is followed by its SET
+        return [
+            (get.send_and_await("", None), put.send_and_await(self.value, None))[1]
+            for get, put in zip(self.gets, self.sets)
+        ]
+
+
+def run(session_id, client_id, explen, warmup_secs=0, cooldown_secs=0, default_mode="pipelined"):
+    explen = float(explen)
+    config = config_from_env(default_mode)
+    print(
+        f"RUNNING SYNTHETIC ({config.mode}, fanout {config.fanout}, {config.keys} keys, "
+        f"{config.value_size}B values) - IOCL-CT",
+        file=sys.stderr,
+    )
+
+    rampUp = int(warmup_secs)
+    rampDown = int(cooldown_secs)
+
+    if rampUp + rampDown >= explen:
+        raise ValueError("Ramp-up + ramp-down must be less than total experiment length")
+
+    steady_secs = explen - rampUp - rampDown
+    t_start = time.time()
+    t_end = t_start + explen
+
+    ops = SyntheticOps(session_id, key_names(client_id, config.fanout, config.keys), "v" * config.value_size)
+    latencies = recorder_from_env(client_id, t_start)
+    draws = op_stream_from_env(client_id, columns=1)
+
+    print("#start,0,0")
+
+    while time.time() < t_end:
+        optype = config.mix.select(draws.next()[0])
+
+        before = int(time.time() * 1e9)  # latency in ns
+        ops.run(optype, config.mode)
+        after = int(time.time() * 1e9)
+        lat = after - before
+        optime = int((time.time() - t_start) * 1e9)
+
+        now = time.time()
+        # Only record latencies during steady-state
+        if rampUp <= (now - t_start) < (rampUp + steady_secs):
+            latencies.record(optype, lat, optime)
+
+    elapsed = time.time() - t_start
+    latencies.finish(elapsed)
+    end_sec = int(elapsed)
+    end_usec = int((elapsed - end_sec) * 1e6)
+    print(f"#end,{end_sec},{end_usec},{client_id}")
+
+
+def run_app(session_id, client_id, client_type, explen, warmup_secs=0, cooldown_secs=0, default_mode="pipelined"):
+    """run_app of sync/synthetic.py and async/synthetic.py, which differ only in their default mode."""
+    import redisstore
+
+    run_logical_clients(
+        session_id,
+        client_id,
+        lambda session, logical_id: run(session, logical_id, explen, warmup_secs, cooldown_secs, default_mode),
+        redisstore.custom_init_session,
+    )
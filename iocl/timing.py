@@ -0,0 +1,158 @@
+import array
+import atexit
+import os
+import signal
+import struct
+import sys
+import threading
+
+# In-memory recorder for the Python-side timing points (see
+# TIMING_INSTRUMENTATION_SUMMARY.md). Events go into a preallocated ring of
+# (location id, timestamp ns, command id) int64 triples and are written out in
+# a compact binary file at exit or on SIGUSR1.
+#
+# File layout (little-endian):
+#   8s   magic "IOCLTIM1"
+#   q    client id
+#   q    pid
+#   I    sample_every
+#   q    total events recorded (including those overwritten in the ring)
+#   I    number of location labels, then per label: H length + utf-8 bytes
+#   q    number of records that follow
+#   3q   per record: location id, timestamp ns, command id (-1 if none)
+
+MAGIC = b"IOCLTIM1"
+NO_COMMAND = -1
+
+
+class TimingRecorder:
+    """
+    Fixed-size ring buffer of timing events. With sample_every=N only commands
+    whose id is a multiple of N are kept, so sampled commands keep every point
+    on their path.
+    """
+
+    def __init__(self, capacity=1 << 20, sample_every=1, client_id=0):
+        self.capacity = int(capacity)
+        self.sample_every = max(int(sample_every), 1)
+        self.client_id = int(client_id)
+        self._records = array.array("q", bytes(8 * 3 * self.capacity))
+        self._total = 0
+        self._labels = []
+        self._label_ids = {}
+        # Logical clients on other threads (IOCL_MPL) record into the same ring.
+        # Reentrant, since a SIGUSR1 dump can interrupt a record on the main thread.
+        self._lock = threading.RLock()
+
+    def location_id(self, label):
+        location_id = self._label_ids.get(label)
+        if location_id is None:
+            location_id = len(self._labels)
+            self._labels.append(label)
+            self._label_ids[label] = location_id
+        return location_id
+
+    def record(self, label, timestamp_ns, command_id=None):
+        if command_id is None:
+            command_id = NO_COMMAND
+        elif self.sample_every > 1 and command_id % self.sample_every:
+            return
+        records = self._records
+        with self._lock:
+            i = (self._total % self.capacity) * 3
+            records[i] = self.location_id(label)
+            records[i + 1] = timestamp_ns
+            records[i + 2] = command_id
+            self._total += 1
+
+    def _ordered_records(self):
+        """Ring contents, oldest record first."""
+        count = min(self._total, self.capacity)
+        start = (self._total % self.capacity) * 3 if self._total > self.capacity else 0
+        ordered = self._records[start:count * 3] + self._records[:start]
+        if sys.byteorder != "little":
+            ordered.byteswap()
+        return count, ordered
+
+    def dump(self, path):
+        with self._lock:
+            count, ordered = self._ordered_records()
+            labels = list(self._labels)
+            total = self._total
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<qqIq", self.client_id, os.getpid(), self.sample_every, total))
+            f.write(struct.pack("<I", len(labels)))
+            for label in labels:
+                encoded = label.encode("utf-8")
+                f.write(struct.pack("<H", len(encoded)))
+                f.write(encoded)
+            f.write(struct.pack("<q", count))
+            f.write(ordered.tobytes())
+
+
+def load_dump(path):
+    """Read a dump back into a header dict and a list of (label, timestamp_ns, command_id)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != MAGIC:
+        raise ValueError(f"{path} is not a timing dump")
+    offset = 8
+    client_id, pid, sample_every, total = struct.unpack_from("<qqIq", data, offset)
+    offset += struct.calcsize("<qqIq")
+    (num_labels,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    labels = []
+    for _ in range(num_labels):
+        (length,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        labels.append(data[offset:offset + length].decode("utf-8"))
+        offset += length
+    (count,) = struct.unpack_from("<q", data, offset)
+    offset += 8
+    records = array.array("q")
+    records.frombytes(data[offset:offset + count * 24])
+    if sys.byteorder != "little":
+        records.byteswap()
+    header = {"client_id": client_id, "pid": pid, "sample_every": sample_every, "total": total}
+    events = [
+        (labels[records[i]], records[i + 1], records[i + 2]) for i in range(0, len(records), 3)
+    ]
+    return header, events
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    """
+    Process-wide recorder configured from the environment on first use.
+    Signal handlers can only be installed from the main thread, so the
+    SIGUSR1 dump is registered only when the recorder is created there;
+    run_client creates it at startup for that reason.
+    """
+    global _recorder
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                recorder = TimingRecorder(
+                    capacity=int(os.environ.get("IOCL_TIMING_CAPACITY", 1 << 20)),
+                    sample_every=int(os.environ.get("IOCL_TIMING_SAMPLE_EVERY", 1)),
+                    client_id=int(os.environ.get("IOCL_CLIENT_ID", 0)),
+                )
+                path = os.environ.get("IOCL_TIMING_FILE") or f"timing_{recorder.client_id}_{os.getpid()}.bin"
+                atexit.register(recorder.dump, path)
+                if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+                    signal.signal(signal.SIGUSR1, lambda signum, frame: recorder.dump(path))
+                _recorder = recorder
+    return _recorder
+
+
+if __name__ == "__main__":
+    # Print a dump in the legacy TIMING,<location>,<timestamp_ns>,<client_id>,<command_id> format
+    for dump_path in sys.argv[1:]:
+        header, events = load_dump(dump_path)
+        for label, timestamp_ns, command_id in events:
+            cmd_id_str = str(command_id) if command_id != NO_COMMAND else "-"
+            print(f"TIMING,{label},{timestamp_ns},{header['client_id']},{cmd_id_str},-,")
@@ -0,0 +1,188 @@
+import atexit
+import json
+import os
+import struct
+import threading
+import time
+
+# Compact binary traces of what a client issued, for replay (see
+# sync/replay.py). Two kinds of records are kept:
+#   - app ops from the workload drivers: op name, arguments, intended start
+#     time and observed latency
+#   - raw requests as they reach async_send_request: Operation value, hashed
+#     key, new_val and old_val, the send time and the latency until the client
+#     collected the reply. They are written once the reply is collected, so
+#     within a stream they appear in completion order; send time + latency
+#     gives the original send/await interleaving back
+#
+# File layout (little-endian): magic "IOCLTRC1", then a sequence of records.
+#   B  kind: 0 = label, 1 = app op, 2 = request
+#   label:   H label id, H length, utf-8 bytes (defined before first use)
+#   app op:  H label id, q stream, q start ns, q latency ns, B nargs, args
+#   request: H operation, q stream, q send ns, q latency ns, B nargs, args
+#            (latency -1 if the reply was never collected)
+# Each arg is a one-byte tag followed by its value: "n" None, "i" q, "u" Q,
+# "f" d, "s" I length + utf-8, "j" I length + JSON (dicts and lists).
+# The stream is the session id that issued the record.
+
+MAGIC = b"IOCLTRC1"
+LABEL, APP_OP, REQUEST = 0, 1, 2
+NO_LATENCY = -1
+
+_RECORD = struct.Struct("<HqqqB")
+
+
+def _encode_arg(arg, out):
+    if arg is None:
+        out.append(b"n")
+    elif isinstance(arg, bool) or not isinstance(arg, (int, float, str)):
+        if isinstance(arg, (dict, list, tuple)):
+            encoded = json.dumps(arg).encode("utf-8")
+            out.append(b"j" + struct.pack("<I", len(encoded)) + encoded)
+        else:
+            _encode_arg(str(arg), out)
+    elif isinstance(arg, int):
+        out.append(b"i" + struct.pack("<q", arg) if -(1 << 63) <= arg < (1 << 63) else b"u" + struct.pack("<Q", arg))
+    elif isinstance(arg, float):
+        out.append(b"f" + struct.pack("<d", arg))
+    else:
+        encoded = arg.encode("utf-8")
+        out.append(b"s" + struct.pack("<I", len(encoded)) + encoded)
+
+
+def _decode_arg(data, offset):
+    tag = data[offset:offset + 1]
+    offset += 1
+    if tag == b"n":
+        return None, offset
+    if tag in (b"i", b"u", b"f"):
+        (value,) = struct.unpack_from("<" + {b"i": "q", b"u": "Q", b"f": "d"}[tag], data, offset)
+        return value, offset + 8
+    (length,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    text = data[offset:offset + length].decode("utf-8")
+    return (json.loads(text) if tag == b"j" else text), offset + length
+
+
+class TraceWriter:
+    """
+    Appends app-op and request records to a trace file. Safe to share between
+    the logical clients of a process.
+    """
+
+    def __init__(self, path, app_ops=True, requests=True):
+        self.path = path
+        self.app_ops = app_ops
+        self.requests = requests
+        self._file = open(path, "wb", buffering=1 << 20)
+        self._file.write(MAGIC)
+        self._labels = {}
+        # (stream, command id) -> (operation, send ns, args) until the reply is collected
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _label_id(self, label):
+        label_id = self._labels.get(label)
+        if label_id is None:
+            label_id = self._labels[label] = len(self._labels)
+            encoded = label.encode("utf-8")
+            self._file.write(struct.pack("<BHH", LABEL, label_id, len(encoded)) + encoded)
+        return label_id
+
+    def _write(self, kind, label_or_op, stream, t_ns, latency_ns, args):
+        out = []
+        for arg in args:
+            _encode_arg(arg, out)
+        with self._lock:
+            if self._file.closed:
+                return
+            if kind == APP_OP:
+                label_or_op = self._label_id(label_or_op)
+            self._file.write(
+                bytes([kind]) + _RECORD.pack(label_or_op, stream, t_ns, latency_ns, len(args)) + b"".join(out)
+            )
+
+    def app_op(self, stream, optype, args, start_ns, latency_ns):
+        if self.app_ops:
+            self._write(APP_OP, optype, stream, start_ns, latency_ns, args)
+
+    def request(self, stream, command_id, operation, key, new_val, old_val):
+        """Note a request as it is sent; it is written by request_done."""
+        if self.requests:
+            with self._lock:
+                self._inflight[(stream, command_id)] = (int(operation), time.time_ns(), (key, new_val, old_val))
+
+    def request_done(self, stream, command_id):
+        """Write a request whose reply the client just collected, with its observed latency."""
+        if self.requests:
+            with self._lock:
+                sent = self._inflight.pop((stream, command_id), None)
+            if sent is not None:
+                operation, send_ns, args = sent
+                self._write(REQUEST, operation, stream, send_ns, time.time_ns() - send_ns, args)
+
+    def close(self):
+        with self._lock:
+            inflight, self._inflight = self._inflight, {}
+        for (stream, _), (operation, send_ns, args) in sorted(inflight.items(), key=lambda item: item[1][1]):
+            self._write(REQUEST, operation, stream, send_ns, NO_LATENCY, args)
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def read_trace(path):
+    """
+    Yields (kind, name, stream, t_ns, latency_ns, args) for every app-op and
+    request record, in file order. name is the op name for app ops and the
+    Operation value for requests.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != MAGIC:
+        raise ValueError(f"{path} is not a trace")
+    labels = {}
+    offset = 8
+    while offset < len(data):
+        kind = data[offset]
+        offset += 1
+        if kind == LABEL:
+            label_id, length = struct.unpack_from("<HH", data, offset)
+            offset += 4
+            labels[label_id] = data[offset:offset + length].decode("utf-8")
+            offset += length
+            continue
+        name, stream, t_ns, latency_ns, nargs = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        args = []
+        for _ in range(nargs):
+            arg, offset = _decode_arg(data, offset)
+            args.append(arg)
+        yield kind, (labels[name] if kind == APP_OP else name), stream, t_ns, latency_ns, args
+
+
+_writer = None
+_writer_resolved = False
+_writer_lock = threading.Lock()
+
+
+def get_trace_writer():
+    """
+    Process-wide writer when IOCL_TRACE_FILE is set, else None; resolved on
+    first use. The path may use {clientid} and {pid}; IOCL_TRACE_OPS picks
+    "app", "raw" or "all".
+    """
+    global _writer, _writer_resolved
+    if not _writer_resolved:
+        with _writer_lock:
+            path = os.environ.get("IOCL_TRACE_FILE")
+            if not _writer_resolved and path:
+                ops = os.environ.get("IOCL_TRACE_OPS", "all")
+                _writer = TraceWriter(
+                    path.format(clientid=os.environ.get("IOCL_CLIENT_ID", 0), pid=os.getpid()),
+                    app_ops=ops in ("app", "all"),
+                    requests=ops in ("raw", "all"),
+                )
+                atexit.register(_writer.close)
+            _writer_resolved = True
+    return _writer
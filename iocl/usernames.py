@@ -0,0 +1,97 @@
+import atexit
+import collections
+import os
+import sys
+import threading
+
+# Process-local cache of user key -> username for the chat utils' HMGET
+# username lookups. A username never changes after create_user writes it, so
+# entries need no invalidation: they are filled by create_user and by lookup
+# misses, and the least recently used entry is dropped once the cache holds
+# IOCL_USERNAME_CACHE_SIZE users (0 turns the cache off). Hits return the
+# same (success, [username]) reply shape as the HMGET they stand in for.
+
+DEFAULT_CAPACITY = 100000
+
+
+class UsernameCache:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = int(capacity)
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, user_key):
+        """Cached HMGET reply for user_key, or None on a miss."""
+        with self._lock:
+            username = self._entries.get(user_key)
+            if username is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_key)
+            self.hits += 1
+        return (True, [username])
+
+    def store(self, user_key, username):
+        if self.capacity <= 0 or not username:
+            return
+        with self._lock:
+            self._entries[user_key] = username
+            self._entries.move_to_end(user_key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def fill(self, user_key, reply):
+        """Remember an HMGET username reply; empty replies (no such user yet) are not cached."""
+        if isinstance(reply, tuple) and len(reply) == 2:
+            success, value = reply
+            if not success:
+                return
+            reply = value
+        if isinstance(reply, (list, tuple)) and reply:
+            self.store(user_key, reply[0])
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "evictions": self.evictions,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_username_cache():
+    """Process-wide cache, sized from IOCL_USERNAME_CACHE_SIZE on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = UsernameCache(int(os.environ.get("IOCL_USERNAME_CACHE_SIZE", DEFAULT_CAPACITY)))
+    return _cache
+
+
+def username_cache_stats():
+    return get_username_cache().stats() if _cache is not None else UsernameCache(0).stats()
+
+
+def _print_stats():
+    if os.environ.get("IOCL_DEBUG_STATS", "false").lower() != "true" or _cache is None:
+        return
+    stats = _cache.stats()
+    print(
+        f"#usernamecache,{stats['hits']},{stats['misses']},{stats['hit_rate']:.4f},"
+        f"{stats['size']},{stats['evictions']}",
+        file=sys.stderr,
+    )
+
+
+atexit.register(_print_stats)
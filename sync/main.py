@@ -3,10 +3,10 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from iocl.config_env import set_env_from_command_line_args, init_benchmark_with_config
+from iocl.mpl import run_logical_clients
+from iocl.iocl_utils import send_request_and_await
 import redisstore
 import sync.workload_app_sync as workload_app_sync
-from iocl.iocl_utils import send_request_and_await
 
 
 def run_app(session_id, client_id, client_type, explen, warmup_secs, cooldown_secs):
@@ -28,81 +28,17 @@ def run_app(session_id, client_id, client_type, explen, warmup_secs, cooldown_se
             )
             if total_users_exist != "0":
                 break
-    workload_app_sync.create(session_id, client_id, explen, warmup_secs, cooldown_secs)
+    # Each logical client (IOCL_MPL) gets its own session and reports its own client id
+    run_logical_clients(
+        session_id,
+        client_id,
+        lambda session, logical_id: workload_app_sync.create(session, logical_id, explen, warmup_secs, cooldown_secs),
+        redisstore.custom_init_session,
+    )
     return
 
 
 if __name__ == "__main__":
-    import argparse
-    import sys
-
-    parser = argparse.ArgumentParser(description="IOCL Benchmark Client")
-
-    parser.add_argument(
-        "--config",
-        action="store",
-        dest="config_path",
-        default="/users/akalaba/IOCL/experiments/configs/1shard_transformed_test.json",
-        help="Path to the JSON configuration file",
-    )
-    parser.add_argument(
-        "--explen",
-        type=int,
-        dest="explen",
-        default=30,
-        help="Experiment length override",
-    )
-    parser.add_argument("--warmup_secs", type=int, default=0, help="Warmup seconds")
-    parser.add_argument("--cooldown_secs", type=int, default=0, help="Cooldown seconds")
-    parser.add_argument("--clientid", type=int, default=0, help="Client ID")
-    parser.add_argument("--num_keys", type=int, default=1000000, help="Number of keys")
-    parser.add_argument("--num_shards", type=int, default=1, help="Number of shards")
-    parser.add_argument(
-        "--replica_config_paths",
-        type=str,
-        default="",
-        help="Path(s) to replica config(s)",
-    )
-    parser.add_argument(
-        "--net_config_path", type=str, default="", help="Path to network config"
-    )
-    parser.add_argument(
-        "--client_host", type=str, default="localhost", help="Client host name"
-    )
-    parser.add_argument(
-        "--trans_protocol",
-        type=str,
-        choices=["tcp", "udp"],
-        default="tcp",
-        help="Transport protocol",
-    )
-
-    parser.add_argument("--partitioner", type=str, default="", help="Partitioner type")
-    parser.add_argument("--key_selector", type=str, default="", help="Key selector")
-    parser.add_argument(
-        "--zipf_coefficient", type=float, default=0.0, help="Zipf coefficient"
-    )
-    parser.add_argument("--debug_stats", action="store_true", help="Enable debug stats")
-    parser.add_argument("--delay", type=int, default=0, help="Random delay")
-    parser.add_argument(
-        "--ping_replicas", type=str, default="", help="Ping replicas flag"
-    )
-    parser.add_argument("--stats_file", type=str, default="", help="Stats file path")
-
-    args = parser.parse_args()
-
-    try:
-        set_env_from_command_line_args(args)
-        init_benchmark_with_config(args.config_path)
-        session_id = redisstore.custom_init_session()
-        run_app(session_id, args.clientid, "multi_paxos", args.explen, args.warmup_secs, args.cooldown_secs)
-
-    except FileNotFoundError:
-        print(f"Error: Config file not found at {args.config_path}")
-        sys.exit(1)
-    except Exception as e:
-        print(f"Error initializing client: {e}")
-        import traceback
+    from iocl.cli import run_client
 
-        traceback.print_exc()
-        sys.exit(1)
+    run_client(run_app, "multi_paxos")
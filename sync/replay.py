@@ -0,0 +1,160 @@
+import heapq
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iocl.config_env import init_benchmark_with_config
+from iocl.keyspace import attach_table_from_env
+from iocl.mpl import run_logical_clients
+from iocl.histogram import recorder_from_env
+from iocl.trace import APP_OP, REQUEST, read_trace
+from iocl.iocl_utils import _command_id_to_int, iter_await_many
+from redisstore import async_send_request, Operation
+import redisstore
+import sync.workload_app_sync as workload_app_sync
+
+# Re-issues a trace recorded with IOCL_TRACE_FILE against whatever backend the
+# config selects. Each recorded stream (session) is replayed by its own logical
+# client. App ops are issued one at a time. Raw requests keep the recorded
+# pipelining: a request is sent while earlier ones are outstanding, and an
+# earlier request is awaited before the next send only if the original client
+# had collected its reply by then (recorded send time + latency). With --speed N
+# each record is due at its recorded offset divided by N and latency is
+# measured from that intended start; --speed 0 replays back to back, as fast as
+# possible.
+
+
+def load_streams(trace_path, mode):
+    """Records of the selected kind, grouped by stream in recorded order."""
+    kind = APP_OP if mode == "app" else REQUEST
+    streams = {}
+    for record_kind, name, stream, t_ns, latency_ns, args in read_trace(trace_path):
+        if record_kind == kind:
+            streams.setdefault(stream, []).append((name, t_ns, latency_ns, args))
+    # Requests are written as their replies are collected; replay in send order
+    return [sorted(streams[stream], key=lambda record: record[1]) for stream in sorted(streams)]
+
+
+def pace(t_ns, speed, trace_t0, t_start):
+    """Sleep until the record is due; returns the ns timestamp latency is measured from."""
+    if speed <= 0:
+        return int(time.time() * 1e9)
+    intended = t_start + (t_ns - trace_t0) / 1e9 / speed
+    delay = intended - time.time()
+    if delay > 0:
+        time.sleep(delay)
+    return int(intended * 1e9)
+
+
+def replay_app_ops(session_id, records, speed, trace_t0, t_start, latencies):
+    for name, t_ns, _, args in records:
+        before = pace(t_ns, speed, trace_t0, t_start)
+        workload_app_sync.OPS[name].run(session_id, *args)
+        after = int(time.time() * 1e9)
+        latencies.record(name, after - before, after - int(t_start * 1e9))
+
+
+def replay_requests(session_id, records, speed, trace_t0, t_start, latencies):
+    # Outstanding requests as (recorded collection ns, command id, op name, start ns)
+    outstanding = []
+
+    def collect(due):
+        started = {command_id: (optype, before) for _, command_id, optype, before in due}
+        for command_id, _ in iter_await_many(session_id, list(started)):
+            optype, before = started[command_id]
+            after = int(time.time() * 1e9)
+            latencies.record(optype, after - before, after - int(t_start * 1e9))
+
+    for name, t_ns, latency_ns, args in records:
+        # Await what the original client had collected before this send
+        due = []
+        while outstanding and outstanding[0][0] <= t_ns:
+            due.append(heapq.heappop(outstanding))
+        if due:
+            collect(due)
+
+        before = pace(t_ns, speed, trace_t0, t_start)
+        key, new_val, old_val = args
+        # Keys were recorded already hashed, so go straight to the binding
+        success, command_id = async_send_request(session_id, Operation(name), key, new_val, old_val)
+        if not success:
+            raise RuntimeError("AsyncSendRequest failed")
+        # Replies that were never collected are awaited at the end
+        collected_ns = t_ns + latency_ns if latency_ns >= 0 else float("inf")
+        heapq.heappush(outstanding, (collected_ns, _command_id_to_int(command_id), Operation(name).name, before))
+
+    if outstanding:
+        collect(outstanding)
+
+
+def replay_stream(session_id, clientid, records, mode, speed, trace_t0, t_start):
+    latencies = recorder_from_env(clientid, t_start)
+
+    print("#start,0,0")
+
+    if mode == "app":
+        replay_app_ops(session_id, records, speed, trace_t0, t_start, latencies)
+    else:
+        replay_requests(session_id, records, speed, trace_t0, t_start, latencies)
+
+    elapsed = time.time() - t_start
+    latencies.finish(elapsed)
+    end_sec = int(elapsed)
+    end_usec = int((elapsed - end_sec) * 1e6)
+    print(f"#end,{end_sec},{end_usec},{clientid}")
+
+
+def replay(session_id, clientid, trace_path, mode="app", speed=1.0):
+    streams = load_streams(trace_path, mode)
+    if not streams:
+        raise ValueError(f"No {mode} records in {trace_path}")
+    trace_t0 = min(records[0][1] for records in streams)
+    t_start = time.time()
+    run_logical_clients(
+        session_id,
+        clientid,
+        lambda session, logical_id: replay_stream(
+            session, logical_id, streams[logical_id - clientid * len(streams)], mode, speed, trace_t0, t_start
+        ),
+        redisstore.custom_init_session,
+        mpl=len(streams),
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="IOCL Trace Replay")
+    parser.add_argument("trace", help="Trace file recorded with IOCL_TRACE_FILE")
+    parser.add_argument(
+        "--config",
+        action="store",
+        dest="config_path",
+        default="/users/akalaba/IOCL/experiments/configs/1shard_transformed_test.json",
+        help="Path to the JSON configuration file",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["app", "raw"],
+        default="app",
+        help="Replay chat-level ops or raw requests",
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="Time scale; 0 replays as fast as possible"
+    )
+    parser.add_argument("--clientid", type=int, default=0, help="Client ID")
+
+    args = parser.parse_args()
+
+    try:
+        os.environ["IOCL_CLIENT_ID"] = str(args.clientid)
+        init_benchmark_with_config(args.config_path)
+        attach_table_from_env()
+        session_id = redisstore.custom_init_session()
+        replay(session_id, args.clientid, args.trace, args.mode, args.speed)
+
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
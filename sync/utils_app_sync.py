@@ -1,6 +1,11 @@
 import json
-import bcrypt
-from iocl.iocl_utils import send_request_and_await
+import os
+import time
+from iocl.iocl_utils import send_request_and_await, send_batch, await_batch
+from iocl.messages import encode_message
+from iocl.passwords import check_password, get_password_pool
+from iocl.replies import exists as _exists, get_messages_mode, members as _members, room_messages, unwrap as _unwrap
+from iocl.usernames import get_username_cache
 import sys
 
 
@@ -10,8 +15,9 @@ def make_username_key(username):
 
 def create_user(session_id, username, password):
     username_key = make_username_key(username)
-    hashed_password = bcrypt.hashpw(str(password).encode("utf-8"), bcrypt.gensalt(10))
-    next_id = send_request_and_await(session_id, "INCR", "total_users", None, None)
+    # The hash is computed on the password pool while INCR is in flight
+    hashing = get_password_pool().hash(password)
+    next_id = _unwrap(send_request_and_await(session_id, "INCR", "total_users", None, None))
     # Debug: log next_id and its type
     # try:
     #     print(f"[DEBUG] create_user next_id={next_id} type={type(next_id)}", file=sys.stderr)
@@ -19,7 +25,7 @@ def create_user(session_id, username, password):
     #     pass
     user_key = f"user:{next_id}"
 
-    hashed_password_str = hashed_password.decode("utf-8")
+    hashed_password_str = hashing.result()
 
     send_request_and_await(session_id, "SET", username_key, user_key, None)
     send_request_and_await(
@@ -30,17 +36,22 @@ def create_user(session_id, username, password):
         "",
     )
     send_request_and_await(session_id, "SADD", f"user:{next_id}:rooms", "0", None)
+    get_username_cache().store(user_key, username)
     return {"id": next_id, "username": username}
 
 
 def get_messages(session_id, room_id=0, offset=0, size=10):
     """Check if room with id exists; fetch messages limited by size"""
     room_key = f"room:{room_id}"
+    mode = get_messages_mode()
+    if mode != "checked":
+        requests = [("ZREVRANGE", room_key, offset, offset + size)]
+        if mode == "speculative":
+            requests.insert(0, ("EXISTS", room_key))
+        replies = await_batch(session_id, send_batch(session_id, requests))
+        return room_messages(replies[0] if mode == "speculative" else None, replies[-1])
     room_exists = send_request_and_await(session_id, "EXISTS", room_key, None, None)
-    # room_exists may be tuple or bool-like depending on bridge; normalize
-    if isinstance(room_exists, tuple) and len(room_exists) == 2:
-        room_exists = room_exists[1]
-    if not room_exists:
+    if not _exists(room_exists):
         return []
     else:
         values = send_request_and_await(
@@ -55,12 +66,18 @@ def get_messages(session_id, room_id=0, offset=0, size=10):
         # except Exception:
         #     pass
 
-        return values
+        return room_messages(None, values)
 
 
 def hmget(session_id, key, key2):
-    """Wrapper around hmget to unpack bytes from hmget"""
-    result = send_request_and_await(session_id, "HMGET", key, key2, None)
+    """Wrapper around hmget to unpack bytes from hmget; usernames come from the cache when they can"""
+    if key2 != "username":
+        return list(send_request_and_await(session_id, "HMGET", key, key2, None))
+    cache = get_username_cache()
+    result = cache.lookup(key)
+    if result is None:
+        result = send_request_and_await(session_id, "HMGET", key, key2, None)
+        cache.fill(key, result)
     return list(result)
 
 
@@ -84,6 +101,88 @@ def create_private_room(session_id, user1, user2):
     return ({"id": room_id, "names": [user1, user2]}, False)
 
 
+def login(session_id, username, password):
+    """Log in, creating the user on first login as the /login route does"""
+    username_key = make_username_key(username)
+    user_exists = send_request_and_await(session_id, "EXISTS", username_key, None, None)
+    if not _exists(user_exists):
+        return create_user(session_id, username, password)
+    user_key = _unwrap(send_request_and_await(session_id, "GET", username_key, None, None))
+    stored = _unwrap(send_request_and_await(session_id, "HMGET", user_key, "password", None))
+    if stored and check_password(password, stored[0]):
+        return {"id": user_key.split(":")[-1], "username": username}
+    return None
+
+
+def get_rooms(session_id, user_id=0):
+    """Get rooms for the selected user"""
+    rooms = []
+    for room_id in _members(send_request_and_await(session_id, "GET", f"user:{user_id}:rooms", None, None)):
+        name = _unwrap(send_request_and_await(session_id, "GET", f"room:{room_id}:name", None, None))
+        if name:
+            rooms.append({"id": room_id, "names": [name]})
+            continue
+        if not _exists(send_request_and_await(session_id, "EXISTS", f"room:{room_id}", None, None)):
+            continue
+        user_ids = room_id.split(":")
+        if len(user_ids) != 2:
+            continue
+        name1 = hmget(session_id, f"user:{user_ids[0]}", "username")
+        name2 = hmget(session_id, f"user:{user_ids[1]}", "username")
+        rooms.append({"id": room_id, "names": [name1, name2]})
+    return rooms
+
+
+def get_online_users(session_id):
+    users = {}
+    for online_id in _members(send_request_and_await(session_id, "GET", "online_users", None, None)):
+        user = hmget(session_id, f"user:{online_id}", "username")
+        users[online_id] = {"id": online_id, "username": user, "online": True}
+    return users
+
+
+def get_users(session_id, ids):
+    """User info and presence for the given ids, as the /users route returns"""
+    online = set(_members(send_request_and_await(session_id, "GET", "online_users", None, None)))
+    users = {}
+    for user_id in ids:
+        user = hmget(session_id, f"user:{user_id}", "username")
+        users[user_id] = {"id": user_id, "username": user, "online": str(user_id) in online}
+    return users
+
+
+def publish(session_id, name, message):
+    """Append an event to the MESSAGES channel; the store has no PUBLISH, so it is a sorted set"""
+    outgoing = {"type": name, "data": message}
+    send_request_and_await(session_id, "ZADD", "MESSAGES", json.dumps(outgoing), str(time.time()))
+
+
+def set_presence(session_id, user_id):
+    """Mark a user online and announce it, as a socket.io connect does"""
+    send_request_and_await(session_id, "SADD", "online_users", str(user_id), None)
+    publish(session_id, "user.connected", {"id": user_id, "online": True})
+
+
+def clear_presence(session_id, user_id):
+    """Announce a user going offline, as a socket.io disconnect does (the store has no SREM)"""
+    publish(session_id, "user.disconnected", {"id": user_id, "online": False})
+
+
+def send_message(session_id, room_id, from_id, content, date):
+    """Store a chat message in its room and publish it, as the socket.io message handler does"""
+    message = {"from": from_id, "date": date, "message": content, "roomId": room_id}
+    send_request_and_await(session_id, "SADD", "online_users", str(from_id), None)
+    room_key = f"room:{room_id}"
+    is_private = not _exists(send_request_and_await(session_id, "EXISTS", f"{room_key}:name", None, None))
+    room_has_messages = _exists(send_request_and_await(session_id, "EXISTS", room_key, None, None))
+    ids = str(room_id).split(":")
+    if is_private and not room_has_messages and len(ids) == 2:
+        names = [hmget(session_id, f"user:{user_id}", "username") for user_id in ids]
+        publish(session_id, "show.room", {"id": room_id, "names": names})
+    send_request_and_await(session_id, "ZADD", room_key, encode_message(message), str(int(date)))
+    publish(session_id, "message", message)
+
+
 def event_stream(session_id):
     """Handle message formatting, etc."""
     send_request_and_await(session_id, "SUBSCRIBE", "MESSAGES", None, None)
@@ -1,9 +1,17 @@
 import asyncio
+import functools
 import sync.utils_app_sync as utils_app_sync
 import iocl.iocl_utils as redis_sync_utils
+from iocl.arrivals import schedule_from_env
+from iocl.histogram import recorder_from_env
+from iocl.messages import encode_message
+from iocl.opstream import op_stream_from_env
+from iocl.trace import get_trace_writer
+from iocl.keyselect import selector_from_env
+import iocl.opmix as opmix
+from iocl.opmix import WorkloadOp, mix_from_env
+from iocl.sessions import session_from_env
 import math
-import numpy as np
-import json
 import random
 import time
 
@@ -35,23 +43,41 @@ def get_greeting():
     return greetings[math.floor(math_random() * len(greetings))]
 
 
+@functools.lru_cache(maxsize=1024)
+def room_put(session_id, room_id):
+    """Prepared PUT handle for a room, reused across add_message calls."""
+    return redis_sync_utils.prepare(session_id, "PUT", f"room:{room_id}")
+
+
 def add_message(session_id, room_id, from_id, content, timestamp):
-    room_key = f"room:{room_id}"
     message = {
         "from": from_id,
         "date": timestamp,
         "message": content,
         "roomId": room_id,
     }
-    message_json = json.dumps(message)
-    redis_sync_utils.send_request_and_await(
-        session_id, "PUT", room_key, message_json, ""
-    )
+    message_json = encode_message(message)
+    room_put(session_id, room_id).send_and_await(message_json, "")
+
+
+# Every op the mix can name, with how its arguments are drawn
+OPS = {
+    "create_user": WorkloadOp(utils_app_sync.create_user, opmix.new_user_args, "users"),
+    "login": WorkloadOp(utils_app_sync.login, opmix.login_args, None),
+    "create_private_room": WorkloadOp(utils_app_sync.create_private_room, opmix.user_pair_args, "rooms"),
+    "get_rooms": WorkloadOp(utils_app_sync.get_rooms, opmix.user_args, None),
+    "add_message": WorkloadOp(add_message, opmix.message_args, None),
+    "send_message": WorkloadOp(utils_app_sync.send_message, opmix.message_args, None),
+    "get_messages": WorkloadOp(utils_app_sync.get_messages, opmix.room_args, None),
+    "get_online_users": WorkloadOp(utils_app_sync.get_online_users, opmix.no_args, None),
+    "get_users": WorkloadOp(utils_app_sync.get_users, opmix.user_list_args, None),
+    "set_presence": WorkloadOp(utils_app_sync.set_presence, opmix.user_args, None),
+    "clear_presence": WorkloadOp(utils_app_sync.clear_presence, opmix.user_args, None),
+    "publish": WorkloadOp(utils_app_sync.publish, opmix.publish_args, None),
+}
 
 
 def create(session_id, clientid, explen=30, warmup_secs=0, cooldown_secs=0):
-    api = ["create_user", "create_private_room", "add_message", "get_messages"]
-
     rampUp = int(warmup_secs)
     rampDown = int(cooldown_secs)
 
@@ -62,46 +88,69 @@ def create(session_id, clientid, explen=30, warmup_secs=0, cooldown_secs=0):
     t_start = time.time()
     t_end = t_start + explen
 
+    # Open-loop mode measures latency from each op's intended start time
+    schedule = schedule_from_env(t_start, clientid)
+    steady_ops = 0
+    latencies = recorder_from_env(clientid, t_start)
+    # Seeded, pre-generated draws: [op selector, arg, arg] per op
+    draws = op_stream_from_env(clientid)
+    trace = get_trace_writer()
+    # Optional skewed user/room selection (IOCL_CLIENT_KEY_SELECTOR); the
+    # default stays uniform over ids 0-100
+    users = selector_from_env(clientid, stream=1)
+    rooms = selector_from_env(clientid, stream=2)
+    # Op names and weights from client_op_mix (IOCL_CLIENT_OP_MIX)
+    mix = mix_from_env(OPS)
+    # Think times and login/room/logout transitions (IOCL_CLIENT_THINK_DISTRIBUTION)
+    session = session_from_env(clientid, users, rooms)
+
     print("#start,0,0")
 
     while time.time() < t_end:
-        app_request_type = np.random.uniform(0, 100)
-        before = int(time.time() * 1e9)
-
-        if app_request_type < 2:
-            selector = 0
-            user = np.random.uniform(0, 100)
-            password = np.random.uniform(0, 100)
-            utils_app_sync.create_user(session_id, str(user), str(password))
-        elif app_request_type < 10:
-            selector = 1
-            user1 = int(np.random.uniform(0, 100))
-            user2 = int(np.random.uniform(0, 100))
-            utils_app_sync.create_private_room(session_id, user1, user2)
-        elif app_request_type < 50:
-            selector = 2
-            room_id = int(np.random.uniform(0, 100))
-            from_id = 44
-            content = "heyyy"
-            timestamp = time.time()
-            add_message(session_id, room_id, from_id, content, timestamp)
+        if schedule is not None:
+            intended = schedule.wait()
+            if intended >= t_end:
+                break
+        elif session is not None and not session.wait(t_end):
+            break
+        app_request_type, arg1, arg2 = draws.next()
+        before = int((intended if schedule is not None else time.time()) * 1e9)  # latency in ns
+
+        optype = mix.select(app_request_type)
+        op = OPS[optype]
+        if session is not None:
+            optype, args = session.next_op(optype, op, arg1, arg2)
+            op = OPS[optype]
         else:
-            selector = 3
-            room_id = int(np.random.uniform(0, 100))
-            utils_app_sync.get_messages(session_id, room_id)
+            args = op.args(arg1, arg2, users, rooms)
+        op.run(session_id, *args)
+        if op.inserts == "users" and users is not None:
+            users.advance()
+        elif op.inserts == "rooms" and rooms is not None:
+            rooms.advance()
 
         after = int(time.time() * 1e9)
         lat = after - before
         optime = int((time.time() - t_start) * 1e9)
-        optype = api[selector]
+        if trace is not None:
+            trace.app_op(session_id, optype, args, before, lat)
 
         now = time.time()
         # Only print latencies during steady-state
         if rampUp <= (now - t_start) < (rampUp + steady_secs):
-            print(f"app,{lat},{optime},{clientid}")
-            print(f"{optype},{lat},{optime},{clientid}")
+            latencies.record(optype, lat, optime)
+            steady_ops += 1
+        if session is not None:
+            session.done()
+
+    if schedule is not None:
+        print(f"#rate,{schedule.rate:.3f},{steady_ops / steady_secs:.3f},{clientid}")
+
+    if session is not None:
+        print(f"#sessions,{session.sessions},{clientid}")
 
     elapsed = time.time() - t_start
+    latencies.finish(elapsed)
     end_sec = int(elapsed)
     end_usec = int((elapsed - end_sec) * 1e6)
     print(f"#end,{end_sec},{end_usec},{clientid}")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tests for dataflow execution of chat operations (iocl/dataflow.py) against the
+simulated backend: dependent requests wait for the replies they need, and
+independent ones overlap them.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_then_uses_earlier_reply(sim_backend, sim_delays):
+    import iocl.iocl_utils as iocl_utils
+    from iocl.dataflow import Dataflow
+
+    session_id = sim_backend.custom_init_session()
+    iocl_utils.send_request_and_await(session_id, "PUT", "username:erin", "user:5", "")
+    iocl_utils.send_request_and_await(session_id, "PUT", "user:5", "erin", "")
+
+    flow = Dataflow(session_id)
+    # GET username:erin and EXISTS are issued together; GET user:5 needs the first reply
+    sim_delays.extend([0.1, 0.3, 0.1])
+    user_key = flow.request("GET", "username:erin")
+    exists = flow.request("EXISTS", "username:erin")
+    username = flow.then(lambda reply: flow.request("GET", reply[1]), user_key)
+    cached = flow.constant((True, "cached"))
+    both = flow.then(lambda name, hit: (name[1], hit[1]), username, cached)
+
+    start = time.monotonic()
+    assert flow.run(exists, username, both) == [(True, "1"), (True, "erin"), ("erin", "cached")]
+    elapsed = time.monotonic() - start
+    # The two GETs (100 ms each) run back to back under the 300 ms EXISTS;
+    # issued one after another the three would take 500 ms
+    assert 0.3 <= elapsed < 0.45
+    assert cached.done and cached.value == (True, "cached")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the latency histograms (iocl/histogram.py): bucket bounds,
+percentile error, merging, the JSON round trip, and agreement with the
+vectorized bucketing in iocl/stats.py.
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from iocl.histogram import LatencyHistogram
+from iocl.stats import bucket_index
+
+
+def filled(values):
+    hist = LatencyHistogram()
+    for value in values:
+        hist.record(value)
+    return hist
+
+
+def test_bucket_bounds():
+    hist = LatencyHistogram()
+    for value in [0, 1, 255, 256, 257, 1000, 123456789, 2**40 + 12345]:
+        index = hist.index(value)
+        assert hist.lowest_value(index) <= value <= hist.highest_value(index)
+
+
+def test_percentile_relative_error():
+    rng = random.Random(1)
+    values = sorted(rng.randrange(1000, 50_000_000) for _ in range(10000))
+    hist = filled(values)
+    for q in (50, 90, 99, 99.9):
+        exact = values[max(int(len(values) * q / 100.0 + 0.5), 1) - 1]
+        assert abs(hist.percentile(q) - exact) <= exact * 2 ** -(hist.sub_bucket_bits - 1)
+
+
+def test_merge_equals_combined():
+    rng = random.Random(2)
+    a_values = [rng.randrange(1, 10**7) for _ in range(500)]
+    b_values = [rng.randrange(1, 10**9) for _ in range(700)]
+    merged = filled(a_values)
+    merged.merge(filled(b_values))
+    combined = filled(a_values + b_values)
+    assert list(merged.counts) == list(combined.counts)
+    assert (merged.count, merged.total, merged.min, merged.max) == (
+        combined.count,
+        combined.total,
+        combined.min,
+        combined.max,
+    )
+
+
+def test_merge_into_empty_and_precision_mismatch():
+    empty = LatencyHistogram()
+    empty.merge(filled([5, 500]))
+    assert (empty.count, empty.min, empty.max) == (2, 5, 500)
+    with pytest.raises(ValueError, match="different precision"):
+        empty.merge(LatencyHistogram(sub_bucket_bits=6))
+
+
+def test_dict_round_trip():
+    hist = filled([3, 300, 30000, 3000000])
+    copy = LatencyHistogram.from_dict(hist.to_dict())
+    assert list(copy.counts) == list(hist.counts)
+    assert copy.percentile(99) == hist.percentile(99)
+
+
+def test_vectorized_index_matches():
+    hist = LatencyHistogram()
+    values = np.array([0, 1, 127, 128, 255, 256, 999, 10**6, 10**9, 2**40 + 7], dtype=np.int64)
+    assert list(bucket_index(values)) == [hist.index(int(v)) for v in values]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for request submission and waiting (iocl/iocl_utils.py) against the
+simulated backend, with per-request completion delays from sim_delays.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def put(iocl_utils, session_id, key, value):
+    assert iocl_utils.send_request_and_await(session_id, "PUT", key, value, "") == (True, value)
+
+
+def test_await_many_out_of_order(sim_backend, sim_delays):
+    import iocl.iocl_utils as iocl_utils
+
+    session_id = sim_backend.custom_init_session()
+    keys = [f"await_many:{i}" for i in range(3)]
+    for key in keys:
+        put(iocl_utils, session_id, key, key.upper())
+
+    sim_delays.extend([0.15, 0.0, 0.05])
+    command_ids = [iocl_utils.send_request(session_id, "GET", key) for key in keys]
+    order = [command_id for command_id, _ in iocl_utils.iter_await_many(session_id, command_ids)]
+    assert order == [command_ids[1], command_ids[2], command_ids[0]]
+
+    sim_delays.extend([0.15, 0.0, 0.05])
+    command_ids = iocl_utils.send_batch(session_id, [("GET", key) for key in keys])
+    assert iocl_utils.await_many(session_id, command_ids) == [(True, key.upper()) for key in keys]
+
+
+def test_timeout_parks_the_efd(sim_backend, sim_delays):
+    import iocl.iocl_utils as iocl_utils
+
+    session_id = sim_backend.custom_init_session()
+    sim_delays.append(0.2)
+    command_id = iocl_utils.send_request(session_id, "GET", "timeout:0")
+    with pytest.raises(TimeoutError, match=str(command_id)):
+        iocl_utils.await_request(session_id, command_id, timeout=0.02)
+    [(efd, parked)] = iocl_utils._parked_efds.items()
+    assert parked == (session_id, command_id)
+    # Still open: the backend can signal it without hitting a reused fd
+    os.fstat(efd)
+
+    time.sleep(0.3)
+    iocl_utils._reap_parked_efds()
+    assert not iocl_utils._parked_efds
+
+
+def test_hedge_wins(sim_backend, sim_delays):
+    import iocl.iocl_utils as iocl_utils
+
+    session_id = sim_backend.custom_init_session()
+    put(iocl_utils, session_id, "hedge:0", "value")
+    iocl_utils.set_hedge_policy(iocl_utils.HedgePolicy(enabled=True, percentile=50, min_samples=1))
+    # One 20 ms read sets the GET hedge delay
+    sim_delays.append(0.02)
+    assert iocl_utils.send_request_and_await(session_id, "GET", "hedge:0", "", "") == (True, "value")
+
+    # The read is stuck for 2 s; its hedge completes right away
+    sim_delays.append(2.0)
+    start = time.monotonic()
+    assert iocl_utils.send_request_and_await(session_id, "GET", "hedge:0", "", "") == (True, "value")
+    assert time.monotonic() - start < 1.0
+    stats = iocl_utils.hedge_stats()["GET"]
+    assert (stats["reads"], stats["hedged"], stats["hedge_wins"]) == (2, 1, 1)
+    assert len(iocl_utils._parked_efds) == 1
+
+
+def test_spin_then_block(sim_backend, sim_delays, monkeypatch):
+    monkeypatch.setenv("IOCL_DEBUG_STATS", "true")
+    import iocl.iocl_utils as iocl_utils
+
+    session_id = sim_backend.custom_init_session()
+    put(iocl_utils, session_id, "spin:0", "value")
+    iocl_utils.set_wait_policy(iocl_utils.WaitPolicy(spin_budget_ns=100_000_000))
+    iocl_utils.reset_wait_stats()
+
+    # Lands within the 100 ms spin budget
+    sim_delays.append(0.005)
+    assert iocl_utils.send_request_and_await(session_id, "GET", "spin:0", "", "") == (True, "value")
+    stats = iocl_utils.wait_stats()["GET"]
+    assert (stats["fast"], stats["spin"], stats["slow"]) == (0, 1, 0)
+    assert stats["spin_iterations"] > 0
+
+    # Outlasts a 5 ms budget and blocks on the eventfd
+    iocl_utils.set_wait_policy(iocl_utils.WaitPolicy(spin_budget_ns=5_000_000))
+    sim_delays.append(0.1)
+    assert iocl_utils.send_request_and_await(session_id, "GET", "spin:0", "", "") == (True, "value")
+    stats = iocl_utils.wait_stats()["GET"]
+    assert (stats["fast"], stats["spin"], stats["slow"]) == (0, 1, 1)
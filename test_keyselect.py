@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the key selectors (iocl/keyselect.py): alias tables must reproduce
+their weights exactly, and the zipf exponent must come from the config.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from iocl.keyselect import AliasTable, make_selector, zipf_s_from_env
+
+
+def table_distribution(table):
+    """Probability of each id implied by the table's prob/alias columns."""
+    p = table.prob.copy()
+    np.add.at(p, table.alias, 1.0 - table.prob)
+    return p / len(table)
+
+
+def check_table(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    table = AliasTable(weights)
+    assert np.allclose(table_distribution(table), weights / weights.sum(), rtol=0, atol=1e-12)
+    assert ((table.prob >= 0) & (table.prob <= 1)).all()
+
+
+def test_alias_table_zipfian():
+    check_table(1.0 / np.arange(1, 100001) ** 0.99)
+    check_table(1.0 / np.arange(1, 1001) ** 2.5)
+
+
+def test_alias_table_uniform_and_hotspot():
+    check_table(np.ones(10))
+    check_table(np.r_[np.full(200, 4.0), np.full(800, 0.25)])
+
+
+def test_alias_table_zero_weights():
+    check_table([5.0, 0.0, 0.0, 1.0])
+    table = AliasTable([5.0, 0.0, 0.0, 1.0])
+    draws = table.sample(np.random.default_rng(0), 10000)
+    assert not np.isin(draws, [1, 2]).any()
+
+
+def test_selector_is_reproducible():
+    a = make_selector("zipfian", 1000, seed=7, clientid=1, stream=2)
+    b = make_selector("zipfian", 1000, seed=7, clientid=1, stream=2)
+    assert [a.next() for _ in range(100)] == [b.next() for _ in range(100)]
+
+
+def test_zipf_s_from_env(monkeypatch):
+    monkeypatch.delenv("IOCL_CLIENT_ZIPF_COEFFICIENT", raising=False)
+    monkeypatch.delenv("IOCL_CLIENT_ZIPFIAN_S", raising=False)
+    assert zipf_s_from_env() == 0.99
+    monkeypatch.setenv("IOCL_CLIENT_ZIPFIAN_S", "0.5")
+    assert zipf_s_from_env() == 0.5
+    monkeypatch.setenv("IOCL_CLIENT_ZIPF_COEFFICIENT", "0")
+    assert zipf_s_from_env() == 0.0
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for key placement (iocl/keyspace.py): the precomputed table must place
+every key exactly where plain MD5 does, and iocl_utils and wrappers/app_request
+must hand the binding the same signed int64.
+"""
+
+import os
+import stat
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import iocl.keyspace as keyspace
+
+NUM_KEYS = 1000
+
+
+def make_table(tmp_path):
+    path = keyspace.build_table(NUM_KEYS, str(tmp_path / "keyspace.bin"))
+    return keyspace.KeyspaceTable(path, NUM_KEYS)
+
+
+def test_table_matches_md5(tmp_path):
+    table = make_table(tmp_path)
+    for key in ("user:0", "user:999", "room:17", "user:5:rooms"):
+        assert table.lookup(key) == keyspace._md5_hash(key)
+    table.close()
+
+
+def test_table_slots(tmp_path):
+    table = make_table(tmp_path)
+    assert table.slot("user:3") == 3
+    assert table.slot("room:3") == NUM_KEYS + 3
+    assert table.slot("user:3:rooms") == 2 * NUM_KEYS + 3
+    # Non-canonical or out-of-range ids fall back to MD5
+    for key in ("user:03", "user:３", "user:", "user:1000", "user:-1", "room:3:name", "total_users"):
+        assert table.slot(key) is None, key
+    table.close()
+
+
+def test_table_is_world_readable(tmp_path):
+    path = keyspace.build_table(NUM_KEYS, str(tmp_path / "keyspace.bin"))
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+
+
+def test_signed_range():
+    for i in range(100):
+        h = keyspace.hash_key(f"user:{i}")
+        assert -(2**63) <= h < 2**63
+    assert keyspace.hash_key("12345") == 12345
+    assert keyspace.hash_key(str(2**63)) == keyspace._md5_hash(str(2**63))
+
+
+def test_both_paths_agree(sim_backend, monkeypatch):
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(os.path.abspath(__file__)), "wrappers"))
+    from app_request import AppRequest
+    from iocl.iocl_utils import _hash_key_to_int
+
+    sent = []
+
+    def send_request(op, key, value, old_value):
+        sent.append(key)
+        return True, None
+
+    monkeypatch.setattr(sim_backend, "send_request", send_request, raising=False)
+    # A key whose MD5 prefix is >= 2**63 read unsigned
+    high = next(f"user:{i}" for i in range(1000) if keyspace._md5_hash(f"user:{i}") < 0)
+    for key in (high, "12345"):
+        AppRequest("GET", key)
+        assert sent[-1] == _hash_key_to_int(key), key
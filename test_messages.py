@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the chat message encoding (iocl/messages.py): compact and JSON
+entries round trip through MessageView, messages the compact form cannot
+hold fall back to JSON, and decode_messages keeps the reply shape.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from iocl.messages import VERSION, MessageView, decode_messages, encode_compact, encode_message
+
+
+def message(**overrides):
+    fields = {"from": 12, "date": 1700000000.123456, "message": "hello", "roomId": "3:12"}
+    fields.update(overrides)
+    return fields
+
+
+def test_compact_round_trip():
+    for original in (
+        message(),
+        message(**{"from": 0, "roomId": 0}),
+        message(**{"from": 10**12, "roomId": 63, "message": ""}),
+        message(**{"from": "12", "message": "x" * 1000}),
+        message(message="héllo, wörld ✓"),
+    ):
+        raw = encode_compact(original)
+        assert raw.startswith(VERSION)
+        view = MessageView(raw)
+        assert set(view) == set(original)
+        for name in ("from", "roomId", "message"):
+            assert view[name] == original[name]
+        assert abs(view["date"] - original["date"]) < 1e-6
+
+
+def test_compact_is_smaller_than_json():
+    original = message()
+    assert len(encode_compact(original)) < len(json.dumps(original))
+
+
+def test_json_fallbacks():
+    for original in (
+        message(date="yesterday"),
+        message(date=-1),
+        message(**{"from": -5}) | {"extra": 1},
+        {"from": 1, "message": "no date or room"},
+    ):
+        raw = encode_compact(original)
+        assert not raw.startswith(VERSION)
+        assert json.loads(raw) == original
+        assert dict(MessageView(raw)) == original
+
+
+def test_negative_id_is_stored_as_string():
+    view = MessageView(encode_compact(message(**{"from": -5})))
+    assert view["from"] == "-5"
+
+
+def test_view_of_json_entry():
+    original = message()
+    view = MessageView(json.dumps(original))
+    assert dict(view) == original
+    assert view.json() == json.dumps(original)
+    assert json.loads(MessageView(encode_compact(original)).json())["message"] == "hello"
+    with pytest.raises(KeyError):
+        view["missing"]
+
+
+def test_encode_message_env(monkeypatch):
+    monkeypatch.delenv("IOCL_CLIENT_MESSAGE_ENCODING", raising=False)
+    assert encode_message(message()) == json.dumps(message())
+    monkeypatch.setenv("IOCL_CLIENT_MESSAGE_ENCODING", "compact")
+    assert encode_message(message()).startswith(VERSION)
+    monkeypatch.setenv("IOCL_CLIENT_MESSAGE_ENCODING", "bson")
+    with pytest.raises(ValueError, match="Unknown message encoding: bson"):
+        encode_message(message())
+
+
+def test_decode_messages_keeps_reply_shape():
+    entries = [encode_compact(message()), json.dumps(message(message="old"))]
+    success, views = decode_messages((True, entries))
+    assert success is True
+    assert [view["message"] for view in views] == ["hello", "old"]
+    assert [view["message"] for view in decode_messages(entries)] == ["hello", "old"]
+    assert decode_messages((False, None)) == (False, None)
+    assert decode_messages(None) is None
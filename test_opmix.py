@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the declarative op mix (iocl/opmix.py): weights map onto the
+op stream's [0, 100) draws, and bad mixes are rejected.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from iocl.opmix import DEFAULT_MIX, OpMix, mix_from_env
+
+
+def test_default_split_matches_legacy_thresholds():
+    mix = OpMix(DEFAULT_MIX)
+    # The drivers' original 2/8/40/50 split over a [0, 100) draw
+    assert mix.select(0) == "create_user"
+    assert mix.select(1.99) == "create_user"
+    assert mix.select(2) == "create_private_room"
+    assert mix.select(9.99) == "create_private_room"
+    assert mix.select(10) == "add_message"
+    assert mix.select(49.99) == "add_message"
+    assert mix.select(50) == "get_messages"
+    assert mix.select(99.999) == "get_messages"
+
+
+def test_weights_are_relative():
+    mix = OpMix({"login": 1, "get_rooms": 3})
+    assert mix.thresholds == [25.0, 100.0]
+    assert [mix.select(d) for d in (0, 24.9, 25, 99)] == ["login", "login", "get_rooms", "get_rooms"]
+
+
+def test_zero_weights_dropped():
+    mix = OpMix({"login": 0, "get_rooms": 1})
+    assert mix.names == ["get_rooms"]
+    assert mix.select(0) == "get_rooms"
+
+
+def test_rejects_empty_and_unknown():
+    with pytest.raises(ValueError, match="no ops with positive weight"):
+        OpMix({"login": 0})
+    with pytest.raises(ValueError, match="Unknown ops in op mix: fly"):
+        OpMix({"login": 1, "fly": 1}, {"login"})
+
+
+def test_mix_from_env(monkeypatch):
+    monkeypatch.delenv("IOCL_CLIENT_OP_MIX", raising=False)
+    assert mix_from_env().weights == {name: float(w) for name, w in DEFAULT_MIX.items()}
+    monkeypatch.setenv("IOCL_CLIENT_OP_MIX", json.dumps({"send_message": 30, "get_messages": 70}))
+    assert mix_from_env().select(29) == "send_message"
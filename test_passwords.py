@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the bcrypt worker pool (iocl/passwords.py): hashes verify, and a
+full queue does not block the event loop of coroutine callers.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from iocl.passwords import PasswordPool, check_password
+
+
+def test_hash_and_check():
+    pool = PasswordPool(workers=1, queue_size=1, rounds=4)
+    hashed = pool.hash("secret").result()
+    assert check_password("secret", hashed)
+    assert check_password("secret", hashed.encode("utf-8"))
+    assert not check_password("guess", hashed)
+
+
+def test_full_queue_does_not_block_the_loop():
+    pool = PasswordPool(workers=1, queue_size=0, rounds=4)
+    release = threading.Event()
+    # Hold the only slot
+    busy = pool._submit(release.wait, 5)
+
+    async def main():
+        ticks = 0
+        hashing = asyncio.ensure_future(pool.hash_async("secret"))
+        while not hashing.done():
+            await asyncio.sleep(0.001)
+            ticks += 1
+            if ticks == 20:
+                release.set()
+        return ticks, await hashing
+
+    ticks, hashed = asyncio.run(main())
+    assert ticks >= 20
+    assert busy.result() is True
+    assert check_password("secret", hashed)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Tests for workload discovery in the benchmark runner (iocl/runner.py): every
+script that defines run_app and hands it to run_client can be swept.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from iocl.runner import discover_workloads
+
+
+def test_discovers_drivers_and_synthetic(monkeypatch):
+    monkeypatch.delenv("IOCL_WORKLOAD_PATHS", raising=False)
+    workloads = discover_workloads()
+    for name in ("sync/main", "async/main", "sync/synthetic", "async/synthetic"):
+        assert name in workloads, name
+        assert os.path.isfile(workloads[name])
+
+
+def test_extra_paths_need_run_app_and_run_client(tmp_path, monkeypatch):
+    (tmp_path / "plugin.py").write_text(
+        "def run_app(session_id, client_id, client_type, explen, warmup_secs=0, cooldown_secs=0):\n"
+        "    pass\n\n\n"
+        "if __name__ == '__main__':\n"
+        "    from iocl.cli import run_client\n\n"
+        "    run_client(run_app, 'multi_paxos')\n"
+    )
+    (tmp_path / "helper.py").write_text("def run_app():\n    pass\n")
+    monkeypatch.setenv("IOCL_WORKLOAD_PATHS", str(tmp_path))
+    names = {os.path.basename(path) for path in discover_workloads().values()}
+    assert "plugin.py" in names
+    assert "helper.py" not in names
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the username cache (iocl/usernames.py): LRU eviction, which HMGET
+replies are cached, and that create_user fills it under the plain user key.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import iocl.usernames as usernames
+from iocl.usernames import UsernameCache
+
+
+def test_hit_returns_hmget_shape():
+    cache = UsernameCache(10)
+    assert cache.lookup("user:1") is None
+    cache.store("user:1", "alice")
+    assert cache.lookup("user:1") == (True, ["alice"])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction():
+    cache = UsernameCache(2)
+    cache.store("user:1", "a")
+    cache.store("user:2", "b")
+    cache.lookup("user:1")
+    cache.store("user:3", "c")
+    assert cache.lookup("user:2") is None
+    assert cache.lookup("user:1") == (True, ["a"])
+    assert cache.stats()["evictions"] == 1
+
+
+def test_fill_skips_failed_and_empty_replies():
+    cache = UsernameCache(10)
+    cache.fill("user:1", (False, ["x"]))
+    cache.fill("user:2", (True, []))
+    cache.fill("user:3", (True, ["carol"]))
+    assert cache.lookup("user:1") is None
+    assert cache.lookup("user:2") is None
+    assert cache.lookup("user:3") == (True, ["carol"])
+
+
+def test_disabled_cache_stores_nothing():
+    cache = UsernameCache(0)
+    cache.store("user:1", "alice")
+    assert cache.lookup("user:1") is None
+
+
+def test_create_user_caches_under_user_key(sim_backend, monkeypatch):
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(os.path.abspath(__file__)), "sync"))
+    import redisstore
+    import utils_app_sync
+
+    monkeypatch.setattr(usernames, "_cache", UsernameCache(10))
+    session_id = redisstore.custom_init_session()
+    user = utils_app_sync.create_user(session_id, "dave", "secret")
+    assert str(user["id"]).isdigit()
+    user_key = f"user:{user['id']}"
+    assert usernames.get_username_cache().lookup(user_key) == (True, ["dave"])
+    assert utils_app_sync.hmget(session_id, user_key, "username") == [True, ["dave"]]
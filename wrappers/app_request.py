@@ -1,11 +1,15 @@
+import os
+import sys
 import redisstore as rs
-import hashlib
-import struct
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iocl.keyspace import hash_key
+
 
 def string_to_int64_hash(s):
-    hash_value = int(hashlib.sha256(s.encode()).hexdigest(), 16)  # Large int from SHA-256
-    int64_hash = (hash_value % (2**64)) - 2**63  # Map to signed int64 range
-    return int64_hash
+    # The placement iocl_utils uses (see iocl/keyspace.py)
+    return hash_key(s)
 
 
 def AppRequest(op_type, key, value=None, old_value=None):
@@ -27,12 +31,9 @@ def AppRequest(op_type, key, value=None, old_value=None):
     else:
         op = op_type
 
-    # Convert key to int64 if it's a string that can be converted to an integer
-    if isinstance(key, str) and key.isdigit():
-        key = int(key)
-    elif isinstance(key, str):
-        key = string_to_int64_hash(key)
-    
+    # Digit strings become that integer, other strings their signed hash
+    if isinstance(key, str):
+        key = hash_key(key)
 
     # Call the underlying C++ function
     success, result = rs.send_request(op, key, value, old_value)